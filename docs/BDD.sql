@@ -74,31 +74,101 @@ CREATE TABLE SOUS_CATEGORIE (
 -- ----------------------------
 -- Table: OPERATION
 -- ----------------------------
+-- Partitionnée par plage de dates (une partition par année ou par mois)
 CREATE TABLE OPERATION (
-  idOperation INTEGER NOT NULL GENERATED ALWAYS AS IDENTITY,
+  idOperation INTEGER NOT NULL GENERATED BY DEFAULT AS IDENTITY,
   date DATE NOT NULL DEFAULT CURRENT_DATE,
   description TEXT NOT NULL,
   montant NUMERIC(10,2) NOT NULL,
   idCompte INTEGER NOT NULL,
   idType INTEGER NOT NULL,
   idSousCategorie INTEGER,
-  CONSTRAINT OPERATION_PK PRIMARY KEY (idOperation),
+  CONSTRAINT OPERATION_PK PRIMARY KEY (idOperation, date),
   CONSTRAINT OPERATION_idCompte_FK FOREIGN KEY (idCompte)
     REFERENCES COMPTE (idCompte) ON DELETE RESTRICT,
   CONSTRAINT OPERATION_idType_FK FOREIGN KEY (idType)
     REFERENCES TYPE (idType) ON DELETE RESTRICT,
   CONSTRAINT OPERATION_idSousCategorie_FK FOREIGN KEY (idSousCategorie)
     REFERENCES SOUS_CATEGORIE (idSousCategorie) ON DELETE SET NULL
+) PARTITION BY RANGE (date);
+
+-- Partition par défaut (dates hors des plages créées)
+CREATE TABLE OPERATION_DEFAUT PARTITION OF OPERATION DEFAULT;
+
+-- Granularité des partitions : 'year' ou 'month'
+CREATE TABLE OPERATION_PARTITION_CONFIG (
+  granularite TEXT NOT NULL CHECK (granularite IN ('year', 'month'))
 );
+INSERT INTO OPERATION_PARTITION_CONFIG VALUES ('year');
+
+-- Crée les partitions manquantes couvrant [p_debut, p_fin]
+-- (appelée au démarrage de l'API et par scripts/manage_partitions.py)
+CREATE OR REPLACE FUNCTION ensure_operation_partitions(p_debut DATE, p_fin DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_granularite TEXT;
+  v_pas INTERVAL;
+  v_debut DATE;
+  v_fin DATE;
+  v_nom TEXT;
+  v_crees INTEGER := 0;
+BEGIN
+  SELECT granularite INTO v_granularite FROM operation_partition_config;
+  IF v_granularite = 'month' THEN
+    v_pas := INTERVAL '1 month';
+  ELSE
+    v_pas := INTERVAL '1 year';
+  END IF;
+
+  v_debut := date_trunc(v_granularite, p_debut)::DATE;
+  WHILE v_debut <= p_fin LOOP
+    v_fin := (v_debut + v_pas)::DATE;
+    IF v_granularite = 'month' THEN
+      v_nom := 'operation_p' || to_char(v_debut, 'YYYY_MM');
+    ELSE
+      v_nom := 'operation_p' || to_char(v_debut, 'YYYY');
+    END IF;
+
+    IF to_regclass(v_nom) IS NULL THEN
+      EXECUTE format('CREATE TABLE %I (LIKE operation INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_nom);
+      EXECUTE format(
+        'WITH moved AS (DELETE FROM operation_defaut WHERE date >= %L AND date < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved', v_debut, v_fin, v_nom
+      );
+      EXECUTE format('ALTER TABLE operation ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                     v_nom, v_debut, v_fin);
+      EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', v_nom);
+      v_crees := v_crees + 1;
+    END IF;
+
+    v_debut := v_fin;
+  END LOOP;
+
+  RETURN v_crees;
+END;
+$$;
+
+SELECT ensure_operation_partitions(CURRENT_DATE, (CURRENT_DATE + INTERVAL '1 year')::DATE);
 
 -- ----------------------------
 -- Index de performance
+-- (les évolutions sont gérées par les migrations Alembic :
+--  src/backend/database/migrations, voir docs/DATABASE.md)
 -- ----------------------------
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 CREATE INDEX idx_compte_utilisateur ON COMPTE (idUtilisateur);
 CREATE INDEX idx_categorie_utilisateur ON CATEGORIE (idUtilisateur);
 CREATE INDEX idx_type_utilisateur ON TYPE (idUtilisateur);
-CREATE INDEX idx_operation_date ON OPERATION (date);
-CREATE INDEX idx_operation_compte ON OPERATION (idCompte);
+CREATE INDEX idx_operation_date_couvrant ON OPERATION (date DESC, idOperation)
+  INCLUDE (montant, idCompte, idType, idSousCategorie);
+CREATE INDEX idx_operation_compte_date ON OPERATION (idCompte, date) INCLUDE (montant);
+CREATE INDEX idx_operation_souscategorie_date ON OPERATION (idSousCategorie, date) INCLUDE (montant);
+CREATE INDEX idx_operation_type_date ON OPERATION (idType, date) INCLUDE (montant);
+CREATE INDEX idx_operation_description_trgm ON OPERATION USING gin (description gin_trgm_ops);
+CREATE INDEX idx_sous_categorie_categorie ON SOUS_CATEGORIE (idCategorie) INCLUDE (idSousCategorie);
 
 -- ===========================================================
 -- ROW LEVEL SECURITY (RLS)
@@ -110,6 +180,8 @@ ALTER TABLE CATEGORIE ENABLE ROW LEVEL SECURITY;
 ALTER TABLE TYPE ENABLE ROW LEVEL SECURITY;
 ALTER TABLE SOUS_CATEGORIE ENABLE ROW LEVEL SECURITY;
 ALTER TABLE OPERATION ENABLE ROW LEVEL SECURITY;
+-- Les partitions ont la RLS activée sans politique : l'accès direct (hors table parente) est refusé
+ALTER TABLE OPERATION_DEFAUT ENABLE ROW LEVEL SECURITY;
 
 -- ----------------------------
 -- Politiques pour COMPTE
@@ -234,6 +306,430 @@ CREATE POLICY operation_delete ON OPERATION
     )
   );
 
+-- ===========================================================
+-- AGRÉGATS MENSUELS (maintenus par triggers)
+-- ===========================================================
+
+CREATE TABLE operation_monthly_rollup (
+  idutilisateur INTEGER NOT NULL REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  idcompte INTEGER NOT NULL,
+  idsouscategorie INTEGER,
+  idtype INTEGER NOT NULL,
+  mois DATE NOT NULL,
+  total_revenus NUMERIC(14,2) NOT NULL DEFAULT 0,
+  total_depenses NUMERIC(14,2) NOT NULL DEFAULT 0,
+  nb_operations INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE UNIQUE INDEX operation_monthly_rollup_unq ON operation_monthly_rollup
+  (idutilisateur, idcompte, (COALESCE(idsouscategorie, 0)), idtype, mois);
+CREATE INDEX idx_rollup_utilisateur_mois ON operation_monthly_rollup (idutilisateur, mois);
+CREATE INDEX idx_rollup_vide ON operation_monthly_rollup (idutilisateur) WHERE nb_operations = 0;
+
+ALTER TABLE operation_monthly_rollup ENABLE ROW LEVEL SECURITY;
+CREATE POLICY operation_monthly_rollup_select ON operation_monthly_rollup
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+CREATE OR REPLACE FUNCTION operation_rollup_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_source TEXT;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    v_source := 'SELECT idcompte, idsouscategorie, idtype, date, montant, 1 AS signe FROM new_rows';
+  ELSIF TG_OP = 'DELETE' THEN
+    v_source := 'SELECT idcompte, idsouscategorie, idtype, date, montant, -1 AS signe FROM old_rows';
+  ELSE
+    v_source := 'SELECT idcompte, idsouscategorie, idtype, date, montant, 1 AS signe FROM new_rows '
+             || 'UNION ALL '
+             || 'SELECT idcompte, idsouscategorie, idtype, date, montant, -1 AS signe FROM old_rows';
+  END IF;
+
+  EXECUTE format($q$
+    INSERT INTO operation_monthly_rollup AS r
+      (idutilisateur, idcompte, idsouscategorie, idtype, mois,
+       total_revenus, total_depenses, nb_operations)
+    SELECT c.idutilisateur, ch.idcompte, ch.idsouscategorie, ch.idtype,
+           date_trunc('month', ch.date)::DATE AS mois,
+           SUM(CASE WHEN ch.montant > 0 THEN ch.signe * ch.montant ELSE 0 END),
+           SUM(CASE WHEN ch.montant < 0 THEN -ch.signe * ch.montant ELSE 0 END),
+           SUM(ch.signe)
+    FROM (%s) ch
+    JOIN compte c ON c.idcompte = ch.idcompte
+    GROUP BY 1, 2, 3, 4, 5
+    ORDER BY 1, 2, 3, 4, 5
+    ON CONFLICT (idutilisateur, idcompte, (COALESCE(idsouscategorie, 0)), idtype, mois)
+    DO UPDATE SET total_revenus = r.total_revenus + EXCLUDED.total_revenus,
+                  total_depenses = r.total_depenses + EXCLUDED.total_depenses,
+                  nb_operations = r.nb_operations + EXCLUDED.nb_operations
+  $q$, v_source);
+
+  -- Lignes devenues vides (index partiel : pas de parcours complet)
+  IF TG_OP <> 'INSERT' THEN
+    DELETE FROM operation_monthly_rollup WHERE nb_operations = 0;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER operation_rollup_insert
+  AFTER INSERT ON operation
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_rollup_trigger();
+
+CREATE TRIGGER operation_rollup_update
+  AFTER UPDATE ON operation
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_rollup_trigger();
+
+CREATE TRIGGER operation_rollup_delete
+  AFTER DELETE ON operation
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_rollup_trigger();
+
+CREATE OR REPLACE FUNCTION rebuild_operation_monthly_rollup()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_lignes INTEGER;
+BEGIN
+  LOCK TABLE operation IN SHARE MODE;
+  DELETE FROM operation_monthly_rollup;
+
+  INSERT INTO operation_monthly_rollup
+    (idutilisateur, idcompte, idsouscategorie, idtype, mois,
+     total_revenus, total_depenses, nb_operations)
+  SELECT c.idutilisateur, o.idcompte, o.idsouscategorie, o.idtype,
+         date_trunc('month', o.date)::DATE,
+         COALESCE(SUM(o.montant) FILTER (WHERE o.montant > 0), 0),
+         COALESCE(-SUM(o.montant) FILTER (WHERE o.montant < 0), 0),
+         COUNT(*)
+  FROM operation o
+  JOIN compte c ON c.idcompte = o.idcompte
+  GROUP BY 1, 2, 3, 4, 5;
+
+  GET DIAGNOSTICS v_lignes = ROW_COUNT;
+  RETURN v_lignes;
+END;
+$$;
+
+-- ===========================================================
+-- BUDGETS MENSUELS
+-- ===========================================================
+
+CREATE TABLE budget (
+  idbudget INTEGER NOT NULL GENERATED ALWAYS AS IDENTITY,
+  idutilisateur INTEGER NOT NULL,
+  idcategorie INTEGER NOT NULL,
+  idsouscategorie INTEGER,
+  montant NUMERIC(10,2) NOT NULL CHECK (montant >= 0),
+  alerte_seuil NUMERIC(4,3) NOT NULL DEFAULT 0.8 CHECK (alerte_seuil BETWEEN 0 AND 1),
+  limite_stricte BOOLEAN NOT NULL DEFAULT FALSE,
+  actif BOOLEAN NOT NULL DEFAULT TRUE,
+  CONSTRAINT budget_pk PRIMARY KEY (idbudget),
+  CONSTRAINT budget_idutilisateur_fk FOREIGN KEY (idutilisateur)
+    REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  CONSTRAINT budget_idcategorie_fk FOREIGN KEY (idcategorie)
+    REFERENCES categorie (idcategorie) ON DELETE CASCADE,
+  CONSTRAINT budget_idsouscategorie_fk FOREIGN KEY (idsouscategorie)
+    REFERENCES sous_categorie (idsouscategorie) ON DELETE CASCADE
+);
+
+-- Un seul budget par catégorie et par sous-catégorie
+CREATE UNIQUE INDEX budget_cible_unq ON budget (idutilisateur, idcategorie, (COALESCE(idsouscategorie, 0)));
+
+ALTER TABLE budget ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY budget_select ON budget
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+CREATE POLICY budget_insert ON budget
+  FOR INSERT WITH CHECK (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+CREATE POLICY budget_update ON budget
+  FOR UPDATE USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+CREATE POLICY budget_delete ON budget
+  FOR DELETE USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+-- ===========================================================
+-- ALERTES BUDGÉTAIRES (consommation incrémentale des budgets)
+-- ===========================================================
+CREATE TABLE budget_consommation (
+  idutilisateur INTEGER NOT NULL REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  idcategorie INTEGER NOT NULL,
+  idsouscategorie INTEGER,
+  mois DATE NOT NULL,
+  total_depenses NUMERIC(14,2) NOT NULL DEFAULT 0
+);
+
+CREATE UNIQUE INDEX budget_consommation_unq ON budget_consommation
+  (idutilisateur, idcategorie, (COALESCE(idsouscategorie, 0)), mois);
+
+ALTER TABLE budget_consommation ENABLE ROW LEVEL SECURITY;
+CREATE POLICY budget_consommation_select ON budget_consommation
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+CREATE TABLE alerte_budget (
+  idalerte BIGINT NOT NULL GENERATED ALWAYS AS IDENTITY,
+  idutilisateur INTEGER NOT NULL REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  idbudget INTEGER NOT NULL REFERENCES budget (idbudget) ON DELETE CASCADE,
+  mois DATE NOT NULL,
+  type VARCHAR(20) NOT NULL CHECK (type IN ('seuil', 'depassement')),
+  consomme NUMERIC(14,2) NOT NULL,
+  budget NUMERIC(10,2) NOT NULL,
+  date_creation TIMESTAMPTZ NOT NULL DEFAULT now(),
+  lue BOOLEAN NOT NULL DEFAULT FALSE,
+  CONSTRAINT alerte_budget_pk PRIMARY KEY (idalerte),
+  CONSTRAINT alerte_budget_unq UNIQUE (idbudget, mois, type)
+);
+
+CREATE INDEX idx_alerte_utilisateur ON alerte_budget (idutilisateur, idalerte);
+
+ALTER TABLE alerte_budget ENABLE ROW LEVEL SECURITY;
+CREATE POLICY alerte_budget_select ON alerte_budget
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+CREATE POLICY alerte_budget_update ON alerte_budget
+  FOR UPDATE USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+CREATE POLICY alerte_budget_delete ON alerte_budget
+  FOR DELETE USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+-- Applique un delta de dépenses à une cible (sous-catégorie, ou catégorie si p_idsouscategorie
+-- est NULL) puis compare l'ancien et le nouveau total au budget de cette cible
+CREATE OR REPLACE FUNCTION budget_consommation_apply(
+  p_idutilisateur INTEGER, p_idcategorie INTEGER, p_idsouscategorie INTEGER,
+  p_mois DATE, p_delta NUMERIC
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_nouveau NUMERIC;
+  v_ancien NUMERIC;
+  v_budget budget%ROWTYPE;
+BEGIN
+  INSERT INTO budget_consommation AS c (idutilisateur, idcategorie, idsouscategorie, mois, total_depenses)
+  VALUES (p_idutilisateur, p_idcategorie, p_idsouscategorie, p_mois, p_delta)
+  ON CONFLICT (idutilisateur, idcategorie, (COALESCE(idsouscategorie, 0)), mois)
+  DO UPDATE SET total_depenses = c.total_depenses + EXCLUDED.total_depenses
+  RETURNING c.total_depenses INTO v_nouveau;
+  v_ancien := v_nouveau - p_delta;
+
+  SELECT * INTO v_budget FROM budget
+  WHERE idutilisateur = p_idutilisateur
+    AND idcategorie = p_idcategorie
+    AND COALESCE(idsouscategorie, 0) = COALESCE(p_idsouscategorie, 0)
+    AND actif;
+  IF NOT FOUND OR p_delta <= 0 THEN
+    RETURN;
+  END IF;
+
+  IF v_budget.limite_stricte AND v_nouveau > v_budget.montant THEN
+    RAISE EXCEPTION 'Budget % dépassé : % / %', v_budget.idbudget, v_nouveau, v_budget.montant
+      USING ERRCODE = 'BU001';
+  END IF;
+
+  IF v_ancien < v_budget.montant * v_budget.alerte_seuil
+     AND v_nouveau >= v_budget.montant * v_budget.alerte_seuil THEN
+    INSERT INTO alerte_budget (idutilisateur, idbudget, mois, type, consomme, budget)
+    VALUES (p_idutilisateur, v_budget.idbudget, p_mois, 'seuil', v_nouveau, v_budget.montant)
+    ON CONFLICT DO NOTHING;
+  END IF;
+
+  IF v_ancien <= v_budget.montant AND v_nouveau > v_budget.montant THEN
+    INSERT INTO alerte_budget (idutilisateur, idbudget, mois, type, consomme, budget)
+    VALUES (p_idutilisateur, v_budget.idbudget, p_mois, 'depassement', v_nouveau, v_budget.montant)
+    ON CONFLICT DO NOTHING;
+  END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION budget_consommation_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_ligne operation_monthly_rollup%ROWTYPE;
+  v_delta NUMERIC;
+  v_idcategorie INTEGER;
+BEGIN
+  -- Reconstruction complète en cours : budget_consommation est recalculée en bloc
+  IF current_setting('app.rollup_rebuild', TRUE) = 'on' THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'INSERT' THEN
+    v_ligne := NEW;
+    v_delta := NEW.total_depenses;
+  ELSIF TG_OP = 'DELETE' THEN
+    v_ligne := OLD;
+    v_delta := -OLD.total_depenses;
+  ELSE
+    v_ligne := NEW;
+    v_delta := NEW.total_depenses - OLD.total_depenses;
+  END IF;
+
+  IF v_delta = 0 OR v_ligne.idsouscategorie IS NULL THEN
+    RETURN NULL;
+  END IF;
+
+  SELECT idcategorie INTO v_idcategorie FROM sous_categorie
+  WHERE idsouscategorie = v_ligne.idsouscategorie;
+  IF NOT FOUND THEN
+    RETURN NULL;
+  END IF;
+
+  PERFORM budget_consommation_apply(v_ligne.idutilisateur, v_idcategorie, v_ligne.idsouscategorie,
+                                    v_ligne.mois, v_delta);
+  PERFORM budget_consommation_apply(v_ligne.idutilisateur, v_idcategorie, NULL,
+                                    v_ligne.mois, v_delta);
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER budget_consommation_maj
+  AFTER INSERT OR UPDATE OR DELETE ON operation_monthly_rollup
+  FOR EACH ROW EXECUTE FUNCTION budget_consommation_trigger();
+
+-- Reconstruction : agrégats mensuels puis consommation des budgets (sans générer d'alertes)
+CREATE OR REPLACE FUNCTION rebuild_operation_monthly_rollup()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_lignes INTEGER;
+BEGIN
+  LOCK TABLE operation IN SHARE MODE;
+  PERFORM set_config('app.rollup_rebuild', 'on', TRUE);
+  DELETE FROM operation_monthly_rollup;
+
+  INSERT INTO operation_monthly_rollup
+    (idutilisateur, idcompte, idsouscategorie, idtype, mois,
+     total_revenus, total_depenses, nb_operations)
+  SELECT c.idutilisateur, o.idcompte, o.idsouscategorie, o.idtype,
+         date_trunc('month', o.date)::DATE,
+         COALESCE(SUM(o.montant) FILTER (WHERE o.montant > 0), 0),
+         COALESCE(-SUM(o.montant) FILTER (WHERE o.montant < 0), 0),
+         COUNT(*)
+  FROM operation o
+  JOIN compte c ON c.idcompte = o.idcompte
+  GROUP BY 1, 2, 3, 4, 5;
+  GET DIAGNOSTICS v_lignes = ROW_COUNT;
+
+  DELETE FROM budget_consommation;
+  INSERT INTO budget_consommation (idutilisateur, idcategorie, idsouscategorie, mois, total_depenses)
+  SELECT r.idutilisateur, sc.idcategorie, r.idsouscategorie, r.mois, SUM(r.total_depenses)
+  FROM operation_monthly_rollup r
+  JOIN sous_categorie sc ON sc.idsouscategorie = r.idsouscategorie
+  GROUP BY GROUPING SETS ((r.idutilisateur, sc.idcategorie, r.idsouscategorie, r.mois),
+                          (r.idutilisateur, sc.idcategorie, r.mois));
+
+  PERFORM set_config('app.rollup_rebuild', 'off', TRUE);
+  RETURN v_lignes;
+END;
+$$;
+
+-- ===========================================================
+-- JOURNAL DES OPÉRATIONS (synchronisation incrémentale)
+-- ===========================================================
+CREATE TABLE operation_journal (
+  idoperation INTEGER NOT NULL,
+  idutilisateur INTEGER NOT NULL REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  supprime BOOLEAN NOT NULL DEFAULT FALSE,
+  xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+  CONSTRAINT operation_journal_pk PRIMARY KEY (idoperation)
+);
+
+CREATE INDEX idx_operation_journal_xid ON operation_journal (xid);
+
+ALTER TABLE operation_journal ENABLE ROW LEVEL SECURITY;
+CREATE POLICY operation_journal_select ON operation_journal
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+CREATE OR REPLACE FUNCTION operation_journal_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_source TEXT;
+  v_supprime BOOLEAN;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    v_source := 'old_rows';
+    v_supprime := TRUE;
+  ELSE
+    v_source := 'new_rows';
+    v_supprime := FALSE;
+  END IF;
+
+  EXECUTE format($q$
+    INSERT INTO operation_journal AS j (idoperation, idutilisateur, supprime)
+    SELECT ch.idoperation, c.idutilisateur, %L
+    FROM %I ch
+    JOIN compte c ON c.idcompte = ch.idcompte
+    ORDER BY ch.idoperation
+    ON CONFLICT (idoperation)
+    DO UPDATE SET idutilisateur = EXCLUDED.idutilisateur,
+                  supprime = EXCLUDED.supprime,
+                  xid = pg_current_xact_id()
+  $q$, v_supprime, v_source);
+
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER operation_journal_insert
+  AFTER INSERT ON operation
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_journal_trigger();
+
+CREATE TRIGGER operation_journal_update
+  AFTER UPDATE ON operation
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_journal_trigger();
+
+CREATE TRIGGER operation_journal_delete
+  AFTER DELETE ON operation
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_journal_trigger();
+
+-- ===========================================================
+-- ÉCRITURES DIFFÉRÉES (clés d'idempotence)
+-- ===========================================================
+CREATE TABLE ecriture_idempotente (
+  idutilisateur INTEGER NOT NULL REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  cle UUID NOT NULL,
+  idoperation INTEGER,
+  date_creation TIMESTAMPTZ NOT NULL DEFAULT now(),
+  CONSTRAINT ecriture_idempotente_pk PRIMARY KEY (idutilisateur, cle)
+);
+
+CREATE INDEX idx_ecriture_idempotente_date ON ecriture_idempotente (date_creation);
+
+ALTER TABLE ecriture_idempotente ENABLE ROW LEVEL SECURITY;
+CREATE POLICY ecriture_idempotente_select ON ecriture_idempotente
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+CREATE POLICY ecriture_idempotente_insert ON ecriture_idempotente
+  FOR INSERT WITH CHECK (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+CREATE POLICY ecriture_idempotente_update ON ecriture_idempotente
+  FOR UPDATE USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
 -- ===========================================================
 -- RÔLE APPLICATIF (optionnel mais recommandé)
 -- ===========================================================
@@ -0,0 +1,106 @@
+"""
+Benchmark des modèles Transaction / CategoryBudget et de leurs variantes compactes
+
+Compare, pour N objets construits depuis des dictionnaires (format to_dict) : le temps de
+construction et la mémoire allouée (tracemalloc) par Transaction.from_dict en boucle,
+CompactTransaction.from_dicts et CompactTransaction.from_columns (idem pour les catégories).
+
+Usage : python scripts/bench_models.py [N]   (N = 100000 par défaut)
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.category import CategoryBudget, CompactCategoryBudget
+from src.models.transaction import CompactTransaction, Transaction
+
+
+def _mesurer(construire):
+    """
+    Retourne (secondes, octets alloués encore vivants, objets)
+
+    Deux constructions : la première chronométrée, la seconde sous tracemalloc (qui
+    ralentit fortement les allocations).
+    """
+    gc.collect()
+    debut = time.perf_counter()
+    objets = construire()
+    duree = time.perf_counter() - debut
+    del objets
+    gc.collect()
+    tracemalloc.start()
+    objets = construire()
+    memoire, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duree, memoire, objets
+
+
+def _afficher(titre: str, mesures):
+    print(f"\n{titre}")
+    reference_duree, reference_memoire = mesures[0][1], mesures[0][2]
+    for nom, duree, memoire in mesures:
+        print(f"   {nom:<36} {duree * 1000:9.1f} ms  (x{reference_duree / duree:4.1f})"
+              f"  {memoire / 1e6:8.1f} Mo  (x{reference_memoire / memoire:4.1f})")
+
+
+def bench_transactions(n: int):
+    debut = date(2015, 1, 1)
+    creation = datetime(2024, 1, 1).isoformat()
+    dicts = [
+        {"montant": -12.5 - i % 100, "description": f"Opération {i}", "categorie": f"Catégorie {i % 20}",
+         "date_transaction": (debut + timedelta(days=i % 3650)).isoformat(), "type_transaction": "depense",
+         "id_transaction": i, "tags": [], "note": "", "recurrente": False, "frequence_recurrence": "",
+         "date_creation": creation}
+        for i in range(n)
+    ]
+    colonnes = {cle: [d[cle] for d in dicts] for cle in dicts[0]}
+
+    mesures = []
+    for nom, construire in (
+        ("Transaction.from_dict (boucle)", lambda: [Transaction.from_dict(d) for d in dicts]),
+        ("CompactTransaction.from_dicts", lambda: CompactTransaction.from_dicts(dicts)),
+        ("CompactTransaction.from_columns", lambda: CompactTransaction.from_columns(colonnes)),
+    ):
+        duree, memoire, objets = _mesurer(construire)
+        assert len(objets) == n
+        mesures.append((nom, duree, memoire))
+        del objets
+    _afficher(f"💳 {n} transactions", mesures)
+
+
+def bench_categories(n: int):
+    dicts = [CategoryBudget(name=f"Catégorie {i}", budget=100.0 + i, spent=i % 150).to_dict() for i in range(n)]
+    colonnes = {cle: [d[cle] for d in dicts] for cle in dicts[0] if cle != "version"}
+
+    mesures = []
+    for nom, construire in (
+        ("CategoryBudget.from_dict (boucle)", lambda: [CategoryBudget.from_dict(d) for d in dicts]),
+        ("CompactCategoryBudget.from_dicts", lambda: CompactCategoryBudget.from_dicts(dicts)),
+        ("CompactCategoryBudget.from_columns", lambda: CompactCategoryBudget.from_columns(colonnes)),
+    ):
+        duree, memoire, objets = _mesurer(construire)
+        assert len(objets) == n
+        mesures.append((nom, duree, memoire))
+        del objets
+    _afficher(f"📂 {n} catégories", mesures)
+
+
+def main():
+    """Point d'entrée principal"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("=" * 60)
+    print("⏱️  BENCHMARK DES MODÈLES (construction et mémoire)")
+    print("=" * 60)
+    bench_transactions(n)
+    bench_categories(n)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
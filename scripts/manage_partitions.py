@@ -0,0 +1,79 @@
+"""
+Script de gestion des partitions de la table OPERATION
+
+Usage:
+    python scripts/manage_partitions.py list
+    python scripts/manage_partitions.py ensure [--ahead 3]
+    python scripts/manage_partitions.py detach operation_p2019 [--archive archive_operation_2019]
+
+Une partition détachée devient une table autonome : la sauvegarder avec
+`pg_dump -t archive_operation_2019` puis la supprimer avec DROP TABLE.
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.backend.database.connection import test_connection
+from src.backend.database import partitioning
+
+
+def cmd_list(args) -> int:
+    """Affiche les partitions et leurs bornes"""
+    print(f"\n📦 Partitions de OPERATION (granularité: {partitioning.get_granularity()})")
+    for partition in partitioning.list_partitions():
+        print(f"   - {partition['nom']:<24} {partition['bornes']:<60} ~{partition['lignes_estimees']} lignes")
+    return 0
+
+
+def cmd_ensure(args) -> int:
+    """Crée les partitions des périodes à venir"""
+    created = partitioning.ensure_future_partitions(ahead=args.ahead)
+    print(f"\n✅ {created} partition(s) créée(s)")
+    return 0
+
+
+def cmd_detach(args) -> int:
+    """Détache une partition pour l'archiver"""
+    try:
+        partitioning.detach_partition(args.partition, archive_name=args.archive)
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        return 1
+
+    name = args.archive or args.partition
+    print(f"\n✅ Partition détachée: {name}")
+    print(f"   Sauvegarde: pg_dump -t {name} > {name}.sql")
+    print(f"   Suppression: DROP TABLE {name};")
+    return 0
+
+
+def main():
+    """Point d'entrée principal"""
+    parser = argparse.ArgumentParser(description="Gestion des partitions de la table OPERATION")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="Lister les partitions")
+
+    ensure_parser = subparsers.add_parser("ensure", help="Créer les partitions à venir")
+    ensure_parser.add_argument("--ahead", type=int, default=partitioning.OPERATION_PARTITIONS_AHEAD,
+                               help="Nombre de périodes futures à préparer")
+
+    detach_parser = subparsers.add_parser("detach", help="Détacher une partition pour l'archiver")
+    detach_parser.add_argument("partition", help="Nom de la partition (ex: operation_p2019)")
+    detach_parser.add_argument("--archive", help="Nouveau nom de la table détachée")
+
+    args = parser.parse_args()
+
+    if not test_connection():
+        print("\n❌ Impossible de se connecter à la base de données.")
+        return 1
+
+    commands = {"list": cmd_list, "ensure": cmd_ensure, "detach": cmd_detach}
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    exit(main())
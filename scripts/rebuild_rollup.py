@@ -0,0 +1,36 @@
+"""
+Script pour recalculer la table d'agrégats mensuels operation_monthly_rollup
+
+La table est normalement maintenue par triggers à chaque écriture ; ce script la
+reconstruit entièrement depuis OPERATION (après un import massif hors triggers,
+une restauration ou en cas de doute sur sa cohérence).
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from src.backend.database.connection import engine, test_connection
+
+
+def main():
+    """Point d'entrée principal"""
+    print("=" * 60)
+    print("🔄 RECONSTRUCTION DES AGRÉGATS MENSUELS")
+    print("=" * 60)
+
+    if not test_connection():
+        print("\n❌ Impossible de se connecter à la base de données.")
+        return 1
+
+    with engine.begin() as conn:
+        lignes = conn.execute(text("SELECT rebuild_operation_monthly_rollup()")).scalar_one()
+
+    print(f"\n✅ {lignes} ligne(s) d'agrégats recalculée(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
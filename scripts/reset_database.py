@@ -7,8 +7,11 @@ import os
 from pathlib import Path
 
 # Ajouter le répertoire parent au path pour les imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
 
+from alembic import command
+from alembic.config import Config
 from sqlalchemy import text
 from src.backend.database.connection import engine, test_connection
 
@@ -19,13 +22,22 @@ def drop_all_tables():
     with engine.begin() as conn:
         # Ordre de suppression respectant les contraintes de clés étrangères
         tables = [
-            'operation',      # Anciennement 'transaction'
+            'ecriture_idempotente',        # Migration 0008
+            'operation_journal',           # Migration 0007
+            'alerte_budget',               # Migration 0006
+            'budget_consommation',         # Migration 0006
+            'budget',                      # Migration 0005
+            'operation_monthly_rollup',    # Migration 0004
+            'operation_partition_config',  # Migration 0003
+            'operation',      # Anciennement 'transaction' (partitionnée : supprime aussi ses partitions)
             'transaction',    # Table de l'ancien schéma
             'sous_categorie',
             'appartient_a',   # Table de l'ancien schéma
             'categorie',
             'type',
-            'compte'
+            'compte',
+            'utilisateur',
+            'alembic_version'  # Historique des migrations
         ]
 
         for table in tables:
@@ -37,31 +49,18 @@ def drop_all_tables():
 
 
 def create_schema():
-    """Crée le nouveau schéma à partir du fichier schema.sql"""
-    print("\n📝 Création du nouveau schéma...")
+    """Crée le schéma en appliquant toutes les migrations Alembic (alembic upgrade head)"""
+    print("\n📝 Création du schéma (migrations Alembic)...")
 
-    schema_file = Path(__file__).parent.parent / "database" / "schema.sql"
+    alembic_cfg = Config(str(PROJECT_ROOT / "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", str(PROJECT_ROOT / "src" / "backend" / "database" / "migrations"))
 
-    if not schema_file.exists():
-        print(f"❌ Fichier schema.sql introuvable: {schema_file}")
+    try:
+        command.upgrade(alembic_cfg, "head")
+    except Exception as e:
+        print(f"❌ Erreur lors des migrations: {e}")
         return False
 
-    with open(schema_file, 'r', encoding='utf-8') as f:
-        schema_sql = f.read()
-
-    # Exécuter le script SQL
-    with engine.begin() as conn:
-        # Séparer les commandes SQL (simple split sur ';')
-        commands = [cmd.strip() for cmd in schema_sql.split(';') if cmd.strip()]
-
-        for cmd in commands:
-            try:
-                conn.execute(text(cmd))
-            except Exception as e:
-                # Ignorer les erreurs de duplication (ON CONFLICT)
-                if "duplicate" not in str(e).lower() and "already exists" not in str(e).lower():
-                    print(f"   ⚠️  Erreur: {e}")
-
     print("   ✓ Schéma créé avec succès!")
     return True
 
@@ -80,7 +79,10 @@ def verify_schema():
 
         tables = [row[0] for row in result]
 
-        expected_tables = ['compte', 'categorie', 'type', 'sous_categorie', 'operation']
+        expected_tables = ['utilisateur', 'compte', 'categorie', 'type', 'sous_categorie', 'operation',
+                           'operation_partition_config', 'operation_monthly_rollup', 'budget',
+                           'budget_consommation', 'alerte_budget', 'operation_journal',
+                           'ecriture_idempotente', 'alembic_version']
 
         print("\n📊 Tables créées:")
         for table in tables:
@@ -112,7 +114,7 @@ def main():
     print("\n⚠️  ATTENTION: Cette opération va:")
     print("   - Supprimer TOUTES les tables existantes")
     print("   - Supprimer TOUTES les données")
-    print("   - Recréer le schéma à partir de database/schema.sql")
+    print("   - Recréer le schéma avec les migrations Alembic (alembic upgrade head)")
 
     response = input("\n❓ Êtes-vous sûr de vouloir continuer? (oui/non): ")
 
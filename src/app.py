@@ -34,6 +34,7 @@ class BudgetApp:
         # Containers pour les pages
         self.main_content = ft.Container()
         self.navigation_rail = None
+        self.dashboard: Optional[DashboardPage] = None
 
         # Configuration de la page
         self._setup_page()
@@ -65,10 +66,15 @@ class BudgetApp:
         )
 
     def start(self):
-        """Démarre l'application et construit l'interface"""
+        """Démarre l'application et construit l'interface (sans attendre les données)"""
         self._build_interface()
         self._load_dashboard()
 
+    def on_data_loaded(self):
+        """Appelé depuis le thread de chargement : remplit la page affichée"""
+        if self.current_page == "dashboard" and self.dashboard is not None:
+            self.dashboard.show_data()
+
     def _build_interface(self):
         """Construit l'interface principale avec navigation"""
         # Navigation Rail
@@ -185,7 +191,7 @@ class BudgetApp:
 
     def _load_dashboard(self):
         """Charge la page Dashboard"""
-        dashboard = DashboardPage(
+        dashboard = self.dashboard = DashboardPage(
             budget_manager=self.budget_manager,
             on_add_transaction=self._show_add_transaction_dialog,
             on_view_transactions=lambda: self._navigate_to("transactions"),
@@ -4,10 +4,11 @@ Nouveau schéma avec OPERATION, CATEGORIE et SOUS_CATEGORIE
 
 Support multi-utilisateurs avec authentification JWT
 """
-from pydantic import BaseModel, ConfigDict, Field, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, model_validator
+from typing import Optional, List, Literal
 from decimal import Decimal
 from datetime import date as DateType, datetime
+from uuid import UUID
 
 
 # ==================== TYPE SCHEMAS ====================
@@ -118,6 +119,213 @@ class OperationResponse(OperationBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class OperationFilter(BaseModel):
+    """Critères de filtrage des opérations (tous optionnels, combinés par ET)"""
+    search: Optional[str] = Field(None, description="Recherche dans la description (insensible à la casse)")
+    date_debut: Optional[DateType] = Field(None, description="Date minimale incluse (YYYY-MM-DD)")
+    date_fin: Optional[DateType] = Field(None, description="Date maximale incluse (YYYY-MM-DD)")
+    montant_min: Optional[Decimal] = Field(None, description="Montant minimal inclus")
+    montant_max: Optional[Decimal] = Field(None, description="Montant maximal inclus")
+    idcompte: Optional[int] = Field(None, description="ID du compte")
+    idtype: Optional[int] = Field(None, description="ID du type d'opération")
+    idsouscategorie: Optional[int] = Field(None, description="ID de la sous-catégorie")
+    idcategorie: Optional[int] = Field(None, description="ID de la catégorie (toutes ses sous-catégories)")
+    sens: Optional[Literal["revenu", "depense"]] = Field(
+        None, description="revenu (montant > 0) ou depense (montant < 0)"
+    )
+
+
+class OperationSelection(BaseModel):
+    """
+    Sélection d'opérations pour les actions groupées : liste d'IDs et/ou filtre.
+    Si les deux sont fournis, seules les opérations satisfaisant les deux sont visées.
+    """
+    ids: Optional[List[int]] = Field(None, description="IDs des opérations visées")
+    filtre: Optional[OperationFilter] = Field(None, description="Filtre des opérations visées")
+
+    @model_validator(mode="after")
+    def verifier_selection(self):
+        """Refuse une sélection vide (évite de viser toutes les opérations par erreur)"""
+        filtre_vide = self.filtre is None or not self.filtre.model_dump(exclude_none=True)
+        if self.ids is None and filtre_vide:
+            raise ValueError("Fournir 'ids' ou un 'filtre' avec au moins un critère")
+        return self
+
+
+class OperationBulkUpdate(OperationSelection):
+    """Schéma pour la mise à jour groupée d'opérations"""
+    changements: OperationUpdate = Field(..., description="Champs à appliquer à toutes les opérations visées")
+
+    @model_validator(mode="after")
+    def verifier_changements(self):
+        """Refuse une mise à jour sans aucun champ"""
+        if not self.changements.model_dump(exclude_unset=True):
+            raise ValueError("Aucun champ à mettre à jour dans 'changements'")
+        return self
+
+
+class OperationBulkDelete(OperationSelection):
+    """Schéma pour la suppression groupée d'opérations"""
+    pass
+
+
+# ==================== STATISTIQUES MENSUELLES ====================
+
+class MonthlyStat(BaseModel):
+    """Agrégat mensuel issu de operation_monthly_rollup"""
+    mois: DateType
+    cle: Optional[int] = Field(None, description="ID du regroupement demandé (compte, catégorie, ...)")
+    total_revenus: Decimal
+    total_depenses: Decimal = Field(..., description="Total des dépenses (valeur positive)")
+    solde: Decimal
+    nb_operations: int
+
+
+# ==================== ANALYTICS ====================
+
+class SeriesPoint(BaseModel):
+    """Point d'une série temporelle (début de période)"""
+    periode: DateType
+    revenus: Decimal
+    depenses: Decimal = Field(..., description="Total des dépenses (valeur positive)")
+    net: Decimal
+
+
+class AnalyticsSeries(BaseModel):
+    """Série d'un regroupement (cle = ID de catégorie ou de compte, None si pas de regroupement)"""
+    cle: Optional[int] = None
+    points: List[SeriesPoint]
+
+
+class AnalyticsSeriesResponse(BaseModel):
+    """Réponse de GET /api/analytics/series"""
+    granularite: Literal["day", "week", "month", "year"]
+    nb_points_source: int = Field(..., description="Nombre de points avant sous-échantillonnage")
+    series: List[AnalyticsSeries]
+
+
+# ==================== BUDGET SCHEMAS ====================
+
+class BudgetBase(BaseModel):
+    """Schéma de base pour Budget (montant mensuel)"""
+    montant: Decimal = Field(..., ge=0, description="Budget mensuel")
+    alerte_seuil: Decimal = Field(Decimal("0.8"), ge=0, le=1, description="Seuil d'alerte (0.8 = 80 %)")
+    limite_stricte: bool = Field(False, description="Refuser les dépenses au-delà du budget")
+    actif: bool = True
+
+
+class BudgetCreate(BudgetBase):
+    """Schéma pour créer un budget de catégorie ou de sous-catégorie"""
+    idcategorie: Optional[int] = Field(None, description="ID de la catégorie (déduit de la sous-catégorie si absent)")
+    idsouscategorie: Optional[int] = Field(None, description="ID de la sous-catégorie (budget de catégorie si absent)")
+
+    @model_validator(mode="after")
+    def verifier_cible(self):
+        """Une catégorie ou une sous-catégorie doit être fournie"""
+        if self.idcategorie is None and self.idsouscategorie is None:
+            raise ValueError("Fournir 'idcategorie' ou 'idsouscategorie'")
+        return self
+
+
+class BudgetUpdate(BaseModel):
+    """Schéma pour mettre à jour un budget (tous les champs optionnels)"""
+    montant: Optional[Decimal] = Field(None, ge=0)
+    alerte_seuil: Optional[Decimal] = Field(None, ge=0, le=1)
+    limite_stricte: Optional[bool] = None
+    actif: Optional[bool] = None
+
+
+class BudgetResponse(BudgetBase):
+    """Schéma de réponse pour Budget"""
+    idbudget: int
+    idcategorie: int
+    idsouscategorie: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BudgetReportLine(BaseModel):
+    """Ligne du rapport budget / réel (niveau catégorie ou sous-catégorie)"""
+    niveau: Literal["categorie", "souscategorie"]
+    idcategorie: int
+    idsouscategorie: Optional[int] = None
+    idbudget: Optional[int] = None
+    budget: Optional[Decimal] = None
+    reel: Decimal = Field(..., description="Dépenses du mois (valeur positive)")
+    restant: Optional[Decimal] = None
+    pourcentage: Optional[float] = None
+    statut: Literal["ok", "warning", "over", "sans_budget"]
+
+
+class BudgetReport(BaseModel):
+    """Réponse de GET /api/budgets/report"""
+    mois: DateType
+    lignes: List[BudgetReportLine]
+
+
+class AlerteResponse(BaseModel):
+    """Alerte budgétaire (franchissement du seuil ou dépassement sur un mois)"""
+    idalerte: int
+    idbudget: int
+    mois: DateType
+    type: Literal["seuil", "depassement"]
+    consomme: Decimal
+    budget: Decimal
+    date_creation: datetime
+    lue: bool
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OperationChanges(BaseModel):
+    """Page de synchronisation incrémentale des opérations (GET /api/sync/operations)"""
+    curseur: int = Field(..., description="Curseur à conserver pour la prochaine synchronisation")
+    operations: List[OperationResponse] = Field(..., description="Opérations créées ou modifiées (état courant)")
+    supprimees: List[int] = Field(..., description="IDs des opérations supprimées")
+    suite: Optional[int] = Field(None, description="Valeur de `apres` pour la page suivante (None : dernière page)")
+
+
+class OperationWrite(BaseModel):
+    """
+    Écriture différée d'un client (file d'attente hors ligne), appliquée au plus une fois.
+    `avant` porte les valeurs connues du client pour les champs modifiés (update) ou pour
+    l'opération supprimée (delete) : un champ modifié entre-temps sur le serveur est un conflit.
+    """
+    cle: UUID = Field(..., description="Clé d'idempotence générée par le client")
+    action: Literal["create", "update", "delete"]
+    idoperation: Optional[int] = Field(None, description="ID de l'opération (update, delete)")
+    donnees: Optional[OperationUpdate] = Field(None, description="Valeurs écrites (create : tous les champs requis)")
+    avant: Optional[OperationUpdate] = Field(None, description="Valeurs connues du client avant l'écriture")
+
+    @model_validator(mode="after")
+    def verifier_action(self):
+        """Champs requis selon l'action"""
+        if self.action == "create" and self.donnees is None:
+            raise ValueError("create : 'donnees' est requis")
+        if self.action != "create" and self.idoperation is None:
+            raise ValueError(f"{self.action} : 'idoperation' est requis")
+        return self
+
+
+class OperationWriteBatch(BaseModel):
+    """Lot d'écritures différées, appliquées dans l'ordre"""
+    ecritures: List[OperationWrite] = Field(..., max_length=500)
+
+
+class OperationWriteResult(BaseModel):
+    """
+    Résultat d'une écriture différée :
+    - ok : appliquée (ou déjà appliquée sous la même clé) ;
+    - conflit : les champs modifiés entre-temps sur le serveur ont été conservés ;
+    - erreur : refusée (données invalides, budget strict dépassé...), rien n'a été écrit.
+    `operation` est l'état serveur après l'écriture (None si l'opération n'existe plus).
+    """
+    cle: UUID
+    statut: Literal["ok", "conflit", "erreur"]
+    operation: Optional[OperationResponse] = None
+    detail: Optional[str] = None
+
+
 # ==================== COMPTE SCHEMAS ====================
 
 class CompteBase(BaseModel):
@@ -182,6 +390,11 @@ class MessageResponse(BaseModel):
     success: bool = True
 
 
+class BulkResponse(MessageResponse):
+    """Réponse des actions groupées (nombre de lignes affectées)"""
+    count: int
+
+
 # ==================== RÉTRO-COMPATIBILITÉ (Transaction -> Operation) ====================
 # Alias pour assurer la rétro-compatibilité avec l'ancien code
 
@@ -49,7 +49,9 @@ engine = create_engine(
 )
 
 # Créer une session locale
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False : les objets renvoyés par UPDATE/INSERT ... RETURNING restent
+# utilisables après le commit sans SELECT de rafraîchissement supplémentaire
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base pour les modèles
 Base = declarative_base()
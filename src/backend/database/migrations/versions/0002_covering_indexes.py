@@ -0,0 +1,81 @@
+"""
+Index couvrants pour les requêtes réelles de l'API
+
+- liste triée par date (GET /api/operations?tri=-date) et agrégats par période :
+  (date DESC, idoperation) INCLUDE (montant, idcompte, idtype, idsouscategorie)
+- filtres compte / sous-catégorie / type + plage de dates, avec le montant inclus
+  pour les sommes en index-only scan
+- recherche ILIKE '%...%' sur la description : GIN pg_trgm
+- sous_categorie.idcategorie pour le filtre par catégorie et la politique RLS
+
+Tous les index sont créés avec CREATE INDEX CONCURRENTLY (hors transaction) :
+la migration peut tourner sur une base en production sans bloquer les écritures.
+
+Revision ID: 0002_covering_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002_covering_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+NEW_INDEXES = {
+    "idx_operation_date_couvrant":
+        "ON operation (date DESC, idoperation) INCLUDE (montant, idcompte, idtype, idsouscategorie)",
+    "idx_operation_compte_date": "ON operation (idcompte, date) INCLUDE (montant)",
+    "idx_operation_souscategorie_date": "ON operation (idsouscategorie, date) INCLUDE (montant)",
+    "idx_operation_type_date": "ON operation (idtype, date) INCLUDE (montant)",
+    "idx_operation_description_trgm": "ON operation USING gin (description gin_trgm_ops)",
+    "idx_sous_categorie_categorie": "ON sous_categorie (idcategorie) INCLUDE (idsouscategorie)",
+}
+
+# Index du schéma initial rendus redondants par les index couvrants
+OLD_INDEXES = {
+    "idx_operation_date": "ON operation (date)",
+    "idx_operation_compte": "ON operation (idcompte)",
+}
+
+
+def _drop_invalid_index(name: str) -> None:
+    """Supprime un index laissé INVALID par un CREATE INDEX CONCURRENTLY interrompu"""
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = '{name}' AND NOT i.indisvalid
+            ) THEN
+                EXECUTE 'DROP INDEX {name}';
+            END IF;
+        END $$;
+    """)
+
+
+def _create_indexes(indexes: dict) -> None:
+    for name, definition in indexes.items():
+        _drop_invalid_index(name)
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+
+
+def _drop_indexes(indexes: dict) -> None:
+    for name in indexes:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        _create_indexes(NEW_INDEXES)
+        _drop_indexes(OLD_INDEXES)
+        op.execute("ANALYZE operation")
+        op.execute("ANALYZE sous_categorie")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _create_indexes(OLD_INDEXES)
+        _drop_indexes(NEW_INDEXES)
@@ -0,0 +1,250 @@
+"""
+Partitionnement de OPERATION par plage de dates
+
+- operation devient une table partitionnée (PARTITION BY RANGE (date)) ;
+  la clé primaire devient (idoperation, date), idoperation reste unique via son identité
+- une partition par année ou par mois selon OPERATION_PARTITION_GRANULARITY
+  (year par défaut), plus une partition par défaut pour les dates hors plage
+- ensure_operation_partitions(debut, fin) crée les partitions manquantes
+  (appelée au démarrage de l'API et par scripts/manage_partitions.py)
+- les politiques RLS sont définies sur la table parente ; chaque partition a la RLS
+  activée sans politique, ce qui interdit tout accès direct qui contournerait le parent
+
+Les lignes existantes sont recopiées dans la nouvelle table : la migration verrouille
+operation pendant la copie et doit être lancée pendant une fenêtre de maintenance.
+
+Revision ID: 0003_partition_operation
+Revises: 0002_covering_indexes
+Create Date: 2026-10-18
+"""
+import os
+
+from alembic import op
+
+revision = "0003_partition_operation"
+down_revision = "0002_covering_indexes"
+branch_labels = None
+depends_on = None
+
+GRANULARITY = os.getenv("OPERATION_PARTITION_GRANULARITY", "year").lower()
+
+OPERATION_COLUMNS = "idoperation, date, description, montant, idcompte, idtype, idsouscategorie"
+
+INDEXES_SQL = """
+CREATE INDEX idx_operation_date_couvrant ON operation (date DESC, idoperation)
+  INCLUDE (montant, idcompte, idtype, idsouscategorie);
+CREATE INDEX idx_operation_compte_date ON operation (idcompte, date) INCLUDE (montant);
+CREATE INDEX idx_operation_souscategorie_date ON operation (idsouscategorie, date) INCLUDE (montant);
+CREATE INDEX idx_operation_type_date ON operation (idtype, date) INCLUDE (montant);
+CREATE INDEX idx_operation_description_trgm ON operation USING gin (description gin_trgm_ops);
+"""
+
+INDEX_NAMES = (
+    "idx_operation_date_couvrant",
+    "idx_operation_compte_date",
+    "idx_operation_souscategorie_date",
+    "idx_operation_type_date",
+    "idx_operation_description_trgm",
+)
+
+POLICIES_SQL = """
+ALTER TABLE operation ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY operation_select ON operation
+  FOR SELECT USING (
+    EXISTS (
+      SELECT 1 FROM compte c
+      WHERE c.idcompte = operation.idcompte
+      AND c.idutilisateur = current_setting('app.user_id', TRUE)::INTEGER
+    )
+  );
+
+CREATE POLICY operation_insert ON operation
+  FOR INSERT WITH CHECK (
+    EXISTS (
+      SELECT 1 FROM compte c
+      WHERE c.idcompte = operation.idcompte
+      AND c.idutilisateur = current_setting('app.user_id', TRUE)::INTEGER
+    )
+  );
+
+CREATE POLICY operation_update ON operation
+  FOR UPDATE USING (
+    EXISTS (
+      SELECT 1 FROM compte c
+      WHERE c.idcompte = operation.idcompte
+      AND c.idutilisateur = current_setting('app.user_id', TRUE)::INTEGER
+    )
+  );
+
+CREATE POLICY operation_delete ON operation
+  FOR DELETE USING (
+    EXISTS (
+      SELECT 1 FROM compte c
+      WHERE c.idcompte = operation.idcompte
+      AND c.idutilisateur = current_setting('app.user_id', TRUE)::INTEGER
+    )
+  );
+"""
+
+# Crée les partitions manquantes couvrant [p_debut, p_fin].
+# Les lignes déjà rangées dans la partition par défaut pour une nouvelle plage y sont
+# déplacées avant l'ATTACH (sinon PostgreSQL refuse la création de la partition).
+ENSURE_PARTITIONS_SQL = """
+CREATE OR REPLACE FUNCTION ensure_operation_partitions(p_debut DATE, p_fin DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_granularite TEXT;
+  v_pas INTERVAL;
+  v_debut DATE;
+  v_fin DATE;
+  v_nom TEXT;
+  v_crees INTEGER := 0;
+BEGIN
+  SELECT granularite INTO v_granularite FROM operation_partition_config;
+  IF v_granularite = 'month' THEN
+    v_pas := INTERVAL '1 month';
+  ELSE
+    v_pas := INTERVAL '1 year';
+  END IF;
+
+  v_debut := date_trunc(v_granularite, p_debut)::DATE;
+  WHILE v_debut <= p_fin LOOP
+    v_fin := (v_debut + v_pas)::DATE;
+    IF v_granularite = 'month' THEN
+      v_nom := 'operation_p' || to_char(v_debut, 'YYYY_MM');
+    ELSE
+      v_nom := 'operation_p' || to_char(v_debut, 'YYYY');
+    END IF;
+
+    IF to_regclass(v_nom) IS NULL THEN
+      EXECUTE format('CREATE TABLE %I (LIKE operation INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_nom);
+      EXECUTE format(
+        'WITH moved AS (DELETE FROM operation_defaut WHERE date >= %L AND date < %L RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved', v_debut, v_fin, v_nom
+      );
+      EXECUTE format('ALTER TABLE operation ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                     v_nom, v_debut, v_fin);
+      EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', v_nom);
+      v_crees := v_crees + 1;
+    END IF;
+
+    v_debut := v_fin;
+  END LOOP;
+
+  RETURN v_crees;
+END;
+$$;
+"""
+
+
+def _create_plain_operation_table(name: str) -> None:
+    op.execute(f"""
+        CREATE TABLE {name} (
+          idoperation INTEGER NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+          date DATE NOT NULL DEFAULT CURRENT_DATE,
+          description TEXT NOT NULL,
+          montant NUMERIC(10,2) NOT NULL,
+          idcompte INTEGER NOT NULL,
+          idtype INTEGER NOT NULL,
+          idsouscategorie INTEGER,
+          CONSTRAINT operation_pk PRIMARY KEY (idoperation),
+          CONSTRAINT operation_idcompte_fk FOREIGN KEY (idcompte)
+            REFERENCES compte (idcompte) ON DELETE RESTRICT,
+          CONSTRAINT operation_idtype_fk FOREIGN KEY (idtype)
+            REFERENCES type (idtype) ON DELETE RESTRICT,
+          CONSTRAINT operation_idsouscategorie_fk FOREIGN KEY (idsouscategorie)
+            REFERENCES sous_categorie (idsouscategorie) ON DELETE SET NULL
+        )
+    """)
+
+
+def _retire_old_table(old_name: str) -> None:
+    """Renomme l'ancienne table et libère les noms (index, PK, séquence) pour la nouvelle"""
+    op.execute(f"ALTER TABLE operation RENAME TO {old_name}")
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT operation_pk TO {old_name}_pk")
+    op.execute(f"""
+        DO $$
+        BEGIN
+          EXECUTE format('ALTER SEQUENCE %s RENAME TO {old_name}_idoperation_seq',
+                         pg_get_serial_sequence('{old_name}', 'idoperation'));
+        END $$;
+    """)
+    for index_name in INDEX_NAMES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def _copy_rows(source: str) -> None:
+    op.execute(f"INSERT INTO operation ({OPERATION_COLUMNS}) SELECT {OPERATION_COLUMNS} FROM {source}")
+    op.execute("""
+        SELECT setval(pg_get_serial_sequence('operation', 'idoperation'),
+                      COALESCE((SELECT max(idoperation) FROM operation), 0) + 1, false)
+    """)
+
+
+def upgrade() -> None:
+    if GRANULARITY not in ("year", "month"):
+        raise ValueError("OPERATION_PARTITION_GRANULARITY doit valoir 'year' ou 'month'")
+
+    op.execute("LOCK TABLE operation IN ACCESS EXCLUSIVE MODE")
+    _retire_old_table("operation_legacy")
+
+    op.execute("""
+        CREATE TABLE operation (
+          idoperation INTEGER NOT NULL GENERATED BY DEFAULT AS IDENTITY,
+          date DATE NOT NULL DEFAULT CURRENT_DATE,
+          description TEXT NOT NULL,
+          montant NUMERIC(10,2) NOT NULL,
+          idcompte INTEGER NOT NULL,
+          idtype INTEGER NOT NULL,
+          idsouscategorie INTEGER,
+          CONSTRAINT operation_pk PRIMARY KEY (idoperation, date),
+          CONSTRAINT operation_idcompte_fk FOREIGN KEY (idcompte)
+            REFERENCES compte (idcompte) ON DELETE RESTRICT,
+          CONSTRAINT operation_idtype_fk FOREIGN KEY (idtype)
+            REFERENCES type (idtype) ON DELETE RESTRICT,
+          CONSTRAINT operation_idsouscategorie_fk FOREIGN KEY (idsouscategorie)
+            REFERENCES sous_categorie (idsouscategorie) ON DELETE SET NULL
+        ) PARTITION BY RANGE (date)
+    """)
+    op.execute("CREATE TABLE operation_defaut PARTITION OF operation DEFAULT")
+    op.execute("ALTER TABLE operation_defaut ENABLE ROW LEVEL SECURITY")
+    op.execute(INDEXES_SQL)
+
+    op.execute("""
+        CREATE TABLE operation_partition_config (
+          granularite TEXT NOT NULL CHECK (granularite IN ('year', 'month'))
+        )
+    """)
+    op.execute(f"INSERT INTO operation_partition_config VALUES ('{GRANULARITY}')")
+    op.execute(ENSURE_PARTITIONS_SQL)
+
+    # Partitions couvrant l'historique existant et l'année à venir
+    op.execute("""
+        SELECT ensure_operation_partitions(
+          COALESCE((SELECT min(date) FROM operation_legacy), CURRENT_DATE),
+          (GREATEST(COALESCE((SELECT max(date) FROM operation_legacy), CURRENT_DATE), CURRENT_DATE)
+             + INTERVAL '1 year')::DATE
+        )
+    """)
+
+    _copy_rows("operation_legacy")
+    op.execute(POLICIES_SQL)
+    op.execute("DROP TABLE operation_legacy")
+    op.execute("ANALYZE operation")
+
+
+def downgrade() -> None:
+    op.execute("LOCK TABLE operation IN ACCESS EXCLUSIVE MODE")
+    _retire_old_table("operation_partitionnee")
+
+    _create_plain_operation_table("operation")
+    op.execute(INDEXES_SQL)
+    _copy_rows("operation_partitionnee")
+    op.execute(POLICIES_SQL)
+
+    op.execute("DROP TABLE operation_partitionnee CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS ensure_operation_partitions(DATE, DATE)")
+    op.execute("DROP TABLE IF EXISTS operation_partition_config")
@@ -0,0 +1,156 @@
+"""
+Table d'agrégats mensuels maintenue à l'écriture (operation_monthly_rollup)
+
+Une ligne par (utilisateur, compte, sous-catégorie, type, mois) avec le total des revenus,
+le total des dépenses (en valeur positive) et le nombre d'opérations.
+
+La table est maintenue par des triggers de niveau instruction sur operation : chaque
+INSERT / UPDATE / DELETE (unitaire ou groupé) applique ses deltas en un seul upsert,
+dans la même transaction que l'écriture. rebuild_operation_monthly_rollup() recalcule
+tout depuis operation (scripts/rebuild_rollup.py).
+
+Revision ID: 0004_operation_monthly_rollup
+Revises: 0003_partition_operation
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0004_operation_monthly_rollup"
+down_revision = "0003_partition_operation"
+branch_labels = None
+depends_on = None
+
+ROLLUP_TABLE_SQL = """
+CREATE TABLE operation_monthly_rollup (
+  idutilisateur INTEGER NOT NULL REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  idcompte INTEGER NOT NULL,
+  idsouscategorie INTEGER,
+  idtype INTEGER NOT NULL,
+  mois DATE NOT NULL,
+  total_revenus NUMERIC(14,2) NOT NULL DEFAULT 0,
+  total_depenses NUMERIC(14,2) NOT NULL DEFAULT 0,
+  nb_operations INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE UNIQUE INDEX operation_monthly_rollup_unq ON operation_monthly_rollup
+  (idutilisateur, idcompte, (COALESCE(idsouscategorie, 0)), idtype, mois);
+CREATE INDEX idx_rollup_utilisateur_mois ON operation_monthly_rollup (idutilisateur, mois);
+CREATE INDEX idx_rollup_vide ON operation_monthly_rollup (idutilisateur) WHERE nb_operations = 0;
+
+ALTER TABLE operation_monthly_rollup ENABLE ROW LEVEL SECURITY;
+CREATE POLICY operation_monthly_rollup_select ON operation_monthly_rollup
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+"""
+
+# Les tables de transition (new_rows, old_rows) ne sont visibles que dans la fonction
+# trigger elle-même et n'existent que pour les événements concernés : la source des
+# deltas (signe +1 / -1) est donc choisie selon TG_OP puis injectée dans un EXECUTE.
+TRIGGER_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION operation_rollup_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_source TEXT;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    v_source := 'SELECT idcompte, idsouscategorie, idtype, date, montant, 1 AS signe FROM new_rows';
+  ELSIF TG_OP = 'DELETE' THEN
+    v_source := 'SELECT idcompte, idsouscategorie, idtype, date, montant, -1 AS signe FROM old_rows';
+  ELSE
+    v_source := 'SELECT idcompte, idsouscategorie, idtype, date, montant, 1 AS signe FROM new_rows '
+             || 'UNION ALL '
+             || 'SELECT idcompte, idsouscategorie, idtype, date, montant, -1 AS signe FROM old_rows';
+  END IF;
+
+  EXECUTE format($q$
+    INSERT INTO operation_monthly_rollup AS r
+      (idutilisateur, idcompte, idsouscategorie, idtype, mois,
+       total_revenus, total_depenses, nb_operations)
+    SELECT c.idutilisateur, ch.idcompte, ch.idsouscategorie, ch.idtype,
+           date_trunc('month', ch.date)::DATE AS mois,
+           SUM(CASE WHEN ch.montant > 0 THEN ch.signe * ch.montant ELSE 0 END),
+           SUM(CASE WHEN ch.montant < 0 THEN -ch.signe * ch.montant ELSE 0 END),
+           SUM(ch.signe)
+    FROM (%s) ch
+    JOIN compte c ON c.idcompte = ch.idcompte
+    GROUP BY 1, 2, 3, 4, 5
+    ORDER BY 1, 2, 3, 4, 5
+    ON CONFLICT (idutilisateur, idcompte, (COALESCE(idsouscategorie, 0)), idtype, mois)
+    DO UPDATE SET total_revenus = r.total_revenus + EXCLUDED.total_revenus,
+                  total_depenses = r.total_depenses + EXCLUDED.total_depenses,
+                  nb_operations = r.nb_operations + EXCLUDED.nb_operations
+  $q$, v_source);
+
+  -- Lignes devenues vides (index partiel : pas de parcours complet)
+  IF TG_OP <> 'INSERT' THEN
+    DELETE FROM operation_monthly_rollup WHERE nb_operations = 0;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER operation_rollup_insert
+  AFTER INSERT ON operation
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_rollup_trigger();
+
+CREATE TRIGGER operation_rollup_update
+  AFTER UPDATE ON operation
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_rollup_trigger();
+
+CREATE TRIGGER operation_rollup_delete
+  AFTER DELETE ON operation
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_rollup_trigger();
+"""
+
+REBUILD_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION rebuild_operation_monthly_rollup()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_lignes INTEGER;
+BEGIN
+  LOCK TABLE operation IN SHARE MODE;
+  DELETE FROM operation_monthly_rollup;
+
+  INSERT INTO operation_monthly_rollup
+    (idutilisateur, idcompte, idsouscategorie, idtype, mois,
+     total_revenus, total_depenses, nb_operations)
+  SELECT c.idutilisateur, o.idcompte, o.idsouscategorie, o.idtype,
+         date_trunc('month', o.date)::DATE,
+         COALESCE(SUM(o.montant) FILTER (WHERE o.montant > 0), 0),
+         COALESCE(-SUM(o.montant) FILTER (WHERE o.montant < 0), 0),
+         COUNT(*)
+  FROM operation o
+  JOIN compte c ON c.idcompte = o.idcompte
+  GROUP BY 1, 2, 3, 4, 5;
+
+  GET DIAGNOSTICS v_lignes = ROW_COUNT;
+  RETURN v_lignes;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute(ROLLUP_TABLE_SQL)
+    op.execute(TRIGGER_FUNCTION_SQL)
+    op.execute(REBUILD_FUNCTION_SQL)
+    op.execute("SELECT rebuild_operation_monthly_rollup()")
+
+
+def downgrade() -> None:
+    for trigger in ("operation_rollup_insert", "operation_rollup_update", "operation_rollup_delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON operation")
+    op.execute("DROP FUNCTION IF EXISTS operation_rollup_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS rebuild_operation_monthly_rollup()")
+    op.execute("DROP TABLE IF EXISTS operation_monthly_rollup")
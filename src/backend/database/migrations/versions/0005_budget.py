@@ -0,0 +1,61 @@
+"""
+Budgets mensuels par catégorie et sous-catégorie
+
+Un budget s'applique chaque mois. idcategorie est toujours renseigné (catégorie parente
+pour un budget de sous-catégorie) ; idsouscategorie est NULL pour un budget de catégorie.
+
+Revision ID: 0005_budget
+Revises: 0004_operation_monthly_rollup
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0005_budget"
+down_revision = "0004_operation_monthly_rollup"
+branch_labels = None
+depends_on = None
+
+BUDGET_SQL = """
+CREATE TABLE budget (
+  idbudget INTEGER NOT NULL GENERATED ALWAYS AS IDENTITY,
+  idutilisateur INTEGER NOT NULL,
+  idcategorie INTEGER NOT NULL,
+  idsouscategorie INTEGER,
+  montant NUMERIC(10,2) NOT NULL CHECK (montant >= 0),
+  alerte_seuil NUMERIC(4,3) NOT NULL DEFAULT 0.8 CHECK (alerte_seuil BETWEEN 0 AND 1),
+  limite_stricte BOOLEAN NOT NULL DEFAULT FALSE,
+  actif BOOLEAN NOT NULL DEFAULT TRUE,
+  CONSTRAINT budget_pk PRIMARY KEY (idbudget),
+  CONSTRAINT budget_idutilisateur_fk FOREIGN KEY (idutilisateur)
+    REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  CONSTRAINT budget_idcategorie_fk FOREIGN KEY (idcategorie)
+    REFERENCES categorie (idcategorie) ON DELETE CASCADE,
+  CONSTRAINT budget_idsouscategorie_fk FOREIGN KEY (idsouscategorie)
+    REFERENCES sous_categorie (idsouscategorie) ON DELETE CASCADE
+);
+
+-- Un seul budget par catégorie et par sous-catégorie
+CREATE UNIQUE INDEX budget_cible_unq ON budget (idutilisateur, idcategorie, (COALESCE(idsouscategorie, 0)));
+
+ALTER TABLE budget ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY budget_select ON budget
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+CREATE POLICY budget_insert ON budget
+  FOR INSERT WITH CHECK (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+CREATE POLICY budget_update ON budget
+  FOR UPDATE USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+CREATE POLICY budget_delete ON budget
+  FOR DELETE USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+"""
+
+
+def upgrade() -> None:
+    op.execute(BUDGET_SQL)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS budget")
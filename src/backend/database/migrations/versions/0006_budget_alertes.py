@@ -0,0 +1,254 @@
+"""
+Moteur d'alertes budgétaires incrémental
+
+- budget_consommation : dépenses mensuelles cumulées par catégorie et par sous-catégorie,
+  mises à jour par un trigger ligne sur operation_monthly_rollup (elle-même maintenue à
+  chaque écriture sur operation). Chaque écriture coûte O(1) : deux upserts et deux
+  lectures de budget par index unique.
+- alerte_budget : événements de franchissement (seuil d'alerte, dépassement), une seule
+  fois par budget, mois et type. Le client interroge les alertes postérieures à la
+  dernière reçue (GET /api/alertes?depuis=...), sans parcours global.
+- limite_stricte : une écriture qui ferait dépasser un budget strict est refusée
+  (SQLSTATE BU001, traduit en HTTP 409 par l'API).
+
+Revision ID: 0006_budget_alertes
+Revises: 0005_budget
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0006_budget_alertes"
+down_revision = "0005_budget"
+branch_labels = None
+depends_on = None
+
+TABLES_SQL = """
+CREATE TABLE budget_consommation (
+  idutilisateur INTEGER NOT NULL REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  idcategorie INTEGER NOT NULL,
+  idsouscategorie INTEGER,
+  mois DATE NOT NULL,
+  total_depenses NUMERIC(14,2) NOT NULL DEFAULT 0
+);
+
+CREATE UNIQUE INDEX budget_consommation_unq ON budget_consommation
+  (idutilisateur, idcategorie, (COALESCE(idsouscategorie, 0)), mois);
+
+ALTER TABLE budget_consommation ENABLE ROW LEVEL SECURITY;
+CREATE POLICY budget_consommation_select ON budget_consommation
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+
+CREATE TABLE alerte_budget (
+  idalerte BIGINT NOT NULL GENERATED ALWAYS AS IDENTITY,
+  idutilisateur INTEGER NOT NULL REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  idbudget INTEGER NOT NULL REFERENCES budget (idbudget) ON DELETE CASCADE,
+  mois DATE NOT NULL,
+  type VARCHAR(20) NOT NULL CHECK (type IN ('seuil', 'depassement')),
+  consomme NUMERIC(14,2) NOT NULL,
+  budget NUMERIC(10,2) NOT NULL,
+  date_creation TIMESTAMPTZ NOT NULL DEFAULT now(),
+  lue BOOLEAN NOT NULL DEFAULT FALSE,
+  CONSTRAINT alerte_budget_pk PRIMARY KEY (idalerte),
+  CONSTRAINT alerte_budget_unq UNIQUE (idbudget, mois, type)
+);
+
+CREATE INDEX idx_alerte_utilisateur ON alerte_budget (idutilisateur, idalerte);
+
+ALTER TABLE alerte_budget ENABLE ROW LEVEL SECURITY;
+CREATE POLICY alerte_budget_select ON alerte_budget
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+CREATE POLICY alerte_budget_update ON alerte_budget
+  FOR UPDATE USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+CREATE POLICY alerte_budget_delete ON alerte_budget
+  FOR DELETE USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+"""
+
+FUNCTIONS_SQL = """
+-- Applique un delta de dépenses à une cible (sous-catégorie, ou catégorie si p_idsouscategorie
+-- est NULL) puis compare l'ancien et le nouveau total au budget de cette cible
+CREATE OR REPLACE FUNCTION budget_consommation_apply(
+  p_idutilisateur INTEGER, p_idcategorie INTEGER, p_idsouscategorie INTEGER,
+  p_mois DATE, p_delta NUMERIC
+)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_nouveau NUMERIC;
+  v_ancien NUMERIC;
+  v_budget budget%ROWTYPE;
+BEGIN
+  INSERT INTO budget_consommation AS c (idutilisateur, idcategorie, idsouscategorie, mois, total_depenses)
+  VALUES (p_idutilisateur, p_idcategorie, p_idsouscategorie, p_mois, p_delta)
+  ON CONFLICT (idutilisateur, idcategorie, (COALESCE(idsouscategorie, 0)), mois)
+  DO UPDATE SET total_depenses = c.total_depenses + EXCLUDED.total_depenses
+  RETURNING c.total_depenses INTO v_nouveau;
+  v_ancien := v_nouveau - p_delta;
+
+  SELECT * INTO v_budget FROM budget
+  WHERE idutilisateur = p_idutilisateur
+    AND idcategorie = p_idcategorie
+    AND COALESCE(idsouscategorie, 0) = COALESCE(p_idsouscategorie, 0)
+    AND actif;
+  IF NOT FOUND OR p_delta <= 0 THEN
+    RETURN;
+  END IF;
+
+  IF v_budget.limite_stricte AND v_nouveau > v_budget.montant THEN
+    RAISE EXCEPTION 'Budget % dépassé : % / %', v_budget.idbudget, v_nouveau, v_budget.montant
+      USING ERRCODE = 'BU001';
+  END IF;
+
+  IF v_ancien < v_budget.montant * v_budget.alerte_seuil
+     AND v_nouveau >= v_budget.montant * v_budget.alerte_seuil THEN
+    INSERT INTO alerte_budget (idutilisateur, idbudget, mois, type, consomme, budget)
+    VALUES (p_idutilisateur, v_budget.idbudget, p_mois, 'seuil', v_nouveau, v_budget.montant)
+    ON CONFLICT DO NOTHING;
+  END IF;
+
+  IF v_ancien <= v_budget.montant AND v_nouveau > v_budget.montant THEN
+    INSERT INTO alerte_budget (idutilisateur, idbudget, mois, type, consomme, budget)
+    VALUES (p_idutilisateur, v_budget.idbudget, p_mois, 'depassement', v_nouveau, v_budget.montant)
+    ON CONFLICT DO NOTHING;
+  END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION budget_consommation_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_ligne operation_monthly_rollup%ROWTYPE;
+  v_delta NUMERIC;
+  v_idcategorie INTEGER;
+BEGIN
+  -- Reconstruction complète en cours : budget_consommation est recalculée en bloc
+  IF current_setting('app.rollup_rebuild', TRUE) = 'on' THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'INSERT' THEN
+    v_ligne := NEW;
+    v_delta := NEW.total_depenses;
+  ELSIF TG_OP = 'DELETE' THEN
+    v_ligne := OLD;
+    v_delta := -OLD.total_depenses;
+  ELSE
+    v_ligne := NEW;
+    v_delta := NEW.total_depenses - OLD.total_depenses;
+  END IF;
+
+  IF v_delta = 0 OR v_ligne.idsouscategorie IS NULL THEN
+    RETURN NULL;
+  END IF;
+
+  SELECT idcategorie INTO v_idcategorie FROM sous_categorie
+  WHERE idsouscategorie = v_ligne.idsouscategorie;
+  IF NOT FOUND THEN
+    RETURN NULL;
+  END IF;
+
+  PERFORM budget_consommation_apply(v_ligne.idutilisateur, v_idcategorie, v_ligne.idsouscategorie,
+                                    v_ligne.mois, v_delta);
+  PERFORM budget_consommation_apply(v_ligne.idutilisateur, v_idcategorie, NULL,
+                                    v_ligne.mois, v_delta);
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER budget_consommation_maj
+  AFTER INSERT OR UPDATE OR DELETE ON operation_monthly_rollup
+  FOR EACH ROW EXECUTE FUNCTION budget_consommation_trigger();
+
+-- Reconstruction : agrégats mensuels puis consommation des budgets (sans générer d'alertes)
+CREATE OR REPLACE FUNCTION rebuild_operation_monthly_rollup()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_lignes INTEGER;
+BEGIN
+  LOCK TABLE operation IN SHARE MODE;
+  PERFORM set_config('app.rollup_rebuild', 'on', TRUE);
+  DELETE FROM operation_monthly_rollup;
+
+  INSERT INTO operation_monthly_rollup
+    (idutilisateur, idcompte, idsouscategorie, idtype, mois,
+     total_revenus, total_depenses, nb_operations)
+  SELECT c.idutilisateur, o.idcompte, o.idsouscategorie, o.idtype,
+         date_trunc('month', o.date)::DATE,
+         COALESCE(SUM(o.montant) FILTER (WHERE o.montant > 0), 0),
+         COALESCE(-SUM(o.montant) FILTER (WHERE o.montant < 0), 0),
+         COUNT(*)
+  FROM operation o
+  JOIN compte c ON c.idcompte = o.idcompte
+  GROUP BY 1, 2, 3, 4, 5;
+  GET DIAGNOSTICS v_lignes = ROW_COUNT;
+
+  DELETE FROM budget_consommation;
+  INSERT INTO budget_consommation (idutilisateur, idcategorie, idsouscategorie, mois, total_depenses)
+  SELECT r.idutilisateur, sc.idcategorie, r.idsouscategorie, r.mois, SUM(r.total_depenses)
+  FROM operation_monthly_rollup r
+  JOIN sous_categorie sc ON sc.idsouscategorie = r.idsouscategorie
+  GROUP BY GROUPING SETS ((r.idutilisateur, sc.idcategorie, r.idsouscategorie, r.mois),
+                          (r.idutilisateur, sc.idcategorie, r.mois));
+
+  PERFORM set_config('app.rollup_rebuild', 'off', TRUE);
+  RETURN v_lignes;
+END;
+$$;
+"""
+
+# Version de la migration 0004 (sans budget_consommation), restaurée au downgrade
+PREVIOUS_REBUILD_SQL = """
+CREATE OR REPLACE FUNCTION rebuild_operation_monthly_rollup()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_lignes INTEGER;
+BEGIN
+  LOCK TABLE operation IN SHARE MODE;
+  DELETE FROM operation_monthly_rollup;
+
+  INSERT INTO operation_monthly_rollup
+    (idutilisateur, idcompte, idsouscategorie, idtype, mois,
+     total_revenus, total_depenses, nb_operations)
+  SELECT c.idutilisateur, o.idcompte, o.idsouscategorie, o.idtype,
+         date_trunc('month', o.date)::DATE,
+         COALESCE(SUM(o.montant) FILTER (WHERE o.montant > 0), 0),
+         COALESCE(-SUM(o.montant) FILTER (WHERE o.montant < 0), 0),
+         COUNT(*)
+  FROM operation o
+  JOIN compte c ON c.idcompte = o.idcompte
+  GROUP BY 1, 2, 3, 4, 5;
+
+  GET DIAGNOSTICS v_lignes = ROW_COUNT;
+  RETURN v_lignes;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute(TABLES_SQL)
+    op.execute(FUNCTIONS_SQL)
+    op.execute("SELECT rebuild_operation_monthly_rollup()")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS budget_consommation_maj ON operation_monthly_rollup")
+    op.execute("DROP FUNCTION IF EXISTS budget_consommation_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS budget_consommation_apply(INTEGER, INTEGER, INTEGER, DATE, NUMERIC)")
+    op.execute(PREVIOUS_REBUILD_SQL)
+    op.execute("DROP TABLE IF EXISTS alerte_budget")
+    op.execute("DROP TABLE IF EXISTS budget_consommation")
@@ -0,0 +1,105 @@
+"""
+Journal des modifications d'opérations (synchronisation incrémentale des clients)
+
+operation_journal garde une ligne par opération écrite : identifiant, utilisateur, état
+(supprimée ou non) et transaction de la dernière écriture (xid8). Elle est maintenue par
+des triggers de niveau instruction sur operation, dans la même transaction que l'écriture ;
+une nouvelle écriture remplace la ligne précédente (le journal reste compact).
+
+Curseur de synchronisation : xmin de l'instantané courant (pg_snapshot_xmin). Toute
+transaction invisible lors d'une synchronisation a un xid supérieur ou égal à ce xmin :
+en demandant les lignes de xid >= curseur, aucun changement validé plus tard n'est
+manqué (quitte à renvoyer plusieurs fois une opération, ce qui est sans effet).
+
+Revision ID: 0007_operation_journal
+Revises: 0006_budget_alertes
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0007_operation_journal"
+down_revision = "0006_budget_alertes"
+branch_labels = None
+depends_on = None
+
+JOURNAL_TABLE_SQL = """
+CREATE TABLE operation_journal (
+  idoperation INTEGER NOT NULL,
+  idutilisateur INTEGER NOT NULL REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  supprime BOOLEAN NOT NULL DEFAULT FALSE,
+  xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+  CONSTRAINT operation_journal_pk PRIMARY KEY (idoperation)
+);
+
+CREATE INDEX idx_operation_journal_xid ON operation_journal (xid);
+
+ALTER TABLE operation_journal ENABLE ROW LEVEL SECURITY;
+CREATE POLICY operation_journal_select ON operation_journal
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+"""
+
+# Même principe que operation_rollup_trigger (0004) : la table de transition est choisie
+# selon TG_OP puis injectée dans un EXECUTE
+TRIGGER_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION operation_journal_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_source TEXT;
+  v_supprime BOOLEAN;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    v_source := 'old_rows';
+    v_supprime := TRUE;
+  ELSE
+    v_source := 'new_rows';
+    v_supprime := FALSE;
+  END IF;
+
+  EXECUTE format($q$
+    INSERT INTO operation_journal AS j (idoperation, idutilisateur, supprime)
+    SELECT ch.idoperation, c.idutilisateur, %L
+    FROM %I ch
+    JOIN compte c ON c.idcompte = ch.idcompte
+    ORDER BY ch.idoperation
+    ON CONFLICT (idoperation)
+    DO UPDATE SET idutilisateur = EXCLUDED.idutilisateur,
+                  supprime = EXCLUDED.supprime,
+                  xid = pg_current_xact_id()
+  $q$, v_supprime, v_source);
+
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER operation_journal_insert
+  AFTER INSERT ON operation
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_journal_trigger();
+
+CREATE TRIGGER operation_journal_update
+  AFTER UPDATE ON operation
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_journal_trigger();
+
+CREATE TRIGGER operation_journal_delete
+  AFTER DELETE ON operation
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION operation_journal_trigger();
+"""
+
+
+def upgrade() -> None:
+    op.execute(JOURNAL_TABLE_SQL)
+    op.execute(TRIGGER_FUNCTION_SQL)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS operation_journal_delete ON operation")
+    op.execute("DROP TRIGGER IF EXISTS operation_journal_update ON operation")
+    op.execute("DROP TRIGGER IF EXISTS operation_journal_insert ON operation")
+    op.execute("DROP FUNCTION IF EXISTS operation_journal_trigger()")
+    op.execute("DROP TABLE IF EXISTS operation_journal")
@@ -0,0 +1,45 @@
+"""
+Clés d'idempotence des écritures différées (file d'attente hors ligne des clients)
+
+Chaque écriture envoyée par POST /api/sync/operations porte une clé (UUID) générée par le
+client. La clé est enregistrée dans la même transaction que l'écriture : une écriture
+rejouée (réponse perdue, nouvel essai) est reconnue et n'est pas appliquée deux fois.
+
+Revision ID: 0008_ecriture_idempotente
+Revises: 0007_operation_journal
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0008_ecriture_idempotente"
+down_revision = "0007_operation_journal"
+branch_labels = None
+depends_on = None
+
+TABLE_SQL = """
+CREATE TABLE ecriture_idempotente (
+  idutilisateur INTEGER NOT NULL REFERENCES utilisateur (idutilisateur) ON DELETE CASCADE,
+  cle UUID NOT NULL,
+  idoperation INTEGER,
+  date_creation TIMESTAMPTZ NOT NULL DEFAULT now(),
+  CONSTRAINT ecriture_idempotente_pk PRIMARY KEY (idutilisateur, cle)
+);
+
+CREATE INDEX idx_ecriture_idempotente_date ON ecriture_idempotente (date_creation);
+
+ALTER TABLE ecriture_idempotente ENABLE ROW LEVEL SECURITY;
+CREATE POLICY ecriture_idempotente_select ON ecriture_idempotente
+  FOR SELECT USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+CREATE POLICY ecriture_idempotente_insert ON ecriture_idempotente
+  FOR INSERT WITH CHECK (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+CREATE POLICY ecriture_idempotente_update ON ecriture_idempotente
+  FOR UPDATE USING (idutilisateur = current_setting('app.user_id', TRUE)::INTEGER);
+"""
+
+
+def upgrade() -> None:
+    op.execute(TABLE_SQL)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS ecriture_idempotente")
@@ -0,0 +1,53 @@
+"""
+Recalcul de la consommation des budgets de l'utilisateur courant
+
+Le trigger de budget_consommation lit la catégorie d'une sous-catégorie au moment où
+l'agrégat mensuel change. Déplacer une sous-catégorie vers une autre catégorie, ou la
+supprimer (ses opérations passent à NULL), laisse donc les totaux de catégorie périmés.
+rebuild_budget_consommation() les recalcule depuis operation_monthly_rollup pour
+l'utilisateur de app.user_id ; l'API l'appelle dans la transaction de ces écritures.
+
+Revision ID: 0009_consommation_utilisateur
+Revises: 0008_ecriture_idempotente
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0009_consommation_utilisateur"
+down_revision = "0008_ecriture_idempotente"
+branch_labels = None
+depends_on = None
+
+FUNCTION_SQL = """
+-- Consommation de l'utilisateur courant recalculée en bloc (sans générer d'alertes)
+CREATE OR REPLACE FUNCTION rebuild_budget_consommation()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_idutilisateur INTEGER := current_setting('app.user_id', TRUE)::INTEGER;
+BEGIN
+  -- Attend les écritures en cours sur la consommation et bloque les suivantes jusqu'au commit
+  LOCK TABLE budget_consommation IN SHARE ROW EXCLUSIVE MODE;
+  DELETE FROM budget_consommation WHERE idutilisateur = v_idutilisateur;
+
+  INSERT INTO budget_consommation (idutilisateur, idcategorie, idsouscategorie, mois, total_depenses)
+  SELECT r.idutilisateur, sc.idcategorie, r.idsouscategorie, r.mois, SUM(r.total_depenses)
+  FROM operation_monthly_rollup r
+  JOIN sous_categorie sc ON sc.idsouscategorie = r.idsouscategorie
+  WHERE r.idutilisateur = v_idutilisateur
+  GROUP BY GROUPING SETS ((r.idutilisateur, sc.idcategorie, r.idsouscategorie, r.mois),
+                          (r.idutilisateur, sc.idcategorie, r.mois));
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute(FUNCTION_SQL)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS rebuild_budget_consommation()")
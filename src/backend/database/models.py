@@ -2,7 +2,8 @@
 Modèles SQLAlchemy pour la base de données PostgreSQL Budget_app
 Nouveau schéma avec CATEGORIE/SOUS_CATEGORIE séparées et gestion multi-utilisateurs (RLS)
 """
-from sqlalchemy import Column, Integer, String, Numeric, Date, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Numeric, Date, ForeignKey, Boolean, DateTime, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from src.backend.database.connection import Base
@@ -38,6 +39,9 @@ class Type(Base):
     Représente le type d'une opération (depense, revenu, transfert)
     """
     __tablename__ = "type"
+    __table_args__ = (
+        UniqueConstraint('nom', 'idutilisateur', name='nom_type_par_user_unq'),
+    )
 
     idtype = Column(Integer, primary_key=True, index=True, autoincrement=True)
     nom = Column(String(50), nullable=False)
@@ -57,6 +61,9 @@ class Compte(Base):
     Représente un compte bancaire
     """
     __tablename__ = "compte"
+    __table_args__ = (
+        UniqueConstraint('nom', 'idutilisateur', name='nom_compte_par_user_unq'),
+    )
 
     idcompte = Column(Integer, primary_key=True, index=True, autoincrement=True)
     nom = Column(String, nullable=False)
@@ -78,6 +85,9 @@ class Categorie(Base):
     Représente une catégorie principale (Alimentation, Transport, etc.)
     """
     __tablename__ = "categorie"
+    __table_args__ = (
+        UniqueConstraint('nomcategorie', 'idutilisateur', name='nomcategorie_par_user_unq'),
+    )
 
     idcategorie = Column(Integer, primary_key=True, index=True, autoincrement=True)
     nomcategorie = Column(String(50), nullable=False)
@@ -97,6 +107,10 @@ class SousCategorie(Base):
     Représente une sous-catégorie (Courses, Restaurant, etc.)
     """
     __tablename__ = "sous_categorie"
+    __table_args__ = (
+        UniqueConstraint('nomsouscategorie', 'idcategorie', name='sous_cat_unique'),
+        Index('idx_sous_categorie_categorie', 'idcategorie', postgresql_include=['idsouscategorie']),
+    )
 
     idsouscategorie = Column(Integer, primary_key=True, index=True, autoincrement=True)
     nomsouscategorie = Column(String(50), nullable=False)
@@ -116,6 +130,21 @@ class Operation(Base):
     Représente une opération financière
     """
     __tablename__ = "operation"
+    # Table partitionnée par plage de dates (migration 0003_partition_operation).
+    # En base la clé primaire est (idoperation, date) ; idoperation reste unique
+    # (identité) et sert seul de clé côté ORM.
+    __table_args__ = (
+        # Index couvrants alignés sur les filtres, le tri et les agrégats de l'API
+        # (créés par la migration 0002_covering_indexes)
+        Index('idx_operation_date_couvrant', text('date DESC'), 'idoperation',
+              postgresql_include=['montant', 'idcompte', 'idtype', 'idsouscategorie']),
+        Index('idx_operation_compte_date', 'idcompte', 'date', postgresql_include=['montant']),
+        Index('idx_operation_souscategorie_date', 'idsouscategorie', 'date', postgresql_include=['montant']),
+        Index('idx_operation_type_date', 'idtype', 'date', postgresql_include=['montant']),
+        Index('idx_operation_description_trgm', 'description', postgresql_using='gin',
+              postgresql_ops={'description': 'gin_trgm_ops'}),
+        {'postgresql_partition_by': 'RANGE (date)'},
+    )
 
     idoperation = Column(Integer, primary_key=True, index=True, autoincrement=True)
     date = Column(Date, nullable=False)
@@ -132,3 +161,116 @@ class Operation(Base):
 
     def __repr__(self):
         return f"<Operation(id={self.idoperation}, montant={self.montant}, type={self.idtype}, description='{self.description}')>"
+
+
+class OperationMonthlyRollup(Base):
+    """
+    Modèle pour la table 'operation_monthly_rollup'
+    Agrégats mensuels des opérations, maintenus par triggers (migration 0004_operation_monthly_rollup)
+    Lecture seule côté application
+    """
+    __tablename__ = "operation_monthly_rollup"
+
+    idutilisateur = Column(Integer, ForeignKey('utilisateur.idutilisateur', ondelete='CASCADE'), primary_key=True)
+    idcompte = Column(Integer, primary_key=True)
+    idsouscategorie = Column(Integer, primary_key=True, nullable=True)
+    idtype = Column(Integer, primary_key=True)
+    mois = Column(Date, primary_key=True)
+    total_revenus = Column(Numeric(14, 2), nullable=False, default=0)
+    total_depenses = Column(Numeric(14, 2), nullable=False, default=0)
+    nb_operations = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<OperationMonthlyRollup(user={self.idutilisateur}, compte={self.idcompte}, mois={self.mois}, nb={self.nb_operations})>"
+
+
+class Budget(Base):
+    """
+    Modèle pour la table 'budget'
+    Budget mensuel d'une catégorie (idsouscategorie NULL) ou d'une sous-catégorie
+    """
+    __tablename__ = "budget"
+    __table_args__ = (
+        Index('budget_cible_unq', 'idutilisateur', 'idcategorie', text('COALESCE(idsouscategorie, 0)'), unique=True),
+    )
+
+    idbudget = Column(Integer, primary_key=True, autoincrement=True)
+    idutilisateur = Column(Integer, ForeignKey('utilisateur.idutilisateur', ondelete='CASCADE'), nullable=False)
+    idcategorie = Column(Integer, ForeignKey('categorie.idcategorie', ondelete='CASCADE'), nullable=False)
+    idsouscategorie = Column(Integer, ForeignKey('sous_categorie.idsouscategorie', ondelete='CASCADE'), nullable=True)
+    montant = Column(Numeric(10, 2), nullable=False)
+    alerte_seuil = Column(Numeric(4, 3), nullable=False, default=0.8)
+    limite_stricte = Column(Boolean, nullable=False, default=False)
+    actif = Column(Boolean, nullable=False, default=True)
+
+    def __repr__(self):
+        return f"<Budget(id={self.idbudget}, categorie={self.idcategorie}, sous_categorie={self.idsouscategorie}, montant={self.montant})>"
+
+
+class BudgetConsommation(Base):
+    """
+    Modèle pour la table 'budget_consommation'
+    Dépenses mensuelles cumulées par catégorie (idsouscategorie NULL) et par sous-catégorie,
+    maintenues par trigger (migration 0006_budget_alertes). Lecture seule côté application
+    """
+    __tablename__ = "budget_consommation"
+
+    idutilisateur = Column(Integer, ForeignKey('utilisateur.idutilisateur', ondelete='CASCADE'), primary_key=True)
+    idcategorie = Column(Integer, primary_key=True)
+    idsouscategorie = Column(Integer, primary_key=True, nullable=True)
+    mois = Column(Date, primary_key=True)
+    total_depenses = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class AlerteBudget(Base):
+    """
+    Modèle pour la table 'alerte_budget'
+    Franchissement du seuil d'alerte ou dépassement d'un budget sur un mois
+    """
+    __tablename__ = "alerte_budget"
+
+    idalerte = Column(BigInteger, primary_key=True, autoincrement=True)
+    idutilisateur = Column(Integer, ForeignKey('utilisateur.idutilisateur', ondelete='CASCADE'), nullable=False)
+    idbudget = Column(Integer, ForeignKey('budget.idbudget', ondelete='CASCADE'), nullable=False)
+    mois = Column(Date, nullable=False)
+    type = Column(String(20), nullable=False)
+    consomme = Column(Numeric(14, 2), nullable=False)
+    budget = Column(Numeric(10, 2), nullable=False)
+    date_creation = Column(DateTime(timezone=True), server_default=func.now())
+    lue = Column(Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f"<AlerteBudget(id={self.idalerte}, budget={self.idbudget}, mois={self.mois}, type='{self.type}')>"
+
+
+class OperationJournal(Base):
+    """
+    Modèle pour la table 'operation_journal'
+    Dernière écriture de chaque opération (supprimée ou non), maintenue par triggers
+    (migration 0007_operation_journal). Lecture seule côté application ; la colonne xid
+    (type xid8, transaction de l'écriture) n'est lue qu'en SQL textuel (crud.get_operation_changes)
+    """
+    __tablename__ = "operation_journal"
+
+    idoperation = Column(Integer, primary_key=True)
+    idutilisateur = Column(Integer, ForeignKey('utilisateur.idutilisateur', ondelete='CASCADE'), nullable=False)
+    supprime = Column(Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f"<OperationJournal(operation={self.idoperation}, supprime={self.supprime})>"
+
+
+class EcritureIdempotente(Base):
+    """
+    Modèle pour la table 'ecriture_idempotente'
+    Clés des écritures différées déjà appliquées (migration 0008_ecriture_idempotente)
+    """
+    __tablename__ = "ecriture_idempotente"
+
+    idutilisateur = Column(Integer, ForeignKey('utilisateur.idutilisateur', ondelete='CASCADE'), primary_key=True)
+    cle = Column(UUID(as_uuid=True), primary_key=True)
+    idoperation = Column(Integer, nullable=True)
+    date_creation = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<EcritureIdempotente(cle={self.cle}, operation={self.idoperation})>"
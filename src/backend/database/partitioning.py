@@ -0,0 +1,92 @@
+"""
+Gestion des partitions de la table OPERATION (partitionnement par plage de dates)
+
+La table est partitionnée par la migration 0003_partition_operation. Ce module :
+- crée à l'avance les partitions des périodes à venir (au démarrage de l'API)
+- liste les partitions existantes
+- détache une partition ancienne pour l'archiver (puis la supprimer ou la sauvegarder)
+
+Configuration :
+    OPERATION_PARTITION_GRANULARITY=year   # ou month (lu par la migration)
+    OPERATION_PARTITIONS_AHEAD=2           # nombre de périodes futures à préparer
+"""
+import os
+from datetime import date
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from src.backend.database.connection import engine
+
+OPERATION_PARTITIONS_AHEAD = int(os.getenv("OPERATION_PARTITIONS_AHEAD", "2"))
+
+
+def _add_months(day: date, months: int) -> date:
+    """Ajoute un nombre de mois à une date (ramenée au 1er du mois)"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_granularity() -> str:
+    """Retourne la granularité configurée en base ('year' ou 'month')"""
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT granularite FROM operation_partition_config")).scalar_one()
+
+
+def ensure_future_partitions(ahead: int = OPERATION_PARTITIONS_AHEAD) -> int:
+    """
+    Crée les partitions manquantes de la période courante et des `ahead` suivantes
+
+    Returns:
+        Nombre de partitions créées (0 si la table n'est pas partitionnée)
+    """
+    try:
+        months = 12 if get_granularity() == "year" else 1
+        today = date.today()
+        fin = _add_months(today, months * ahead)
+        with engine.begin() as conn:
+            return conn.execute(
+                text("SELECT ensure_operation_partitions(:debut, :fin)"),
+                {"debut": today, "fin": fin}
+            ).scalar_one()
+    except DBAPIError as e:
+        print(f"⚠️  Partitions OPERATION non vérifiées (migration 0003 appliquée ?): {e.orig}")
+        return 0
+
+
+def list_partitions() -> List[Dict[str, str]]:
+    """Liste les partitions de OPERATION avec leurs bornes et leur nombre de lignes estimé"""
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT c.relname AS nom,
+                   pg_get_expr(c.relpartbound, c.oid) AS bornes,
+                   c.reltuples::BIGINT AS lignes_estimees
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'operation'::regclass
+            ORDER BY c.relname
+        """)).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def detach_partition(name: str, archive_name: str = None) -> None:
+    """
+    Détache une partition de OPERATION (opération de métadonnées, quasi instantanée)
+
+    La partition devient une table autonome (renommée en `archive_name` si fourni),
+    qui peut ensuite être sauvegardée (pg_dump -t) puis supprimée.
+    DETACH ... CONCURRENTLY n'est pas utilisable ici car la table a une partition par défaut.
+
+    Raises:
+        ValueError: si `name` n'est pas une partition de OPERATION ou si `archive_name` est invalide
+    """
+    if name == "operation_defaut" or name not in {p["nom"] for p in list_partitions()}:
+        raise ValueError(f"Partition inconnue: {name}")
+    if archive_name is not None and not archive_name.isidentifier():
+        raise ValueError(f"Nom d'archive invalide: {archive_name}")
+
+    with engine.begin() as conn:
+        conn.execute(text(f'ALTER TABLE operation DETACH PARTITION "{name}"'))
+        if archive_name:
+            conn.execute(text(f'ALTER TABLE "{name}" RENAME TO "{archive_name}"'))
@@ -4,29 +4,76 @@ API REST connectée à PostgreSQL via SQLAlchemy
 Mis à jour pour le nouveau schéma avec Operation, Categorie et SousCategorie
 Support multi-utilisateurs avec Row-Level Security (RLS)
 """
+import asyncio
 import os
-from datetime import timedelta
-from fastapi import FastAPI, Depends, HTTPException, status
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from src.backend.database.connection import get_db, test_connection, set_user_context
 from src.backend.database import models
+from src.backend.database import partitioning
 from src.backend.services import crud
 from src.backend.services import auth
+from src.backend.services import batching
+from src.backend.services import analytics
+from src.backend.services import http_cache
 from src.backend.api import schemas
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Cycle de vie de l'application :
+    prépare les partitions OPERATION à venir au démarrage, vide le coalesceur d'écritures à l'arrêt
+    """
+    await asyncio.to_thread(partitioning.ensure_future_partitions)
+    yield
+    await batching.operation_coalescer.close()
+
+
 # Initialisation de l'application FastAPI
 app = FastAPI(
     title="Budget API",
     description="API REST pour gérer les opérations, comptes, catégories et sous-catégories budgétaires avec authentification multi-utilisateurs",
-    version="3.0.0"
+    version="3.0.0",
+    lifespan=lifespan
 )
 
+# Erreur levée par la base quand une écriture dépasserait un budget en limite stricte
+BUDGET_STRICT_SQLSTATE = "BU001"
+
+# Codes SQLSTATE PostgreSQL traduits en réponse HTTP
+SQLSTATE_STATUS = {
+    BUDGET_STRICT_SQLSTATE: status.HTTP_409_CONFLICT,
+    "23505": status.HTTP_409_CONFLICT,      # unique_violation (nom déjà pris)
+    "23503": status.HTTP_400_BAD_REQUEST,   # foreign_key_violation (référence inexistante)
+}
+
+
+@app.exception_handler(DBAPIError)
+async def database_error_handler(request: Request, exc: DBAPIError):
+    """
+    Traduit le refus d'un budget en limite stricte et les violations d'unicité en 409,
+    les violations de clé étrangère en 400, laisse remonter les autres erreurs
+    """
+    status_code = SQLSTATE_STATUS.get(getattr(exc.orig, "pgcode", None))
+    if status_code is None:
+        raise exc
+    return JSONResponse(status_code=status_code, content={"detail": exc.orig.diag.message_primary})
+
+
+# ETag / Cache-Control sur les réponses GET (revalidation 304 par le client)
+app.add_middleware(http_cache.ETagMiddleware)
+
 # Configuration CORS pour permettre les appels depuis l'app Flet
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
 
@@ -210,19 +257,95 @@ async def get_statistics(db: Session = Depends(auth.get_db_with_rls)):
     return stats
 
 
+@app.get("/api/stats/mensuel", response_model=List[schemas.MonthlyStat])
+async def get_monthly_statistics(
+        date_debut: Optional[date] = None,
+        date_fin: Optional[date] = None,
+        idcompte: Optional[int] = None,
+        par: Optional[Literal["compte", "categorie", "souscategorie", "type"]] = None,
+        db: Session = Depends(auth.get_db_with_rls)
+):
+    """
+    Revenus, dépenses et solde par mois (optionnellement par compte, catégorie, sous-catégorie ou type).
+    Lu dans la table d'agrégats operation_monthly_rollup, sans parcourir les opérations.
+    Exemple: /api/stats/mensuel?date_debut=2024-01-01&date_fin=2024-12-31&par=categorie
+    """
+    return crud.get_monthly_stats(db, date_debut=date_debut, date_fin=date_fin, idcompte=idcompte, par=par)
+
+
+# ==================== ENDPOINTS ANALYTICS (avec RLS) ====================
+
+@app.get("/api/analytics/series", response_model=schemas.AnalyticsSeriesResponse)
+async def get_analytics_series(
+        granularite: Literal["day", "week", "month", "year"] = "month",
+        date_debut: Optional[date] = None,
+        date_fin: Optional[date] = None,
+        par: Optional[Literal["categorie", "compte"]] = None,
+        max_points: int = Query(500, ge=3, le=5000),
+        db: Session = Depends(auth.get_db_with_rls)
+):
+    """
+    Séries revenus / dépenses / net agrégées par jour, semaine, mois ou année,
+    optionnellement une série par catégorie ou par compte, réduites à max_points (LTTB).
+    Exemple: /api/analytics/series?granularite=week&date_debut=2015-01-01&max_points=300
+    """
+    return analytics.get_series(
+        db, granularite=granularite, date_debut=date_debut, date_fin=date_fin,
+        par=par, max_points=max_points
+    )
+
+
 # ==================== ENDPOINTS OPERATIONS (avec RLS) ====================
 
 @app.get("/api/operations", response_model=List[schemas.OperationResponse])
 async def read_operations(
-        search: str = None,
+        filters: schemas.OperationFilter = Depends(),
+        tri: str = "-date",
         skip: int = 0,
         limit: int = 100,
+        apres: Optional[int] = None,
+        jusqua: Optional[int] = None,
         db: Session = Depends(auth.get_db_with_rls)
 ):
-    """Récupère toutes les opérations de l'utilisateur avec pagination et recherche optionnelle"""
-    if search:
-        return crud.search_operations(db, search, skip, limit)
-    return crud.get_operations(db, skip=skip, limit=limit)
+    """
+    Récupère les opérations de l'utilisateur avec filtres, tri multi-clés et pagination.
+    Exemple: /api/operations?date_debut=2024-01-01&sens=depense&idcategorie=3&tri=-montant,date
+
+    Pagination par clé (listes complètes) : tri=idoperation&apres=<dernier ID reçu>, bornée
+    par jusqua (ID maximal inclus). Une suppression entre deux pages ne décale pas la suite.
+    """
+    try:
+        return crud.get_operations(db, skip=skip, limit=limit, filters=filters, tri=tri, apres=apres, jusqua=jusqua)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.patch("/api/operations", response_model=schemas.BulkResponse)
+async def bulk_update_operations(
+        bulk: schemas.OperationBulkUpdate,
+        db: Session = Depends(auth.get_db_with_rls)
+):
+    """
+    Met à jour en une seule requête SQL les opérations sélectionnées par IDs et/ou filtre.
+    Exemple: {"ids": [1, 2, 3], "changements": {"idsouscategorie": 7}}
+    """
+    count = crud.bulk_update_operations(db, bulk)
+    if count is None:
+        raise HTTPException(status_code=400, detail="Compte, type ou sous-catégorie invalide")
+    return {"message": f"{count} opération(s) mise(s) à jour", "success": True, "count": count}
+
+
+@app.delete("/api/operations", response_model=schemas.BulkResponse)
+async def bulk_delete_operations(
+        bulk: schemas.OperationBulkDelete,
+        db: Session = Depends(auth.get_db_with_rls)
+):
+    """
+    Supprime en une seule requête SQL les opérations sélectionnées par IDs et/ou filtre.
+    Exemple: {"filtre": {"date_debut": "2024-03-01", "date_fin": "2024-03-01", "search": "import"}}
+    """
+    count = crud.bulk_delete_operations(db, bulk)
+    return {"message": f"{count} opération(s) supprimée(s)", "success": True, "count": count}
 
 
 @app.get("/api/operations/{operation_id}", response_model=schemas.OperationResponse)
@@ -237,9 +360,20 @@ async def read_operation(operation_id: int, db: Session = Depends(auth.get_db_wi
 @app.post("/api/operations", response_model=schemas.OperationResponse, status_code=status.HTTP_201_CREATED)
 async def create_operation(
         operation: schemas.OperationCreate,
+        current_user: models.Utilisateur = Depends(auth.get_current_user),
         db: Session = Depends(auth.get_db_with_rls)
 ):
-    """Crée une nouvelle opération"""
+    """
+    Crée une nouvelle opération.
+    Si OPERATION_BATCH_ENABLED est actif, les créations concurrentes sont regroupées
+    en une seule insertion multi-lignes et un seul commit ; la session de la requête
+    est alors libérée avant l'attente, le coalesceur écrivant avec sa propre session.
+    """
+    if batching.OPERATION_BATCH_ENABLED:
+        idutilisateur = current_user.idutilisateur
+        db.close()
+        return await batching.operation_coalescer.submit(idutilisateur, operation.model_dump())
+
     return crud.create_operation(db=db, operation=operation)
 
 
@@ -294,13 +428,9 @@ async def create_compte(
         db: Session = Depends(auth.get_db_with_rls)
 ):
     """Crée un nouveau compte pour l'utilisateur connecté"""
-    # Ajouter l'ID utilisateur au compte
-    compte_data = compte.model_dump()
-    compte_data["idutilisateur"] = current_user.idutilisateur
-    db_compte = models.Compte(**compte_data)
-    db.add(db_compte)
-    db.commit()
-    db.refresh(db_compte)
+    db_compte = crud.create_compte(db, compte, idutilisateur=current_user.idutilisateur)
+    if db_compte is None:
+        raise HTTPException(status_code=400, detail="Ce compte existe déjà")
     return db_compte
 
 
@@ -369,19 +499,10 @@ async def create_categorie(
         db: Session = Depends(auth.get_db_with_rls)
 ):
     """Crée une nouvelle catégorie pour l'utilisateur connecté"""
-    # Vérifier si la catégorie existe déjà pour cet utilisateur
-    existing = crud.get_categorie_by_nom(db, nom_categorie=categorie.nomcategorie)
-    if existing:
+    # L'unicité (nomcategorie, idutilisateur) est garantie par ON CONFLICT DO NOTHING
+    db_categorie = crud.create_categorie(db, categorie, idutilisateur=current_user.idutilisateur)
+    if db_categorie is None:
         raise HTTPException(status_code=400, detail="Cette catégorie existe déjà")
-
-    # Créer avec l'ID utilisateur
-    db_categorie = models.Categorie(
-        nomcategorie=categorie.nomcategorie,
-        idutilisateur=current_user.idutilisateur
-    )
-    db.add(db_categorie)
-    db.commit()
-    db.refresh(db_categorie)
     return db_categorie
 
 
@@ -394,7 +515,7 @@ async def update_categorie(
     """Met à jour une catégorie existante"""
     updated_categorie = crud.update_categorie(db, categorie_id, categorie)
     if updated_categorie is None:
-        raise HTTPException(status_code=404, detail="Catégorie non trouvée ou conflit de nom")
+        raise HTTPException(status_code=404, detail="Catégorie non trouvée")
     return updated_categorie
 
 
@@ -447,7 +568,10 @@ async def create_sous_categorie(
     if not categorie:
         raise HTTPException(status_code=404, detail="Catégorie parente non trouvée")
 
-    return crud.create_sous_categorie(db=db, sous_categorie=sous_categorie)
+    db_sous_categorie = crud.create_sous_categorie(db=db, sous_categorie=sous_categorie)
+    if db_sous_categorie is None:
+        raise HTTPException(status_code=400, detail="Cette sous-catégorie existe déjà")
+    return db_sous_categorie
 
 
 @app.put("/api/sous-categories/{sous_categorie_id}", response_model=schemas.SousCategorieResponse)
@@ -464,7 +588,7 @@ async def update_sous_categorie(
 
     updated_sous_categorie = crud.update_sous_categorie(db, sous_categorie_id, sous_categorie)
     if updated_sous_categorie is None:
-        raise HTTPException(status_code=404, detail="Sous-catégorie non trouvée ou conflit de nom")
+        raise HTTPException(status_code=404, detail="Sous-catégorie non trouvée")
     return updated_sous_categorie
 
 
@@ -511,15 +635,10 @@ async def create_type(
         db: Session = Depends(auth.get_db_with_rls)
 ):
     """Crée un nouveau type d'opération pour l'utilisateur connecté"""
-    # Vérifie si le type existe déjà pour cet utilisateur
-    existing = crud.get_type_by_nom(db, nom=type_data.nom)
-    if existing:
+    # L'unicité (nom, idutilisateur) est garantie par ON CONFLICT DO NOTHING
+    db_type = crud.create_type(db, type_data, idutilisateur=current_user.idutilisateur)
+    if db_type is None:
         raise HTTPException(status_code=400, detail="Ce type existe déjà")
-
-    db_type = models.Type(nom=type_data.nom, idutilisateur=current_user.idutilisateur)
-    db.add(db_type)
-    db.commit()
-    db.refresh(db_type)
     return db_type
 
 
@@ -545,6 +664,131 @@ async def delete_type(type_id: int, db: Session = Depends(auth.get_db_with_rls))
     return {"message": "Type supprimé avec succès", "success": True}
 
 
+# ==================== ENDPOINTS BUDGETS (avec RLS) ====================
+
+@app.get("/api/budgets", response_model=List[schemas.BudgetResponse])
+async def read_budgets(db: Session = Depends(auth.get_db_with_rls)):
+    """Récupère tous les budgets mensuels de l'utilisateur"""
+    return crud.get_budgets(db)
+
+
+@app.get("/api/budgets/report", response_model=schemas.BudgetReport)
+async def read_budget_report(
+        mois: Optional[date] = None,
+        db: Session = Depends(auth.get_db_with_rls)
+):
+    """
+    Budget, réel, restant et statut du mois (mois courant par défaut) pour chaque catégorie
+    et sous-catégorie, calculés en une seule requête GROUPING SETS sur les agrégats mensuels.
+    Exemple: /api/budgets/report?mois=2024-03-01
+    """
+    return crud.get_budget_report(db, mois or date.today())
+
+
+@app.post("/api/budgets", response_model=schemas.BudgetResponse, status_code=status.HTTP_201_CREATED)
+async def create_budget(
+        budget: schemas.BudgetCreate,
+        current_user: models.Utilisateur = Depends(auth.get_current_user),
+        db: Session = Depends(auth.get_db_with_rls)
+):
+    """Crée le budget mensuel d'une catégorie ou d'une sous-catégorie"""
+    # La sous-catégorie détermine la catégorie (RLS vérifie qu'elle appartient à l'utilisateur)
+    if budget.idsouscategorie is not None:
+        sous_categorie = crud.get_sous_categorie(db, sous_categorie_id=budget.idsouscategorie)
+        if not sous_categorie:
+            raise HTTPException(status_code=404, detail="Sous-catégorie non trouvée")
+        if budget.idcategorie not in (None, sous_categorie.idcategorie):
+            raise HTTPException(status_code=400, detail="La sous-catégorie n'appartient pas à cette catégorie")
+        budget.idcategorie = sous_categorie.idcategorie
+    elif not crud.get_categorie(db, categorie_id=budget.idcategorie):
+        raise HTTPException(status_code=404, detail="Catégorie non trouvée")
+
+    db_budget = crud.create_budget(db, budget, idutilisateur=current_user.idutilisateur)
+    if db_budget is None:
+        raise HTTPException(status_code=400, detail="Un budget existe déjà pour cette cible")
+    return db_budget
+
+
+@app.put("/api/budgets/{budget_id}", response_model=schemas.BudgetResponse)
+async def update_budget(
+        budget_id: int,
+        budget: schemas.BudgetUpdate,
+        db: Session = Depends(auth.get_db_with_rls)
+):
+    """Met à jour un budget existant"""
+    updated_budget = crud.update_budget(db, budget_id, budget)
+    if updated_budget is None:
+        raise HTTPException(status_code=404, detail="Budget non trouvé")
+    return updated_budget
+
+
+@app.delete("/api/budgets/{budget_id}", response_model=schemas.MessageResponse)
+async def delete_budget(budget_id: int, db: Session = Depends(auth.get_db_with_rls)):
+    """Supprime un budget"""
+    success = crud.delete_budget(db, budget_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Budget non trouvé")
+    return {"message": "Budget supprimé avec succès", "success": True}
+
+
+# ==================== ENDPOINTS ALERTES (avec RLS) ====================
+
+@app.get("/api/alertes", response_model=List[schemas.AlerteResponse])
+async def read_alertes(
+        depuis: Optional[int] = None,
+        non_lues: bool = False,
+        limit: int = Query(100, ge=1, le=1000),
+        db: Session = Depends(auth.get_db_with_rls)
+):
+    """
+    Alertes budgétaires de l'utilisateur, générées à l'écriture des opérations.
+    Pour interroger périodiquement : passer l'ID de la dernière alerte reçue.
+    Exemple: /api/alertes?depuis=42
+    """
+    return crud.get_alertes(db, depuis=depuis, non_lues=non_lues, limit=limit)
+
+
+@app.put("/api/alertes/{alerte_id}/lue", response_model=schemas.AlerteResponse)
+async def mark_alerte_lue(alerte_id: int, db: Session = Depends(auth.get_db_with_rls)):
+    """Marque une alerte comme lue"""
+    alerte = crud.mark_alerte_lue(db, alerte_id)
+    if alerte is None:
+        raise HTTPException(status_code=404, detail="Alerte non trouvée")
+    return alerte
+
+
+# ==================== ENDPOINT SYNCHRONISATION (avec RLS) ====================
+
+@app.get("/api/sync/operations", response_model=schemas.OperationChanges)
+async def read_operation_changes(
+        depuis: Optional[int] = None,
+        apres: int = 0,
+        limit: int = Query(1000, ge=1, le=10000),
+        db: Session = Depends(auth.get_db_with_rls)
+):
+    """
+    Synchronisation incrémentale : opérations modifiées ou supprimées depuis `depuis`.
+    Sans `depuis`, renvoie seulement le curseur courant (à demander avant un chargement complet).
+    Garder le curseur de la première page ; tant que `suite` est renseigné, redemander avec apres=suite.
+    Exemple: /api/sync/operations?depuis=7421
+    """
+    return crud.get_operation_changes(db, depuis=depuis, apres=apres, limit=limit)
+
+
+@app.post("/api/sync/operations", response_model=List[schemas.OperationWriteResult])
+async def write_operation_batch(
+        lot: schemas.OperationWriteBatch,
+        current_user: models.Utilisateur = Depends(auth.get_current_user),
+        db: Session = Depends(auth.get_db_with_rls)
+):
+    """
+    Applique un lot d'écritures différées (file d'attente hors ligne du client), dans l'ordre.
+    Chaque écriture porte une clé d'idempotence : renvoyer le même lot est sans effet.
+    Un résultat par écriture : ok, conflit (valeurs du serveur conservées) ou erreur.
+    """
+    return crud.apply_operation_writes(db, lot.ecritures, current_user.idutilisateur)
+
+
 # ==================== POINT D'ENTRÉE ====================
 
 if __name__ == "__main__":
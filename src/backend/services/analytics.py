@@ -0,0 +1,189 @@
+"""
+Séries temporelles pour les graphiques (GET /api/analytics/series)
+
+Les opérations sont agrégées en SQL par période (date_trunc) :
+- mois / année : lus dans la table d'agrégats operation_monthly_rollup
+- jour / semaine : agrégés depuis operation (les bornes de dates limitent les partitions lues)
+
+Chaque série est ensuite réduite à `max_points` points avec l'algorithme LTTB
+(Largest-Triangle-Three-Buckets), qui conserve la forme visuelle de la courbe.
+"""
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Date, Integer, case, cast, func, literal, literal_column, select
+from sqlalchemy.orm import Session
+
+from src.backend.database import models
+
+GRANULARITES = ("day", "week", "month", "year")
+
+
+def lttb(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    """
+    Sous-échantillonnage Largest-Triangle-Three-Buckets
+
+    Args:
+        x: Abscisses croissantes
+        y: Ordonnées
+        threshold: Nombre de points à conserver (>= 3)
+
+    Returns:
+        Indices des points conservés (toujours le premier et le dernier)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    indices = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Moyenne du bucket suivant (le dernier point pour le dernier bucket)
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+
+        # Point du bucket courant formant le plus grand triangle avec a et la moyenne suivante
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+
+        indices.append(best)
+        a = best
+
+    indices.append(n - 1)
+    return indices
+
+
+def _downsample(points: List[Dict], max_points: int) -> List[Dict]:
+    """Réduit une série à max_points points (LTTB sur le solde net, revenus/dépenses suivent)"""
+    if len(points) <= max_points:
+        return points
+    x = [p["periode"].toordinal() for p in points]
+    y = [float(p["net"]) for p in points]
+    return [points[i] for i in lttb(x, y, max_points)]
+
+
+def _unit(granularite: str):
+    """Unité date_trunc en littéral SQL (identique dans SELECT et GROUP BY, valeur déjà validée)"""
+    return literal_column(f"'{granularite}'")
+
+
+def _rollup_query(granularite: str, par: Optional[str]):
+    """Agrégation par mois / année depuis operation_monthly_rollup"""
+    rollup = models.OperationMonthlyRollup
+    periode = cast(func.date_trunc(_unit(granularite), rollup.mois), Date)
+    if par == "categorie":
+        cle = models.SousCategorie.idcategorie
+    elif par == "compte":
+        cle = rollup.idcompte
+    else:
+        cle = literal(None, Integer)
+
+    query = select(
+        periode.label("periode"),
+        cle.label("cle"),
+        func.sum(rollup.total_revenus).label("revenus"),
+        func.sum(rollup.total_depenses).label("depenses"),
+    )
+    if par == "categorie":
+        query = query.outerjoin(
+            models.SousCategorie, models.SousCategorie.idsouscategorie == rollup.idsouscategorie
+        )
+    return query, rollup.mois, periode, cle
+
+
+def _operation_query(granularite: str, par: Optional[str]):
+    """Agrégation par jour / semaine depuis operation"""
+    operation = models.Operation
+    periode = cast(func.date_trunc(_unit(granularite), operation.date), Date)
+    if par == "categorie":
+        cle = models.SousCategorie.idcategorie
+    elif par == "compte":
+        cle = operation.idcompte
+    else:
+        cle = literal(None, Integer)
+
+    query = select(
+        periode.label("periode"),
+        cle.label("cle"),
+        func.coalesce(func.sum(case((operation.montant > 0, operation.montant))), 0).label("revenus"),
+        func.coalesce(-func.sum(case((operation.montant < 0, operation.montant))), 0).label("depenses"),
+    )
+    if par == "categorie":
+        query = query.outerjoin(
+            models.SousCategorie, models.SousCategorie.idsouscategorie == operation.idsouscategorie
+        )
+    return query, operation.date, periode, cle
+
+
+def get_series(
+    db: Session,
+    granularite: str = "month",
+    date_debut: Optional[date] = None,
+    date_fin: Optional[date] = None,
+    par: Optional[str] = None,
+    max_points: int = 500
+) -> Dict:
+    """
+    Séries revenus / dépenses / net agrégées par période
+
+    Args:
+        granularite: 'day', 'week', 'month' ou 'year'
+        date_debut: Date minimale incluse
+        date_fin: Date maximale incluse
+        par: Une série par 'categorie' ou par 'compte' (une seule série si None)
+        max_points: Nombre maximal de points par série
+
+    Returns:
+        {"granularite", "nb_points_source", "series": [{"cle", "points": [...]}]}
+
+    Raises:
+        ValueError: si la granularité est inconnue
+    """
+    if granularite not in GRANULARITES:
+        raise ValueError(f"Granularité inconnue: {granularite} (attendu: {', '.join(GRANULARITES)})")
+
+    if granularite in ("month", "year"):
+        query, date_column, periode, cle = _rollup_query(granularite, par)
+        if date_debut is not None:
+            date_debut = date_debut.replace(day=1)
+    else:
+        query, date_column, periode, cle = _operation_query(granularite, par)
+
+    if date_debut is not None:
+        query = query.where(date_column >= date_debut)
+    if date_fin is not None:
+        query = query.where(date_column <= date_fin)
+
+    group_by = [cle, periode] if par else [periode]
+    query = query.group_by(*group_by).order_by(*group_by)
+
+    series: Dict[Optional[int], List[Dict]] = {}
+    nb_points_source = 0
+    for row in db.execute(query):
+        series.setdefault(row.cle, []).append({
+            "periode": row.periode,
+            "revenus": row.revenus,
+            "depenses": row.depenses,
+            "net": row.revenus - row.depenses,
+        })
+        nb_points_source += 1
+
+    return {
+        "granularite": granularite,
+        "nb_points_source": nb_points_source,
+        "series": [
+            {"cle": cle_value, "points": _downsample(points, max_points)}
+            for cle_value, points in series.items()
+        ],
+    }
@@ -0,0 +1,192 @@
+"""
+Regroupement des écritures (group commit) pour les créations d'opérations concurrentes
+
+Sous charge, chaque POST /api/operations est une transaction distincte avec son propre
+commit (et son propre fsync côté PostgreSQL). Le coalesceur collecte les créations
+unitaires arrivant pendant quelques millisecondes, les insère en une seule requête
+multi-lignes dans une seule transaction, puis renvoie à chaque appelant sa ligne créée
+ou son erreur. Le contrat de l'API est inchangé.
+
+Activation (désactivé par défaut) :
+    OPERATION_BATCH_ENABLED=true
+    OPERATION_BATCH_WINDOW_MS=5      # fenêtre de collecte
+    OPERATION_BATCH_MAX_SIZE=500     # taille maximale d'un lot
+"""
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from src.backend.database.connection import SessionLocal
+from src.backend.database import models
+
+OPERATION_BATCH_ENABLED = os.getenv("OPERATION_BATCH_ENABLED", "False").lower() == "true"
+OPERATION_BATCH_WINDOW_MS = float(os.getenv("OPERATION_BATCH_WINDOW_MS", "5"))
+OPERATION_BATCH_MAX_SIZE = int(os.getenv("OPERATION_BATCH_MAX_SIZE", "500"))
+
+# (idutilisateur, valeurs de l'opération)
+BatchItem = Tuple[int, Dict[str, Any]]
+
+# Marqueur d'arrêt déposé dans la file par close()
+_STOP = object()
+
+
+def _set_local_user_context(db: Session, user_id: int) -> None:
+    """Définit app.user_id pour la transaction courante uniquement (SET LOCAL)"""
+    db.execute(text("SELECT set_config('app.user_id', :user_id, true)"), {"user_id": str(user_id)})
+
+
+def insert_operations_batch(items: Sequence[BatchItem]) -> List[Any]:
+    """
+    Insère un lot d'opérations en une seule transaction.
+
+    Les lignes sont regroupées par utilisateur pour que la politique RLS d'insertion
+    s'applique avec le bon contexte. Si l'insertion multi-lignes échoue (une ligne
+    invalide suffit), le lot est rejoué ligne par ligne sous SAVEPOINT afin d'isoler
+    les erreurs, toujours avec un seul commit.
+
+    Args:
+        items: Liste de (idutilisateur, valeurs)
+
+    Returns:
+        Pour chaque élément, dans l'ordre : dict de la ligne créée ou l'exception levée
+    """
+    results: List[Any] = [None] * len(items)
+    indices_by_user: Dict[int, List[int]] = {}
+    for index, (user_id, _) in enumerate(items):
+        indices_by_user.setdefault(user_id, []).append(index)
+
+    table = models.Operation.__table__
+    db = SessionLocal()
+    try:
+        try:
+            for user_id, indices in indices_by_user.items():
+                _set_local_user_context(db, user_id)
+                stmt = insert(table).returning(*table.c, sort_by_parameter_order=True)
+                rows = db.execute(stmt, [items[i][1] for i in indices]).all()
+                for index, row in zip(indices, rows):
+                    results[index] = dict(row._mapping)
+            db.commit()
+            return results
+        except DBAPIError:
+            db.rollback()
+
+        # Repli : une ligne par SAVEPOINT pour attribuer chaque erreur à son appelant
+        for user_id, indices in indices_by_user.items():
+            _set_local_user_context(db, user_id)
+            for index in indices:
+                try:
+                    with db.begin_nested():
+                        row = db.execute(insert(table).returning(*table.c), items[index][1]).one()
+                    results[index] = dict(row._mapping)
+                except DBAPIError as exc:
+                    results[index] = exc
+        db.commit()
+        return results
+    finally:
+        db.close()
+
+
+class OperationWriteCoalescer:
+    """
+    Coalesceur asynchrone des créations d'opérations
+
+    Chaque appel à submit() attend le résultat de son lot. Un seul lot est écrit à la
+    fois : pendant qu'un lot est en cours d'écriture, les requêtes suivantes
+    s'accumulent et formeront le lot suivant.
+    """
+
+    def __init__(self,
+                 writer: Callable[[Sequence[BatchItem]], List[Any]] = insert_operations_batch,
+                 window_ms: float = OPERATION_BATCH_WINDOW_MS,
+                 max_batch_size: int = OPERATION_BATCH_MAX_SIZE):
+        """
+        Args:
+            writer: Fonction (synchrone) qui écrit un lot et renvoie un résultat par élément
+            window_ms: Durée de collecte d'un lot en millisecondes
+            max_batch_size: Nombre maximal d'éléments par lot
+        """
+        self._writer = writer
+        self._window = max(0.0, window_ms) / 1000
+        self._max_batch_size = max(1, max_batch_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, idutilisateur: int, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Soumet une création d'opération et attend son résultat.
+
+        Returns:
+            La ligne créée (dict des colonnes de la table operation)
+
+        Raises:
+            L'exception levée par la base pour cette ligne
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((idutilisateur, values, future))
+        return await future
+
+    def _ensure_started(self) -> None:
+        """Démarre la tâche de fond sur la boucle courante au premier appel"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        """Boucle de collecte : un lot par fenêtre ou dès que max_batch_size est atteint"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = loop.time() + self._window
+
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list) -> None:
+        """Écrit un lot dans un thread et distribue les résultats aux appelants"""
+        items = [(user_id, values) for user_id, values, _ in batch]
+        try:
+            results = await asyncio.to_thread(self._writer, items)
+        except Exception as exc:
+            results = [exc] * len(batch)
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():  # Appelant annulé (client déconnecté)
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Écrit les éléments encore en attente puis arrête la tâche de fond"""
+        if self._worker is None or self._worker.done():
+            return
+
+        await self._queue.put(_STOP)
+        await self._worker
+        self._worker = None
+
+
+# Instance partagée par l'application FastAPI
+operation_coalescer = OperationWriteCoalescer()
@@ -1,13 +1,97 @@
 """
 Opérations CRUD (Create, Read, Update, Delete) pour la base de données
 Mis à jour pour le nouveau schéma avec Operation, Categorie et SousCategorie
+
+Les chemins d'écriture s'exécutent en un seul aller-retour :
+UPDATE ... RETURNING, DELETE ... RETURNING et INSERT ... ON CONFLICT DO NOTHING RETURNING
+(les contraintes d'unicité par utilisateur remplacent les vérifications préalables).
 """
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import update, delete, select, func, literal, text, Integer
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 from src.backend.database import models
 from src.backend.api import schemas
 
 
+# ==================== HELPERS D'ÉCRITURE ====================
+
+def _insert_returning(
+    db: Session,
+    model,
+    values: Dict[str, Any],
+    conflict_columns: Optional[Sequence[str]] = None
+):
+    """
+    Insère une ligne et la renvoie en un seul aller-retour.
+
+    Args:
+        db: Session de base de données
+        model: Modèle SQLAlchemy cible
+        values: Valeurs à insérer
+        conflict_columns: Colonnes de la contrainte d'unicité (ON CONFLICT DO NOTHING)
+
+    Returns:
+        L'objet créé, ou None si la contrainte d'unicité existe déjà
+    """
+    stmt = insert(model).values(**values)
+    if conflict_columns:
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+
+    db_obj = db.scalars(stmt.returning(model)).first()
+    db.commit()
+    return db_obj
+
+
+def _update_returning(db: Session, model, pk_column, pk_value: int, values: Dict[str, Any],
+                      commit: bool = True):
+    """
+    Met à jour une ligne et la renvoie en un seul aller-retour.
+    Avec commit=False, la transaction reste ouverte (écritures liées avant le commit).
+
+    Returns:
+        L'objet mis à jour, ou None si la ligne n'existe pas (ou n'est pas visible via RLS)
+
+    Raises:
+        IntegrityError: si la mise à jour viole une contrainte (unicité, clé étrangère),
+            après rollback ; main.py la traduit en 409 ou 400
+    """
+    if not values:
+        return db.get(model, pk_value)
+
+    stmt = update(model).where(pk_column == pk_value).values(**values).returning(model)
+    try:
+        db_obj = db.scalars(stmt).first()
+        if commit:
+            db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
+    return db_obj
+
+
+def _delete_returning(db: Session, pk_column, pk_value: int, commit: bool = True) -> bool:
+    """Supprime une ligne sans la charger au préalable (DELETE ... RETURNING)"""
+    stmt = delete(pk_column.class_).where(pk_column == pk_value).returning(pk_column)
+    deleted = db.execute(stmt).first()
+    if commit:
+        db.commit()
+    return deleted is not None
+
+
+def _rebuild_budget_consommation(db: Session) -> None:
+    """
+    Recalcule la consommation des budgets de l'utilisateur courant (transaction en cours).
+    Le trigger ne suit pas une sous-catégorie déplacée ou supprimée : les totaux par
+    catégorie sont reconstruits depuis operation_monthly_rollup.
+    """
+    db.execute(text("SELECT rebuild_budget_consommation()"))
+
+
 # ==================== OPERATIONS CRUD ====================
 
 def get_operation(db: Session, operation_id: int) -> Optional[models.Operation]:
@@ -15,9 +99,114 @@ def get_operation(db: Session, operation_id: int) -> Optional[models.Operation]:
     return db.query(models.Operation).filter(models.Operation.idoperation == operation_id).first()
 
 
-def get_operations(db: Session, skip: int = 0, limit: int = 100) -> List[models.Operation]:
-    """Récupère toutes les opérations avec pagination"""
-    return db.query(models.Operation).offset(skip).limit(limit).all()
+# Clés de tri acceptées par l'API (préfixe "-" pour un tri décroissant)
+OPERATION_SORT_COLUMNS = {
+    "date": models.Operation.date,
+    "montant": models.Operation.montant,
+    "description": models.Operation.description,
+    "idcompte": models.Operation.idcompte,
+    "idtype": models.Operation.idtype,
+    "idsouscategorie": models.Operation.idsouscategorie,
+    "idoperation": models.Operation.idoperation,
+}
+
+
+def operation_filter_conditions(filters: schemas.OperationFilter) -> list:
+    """Traduit les critères de filtrage en conditions SQL (combinées par ET)"""
+    operation = models.Operation
+    conditions = []
+
+    if filters.search:
+        conditions.append(operation.description.ilike(f"%{filters.search}%"))  # ILIKE = insensible à la casse
+    if filters.date_debut is not None:
+        conditions.append(operation.date >= filters.date_debut)
+    if filters.date_fin is not None:
+        conditions.append(operation.date <= filters.date_fin)
+    if filters.montant_min is not None:
+        conditions.append(operation.montant >= filters.montant_min)
+    if filters.montant_max is not None:
+        conditions.append(operation.montant <= filters.montant_max)
+    if filters.idcompte is not None:
+        conditions.append(operation.idcompte == filters.idcompte)
+    if filters.idtype is not None:
+        conditions.append(operation.idtype == filters.idtype)
+    if filters.idsouscategorie is not None:
+        conditions.append(operation.idsouscategorie == filters.idsouscategorie)
+    if filters.idcategorie is not None:
+        conditions.append(operation.idsouscategorie.in_(
+            select(models.SousCategorie.idsouscategorie)
+            .where(models.SousCategorie.idcategorie == filters.idcategorie)
+        ))
+    if filters.sens == "revenu":
+        conditions.append(operation.montant > 0)
+    elif filters.sens == "depense":
+        conditions.append(operation.montant < 0)
+
+    return conditions
+
+
+def operation_order_by(tri: str) -> list:
+    """
+    Traduit une expression de tri multi-clés en clauses ORDER BY.
+
+    Args:
+        tri: Clés séparées par des virgules, "-" pour décroissant (ex: "-date,montant")
+
+    Returns:
+        Clauses ORDER BY, complétées par idoperation pour une pagination stable
+
+    Raises:
+        ValueError: si une clé de tri est inconnue
+    """
+    clauses = []
+    keys = set()
+    descending = False
+    for raw_key in (k.strip() for k in tri.split(",")):
+        if not raw_key:
+            continue
+        descending = raw_key.startswith("-")
+        key = raw_key.lstrip("+-")
+        column = OPERATION_SORT_COLUMNS.get(key)
+        if column is None:
+            raise ValueError(f"Clé de tri inconnue: {key}")
+        clauses.append(column.desc() if descending else column.asc())
+        keys.add(key)
+
+    if "idoperation" not in keys:
+        id_column = models.Operation.idoperation
+        clauses.append(id_column.desc() if descending else id_column.asc())
+    return clauses
+
+
+def get_operations(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    filters: Optional[schemas.OperationFilter] = None,
+    tri: Optional[str] = None,
+    apres: Optional[int] = None,
+    jusqua: Optional[int] = None
+) -> List[models.Operation]:
+    """
+    Récupère les opérations avec filtres, tri et pagination exécutés en SQL
+
+    Args:
+        apres: Pagination par clé, IDs strictement supérieurs (dernier ID de la page précédente)
+        jusqua: ID maximal inclus
+
+    Raises:
+        ValueError: si l'expression de tri est invalide
+    """
+    query = db.query(models.Operation)
+    if filters is not None:
+        query = query.filter(*operation_filter_conditions(filters))
+    if apres is not None:
+        query = query.filter(models.Operation.idoperation > apres)
+    if jusqua is not None:
+        query = query.filter(models.Operation.idoperation <= jusqua)
+    if tri:
+        query = query.order_by(*operation_order_by(tri))
+    return query.offset(skip).limit(limit).all()
 
 
 def get_operations_by_compte(db: Session, compte_id: int) -> List[models.Operation]:
@@ -32,11 +221,7 @@ def get_operations_by_sous_categorie(db: Session, id_sous_categorie: int) -> Lis
 
 def create_operation(db: Session, operation: schemas.OperationCreate) -> models.Operation:
     """Crée une nouvelle opération"""
-    db_operation = models.Operation(**operation.model_dump())
-    db.add(db_operation)
-    db.commit()
-    db.refresh(db_operation)
-    return db_operation
+    return _insert_returning(db, models.Operation, operation.model_dump())
 
 
 def update_operation(
@@ -45,29 +230,72 @@ def update_operation(
     operation_update: schemas.OperationUpdate
 ) -> Optional[models.Operation]:
     """Met à jour une opération existante"""
-    db_operation = get_operation(db, operation_id)
-    if not db_operation:
-        return None
-
     # Mise à jour uniquement des champs fournis
     update_data = operation_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_operation, field, value)
-
-    db.commit()
-    db.refresh(db_operation)
-    return db_operation
+    return _update_returning(
+        db, models.Operation, models.Operation.idoperation, operation_id, update_data
+    )
 
 
 def delete_operation(db: Session, operation_id: int) -> bool:
     """Supprime une opération"""
-    db_operation = get_operation(db, operation_id)
-    if not db_operation:
-        return False
-
-    db.delete(db_operation)
+    return _delete_returning(db, models.Operation.idoperation, operation_id)
+
+
+def _operation_selection_conditions(selection: schemas.OperationSelection) -> list:
+    """Conditions WHERE d'une sélection groupée (IDs et/ou filtre)"""
+    conditions = []
+    if selection.ids is not None:
+        conditions.append(models.Operation.idoperation.in_(selection.ids))
+    if selection.filtre is not None:
+        conditions.extend(operation_filter_conditions(selection.filtre))
+    return conditions
+
+
+def bulk_update_operations(db: Session, bulk: schemas.OperationBulkUpdate) -> Optional[int]:
+    """
+    Met à jour toutes les opérations sélectionnées en une seule requête UPDATE.
+    La RLS limite la requête aux opérations de l'utilisateur courant.
+
+    Returns:
+        Nombre d'opérations modifiées, ou None si une contrainte est violée
+        (compte, type ou sous-catégorie inexistant)
+    """
+    if bulk.ids == []:
+        return 0
+    stmt = (
+        update(models.Operation)
+        .where(*_operation_selection_conditions(bulk))
+        .values(**bulk.changements.model_dump(exclude_unset=True))
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        result = db.execute(stmt)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return result.rowcount
+
+
+def bulk_delete_operations(db: Session, bulk: schemas.OperationBulkDelete) -> int:
+    """
+    Supprime toutes les opérations sélectionnées en une seule requête DELETE.
+    La RLS limite la requête aux opérations de l'utilisateur courant.
+
+    Returns:
+        Nombre d'opérations supprimées
+    """
+    if bulk.ids == []:
+        return 0
+    stmt = (
+        delete(models.Operation)
+        .where(*_operation_selection_conditions(bulk))
+        .execution_options(synchronize_session=False)
+    )
+    result = db.execute(stmt)
     db.commit()
-    return True
+    return result.rowcount
 
 
 # ==================== COMPTES CRUD ====================
@@ -82,13 +310,15 @@ def get_comptes(db: Session, skip: int = 0, limit: int = 100) -> List[models.Com
     return db.query(models.Compte).offset(skip).limit(limit).all()
 
 
-def create_compte(db: Session, compte: schemas.CompteCreate) -> models.Compte:
-    """Crée un nouveau compte"""
-    db_compte = models.Compte(**compte.model_dump())
-    db.add(db_compte)
-    db.commit()
-    db.refresh(db_compte)
-    return db_compte
+def create_compte(
+    db: Session,
+    compte: schemas.CompteCreate,
+    idutilisateur: Optional[int] = None
+) -> Optional[models.Compte]:
+    """Crée un nouveau compte (None si un compte du même nom existe déjà pour l'utilisateur)"""
+    compte_data = compte.model_dump()
+    compte_data["idutilisateur"] = idutilisateur
+    return _insert_returning(db, models.Compte, compte_data, conflict_columns=("nom", "idutilisateur"))
 
 
 def update_compte(
@@ -97,28 +327,16 @@ def update_compte(
     compte_update: schemas.CompteUpdate
 ) -> Optional[models.Compte]:
     """Met à jour un compte existant"""
-    db_compte = get_compte(db, compte_id)
-    if not db_compte:
-        return None
-
     update_data = compte_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_compte, field, value)
-
-    db.commit()
-    db.refresh(db_compte)
-    return db_compte
+    return _update_returning(db, models.Compte, models.Compte.idcompte, compte_id, update_data)
 
 
 def delete_compte(db: Session, compte_id: int) -> bool:
-    """Supprime un compte"""
-    db_compte = get_compte(db, compte_id)
-    if not db_compte:
-        return False
-
-    db.delete(db_compte)
-    db.commit()
-    return True
+    """Supprime un compte et ses opérations"""
+    # La clé étrangère OPERATION -> COMPTE est en RESTRICT : on reproduit la cascade
+    # ORM par une suppression ensembliste dans la même transaction
+    db.execute(delete(models.Operation).where(models.Operation.idcompte == compte_id))
+    return _delete_returning(db, models.Compte.idcompte, compte_id)
 
 
 # ==================== CATEGORIES CRUD ====================
@@ -138,13 +356,17 @@ def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[models.
     return db.query(models.Categorie).offset(skip).limit(limit).all()
 
 
-def create_categorie(db: Session, categorie: schemas.CategorieCreate) -> models.Categorie:
-    """Crée une nouvelle catégorie"""
-    db_categorie = models.Categorie(**categorie.model_dump())
-    db.add(db_categorie)
-    db.commit()
-    db.refresh(db_categorie)
-    return db_categorie
+def create_categorie(
+    db: Session,
+    categorie: schemas.CategorieCreate,
+    idutilisateur: Optional[int] = None
+) -> Optional[models.Categorie]:
+    """Crée une nouvelle catégorie (None si elle existe déjà pour l'utilisateur)"""
+    categorie_data = categorie.model_dump()
+    categorie_data["idutilisateur"] = idutilisateur
+    return _insert_returning(
+        db, models.Categorie, categorie_data, conflict_columns=("nomcategorie", "idutilisateur")
+    )
 
 
 def update_categorie(
@@ -152,33 +374,16 @@ def update_categorie(
     categorie_id: int,
     categorie_update: schemas.CategorieUpdate
 ) -> Optional[models.Categorie]:
-    """Met à jour une catégorie existante"""
-    db_categorie = get_categorie(db, categorie_id)
-    if not db_categorie:
-        return None
-
-    # Mise à jour du nom si fourni
-    if categorie_update.nomcategorie:
-        # Vérifier que le nouveau nom n'existe pas déjà
-        existing = get_categorie_by_nom(db, categorie_update.nomcategorie)
-        if existing and existing.idcategorie != categorie_id:
-            return None
-        db_categorie.nomcategorie = categorie_update.nomcategorie
-
-    db.commit()
-    db.refresh(db_categorie)
-    return db_categorie
+    """Met à jour une catégorie existante (None si introuvable)"""
+    update_data = categorie_update.model_dump(exclude_none=True)
+    return _update_returning(
+        db, models.Categorie, models.Categorie.idcategorie, categorie_id, update_data
+    )
 
 
 def delete_categorie(db: Session, categorie_id: int) -> bool:
-    """Supprime une catégorie"""
-    db_categorie = get_categorie(db, categorie_id)
-    if not db_categorie:
-        return False
-
-    db.delete(db_categorie)
-    db.commit()
-    return True
+    """Supprime une catégorie (les sous-catégories suivent via ON DELETE CASCADE)"""
+    return _delete_returning(db, models.Categorie.idcategorie, categorie_id)
 
 
 # ==================== SOUS-CATEGORIES CRUD ====================
@@ -209,13 +414,17 @@ def get_sous_categories_by_categorie(db: Session, categorie_id: int) -> List[mod
     ).all()
 
 
-def create_sous_categorie(db: Session, sous_categorie: schemas.SousCategorieCreate) -> models.SousCategorie:
-    """Crée une nouvelle sous-catégorie"""
-    db_sous_categorie = models.SousCategorie(**sous_categorie.model_dump())
-    db.add(db_sous_categorie)
-    db.commit()
-    db.refresh(db_sous_categorie)
-    return db_sous_categorie
+def create_sous_categorie(
+    db: Session,
+    sous_categorie: schemas.SousCategorieCreate
+) -> Optional[models.SousCategorie]:
+    """Crée une nouvelle sous-catégorie (None si elle existe déjà dans la catégorie parente)"""
+    return _insert_returning(
+        db,
+        models.SousCategorie,
+        sous_categorie.model_dump(),
+        conflict_columns=("nomsouscategorie", "idcategorie")
+    )
 
 
 def update_sous_categorie(
@@ -223,32 +432,32 @@ def update_sous_categorie(
     sous_categorie_id: int,
     sous_categorie_update: schemas.SousCategorieUpdate
 ) -> Optional[models.SousCategorie]:
-    """Met à jour une sous-catégorie existante"""
-    db_sous_categorie = get_sous_categorie(db, sous_categorie_id)
-    if not db_sous_categorie:
-        return None
-
+    """
+    Met à jour une sous-catégorie existante (None si introuvable).
+    Un changement de catégorie parente recalcule la consommation des budgets dans la même transaction.
+    """
     # Mise à jour des champs fournis
-    if sous_categorie_update.nomsouscategorie:
-        db_sous_categorie.nomsouscategorie = sous_categorie_update.nomsouscategorie
-
-    if sous_categorie_update.idcategorie:
-        db_sous_categorie.idcategorie = sous_categorie_update.idcategorie
-
+    update_data = sous_categorie_update.model_dump(exclude_none=True)
+    db_obj = _update_returning(
+        db, models.SousCategorie, models.SousCategorie.idsouscategorie, sous_categorie_id, update_data,
+        commit=False
+    )
+    if db_obj is not None and "idcategorie" in update_data:
+        _rebuild_budget_consommation(db)
     db.commit()
-    db.refresh(db_sous_categorie)
-    return db_sous_categorie
+    return db_obj
 
 
 def delete_sous_categorie(db: Session, sous_categorie_id: int) -> bool:
-    """Supprime une sous-catégorie"""
-    db_sous_categorie = get_sous_categorie(db, sous_categorie_id)
-    if not db_sous_categorie:
-        return False
-
-    db.delete(db_sous_categorie)
+    """
+    Supprime une sous-catégorie (les opérations liées passent à NULL via la clé étrangère)
+    et recalcule la consommation des budgets dans la même transaction
+    """
+    deleted = _delete_returning(db, models.SousCategorie.idsouscategorie, sous_categorie_id, commit=False)
+    if deleted:
+        _rebuild_budget_consommation(db)
     db.commit()
-    return True
+    return deleted
 
 
 # ==================== TYPES CRUD ====================
@@ -268,13 +477,15 @@ def get_types(db: Session) -> List[models.Type]:
     return db.query(models.Type).all()
 
 
-def create_type(db: Session, type_data: schemas.TypeCreate) -> models.Type:
-    """Crée un nouveau type"""
-    db_type = models.Type(**type_data.model_dump())
-    db.add(db_type)
-    db.commit()
-    db.refresh(db_type)
-    return db_type
+def create_type(
+    db: Session,
+    type_data: schemas.TypeCreate,
+    idutilisateur: Optional[int] = None
+) -> Optional[models.Type]:
+    """Crée un nouveau type (None s'il existe déjà pour l'utilisateur)"""
+    type_values = type_data.model_dump()
+    type_values["idutilisateur"] = idutilisateur
+    return _insert_returning(db, models.Type, type_values, conflict_columns=("nom", "idutilisateur"))
 
 
 def update_type(
@@ -283,28 +494,285 @@ def update_type(
     type_update: schemas.TypeUpdate
 ) -> Optional[models.Type]:
     """Met à jour un type existant"""
-    db_type = get_type(db, type_id)
-    if not db_type:
-        return None
-
     update_data = type_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_type, field, value)
-
-    db.commit()
-    db.refresh(db_type)
-    return db_type
+    return _update_returning(db, models.Type, models.Type.idtype, type_id, update_data)
 
 
 def delete_type(db: Session, type_id: int) -> bool:
     """Supprime un type"""
-    db_type = get_type(db, type_id)
-    if not db_type:
-        return False
+    return _delete_returning(db, models.Type.idtype, type_id)
+
+
+# ==================== BUDGETS CRUD ====================
+
+def get_budget(db: Session, budget_id: int) -> Optional[models.Budget]:
+    """Récupère un budget par son ID"""
+    return db.get(models.Budget, budget_id)
+
+
+def get_budgets(db: Session) -> List[models.Budget]:
+    """Récupère tous les budgets de l'utilisateur"""
+    return db.query(models.Budget).order_by(models.Budget.idcategorie, models.Budget.idsouscategorie).all()
+
+
+def create_budget(
+    db: Session,
+    budget: schemas.BudgetCreate,
+    idutilisateur: Optional[int] = None
+) -> Optional[models.Budget]:
+    """Crée un budget (None si la catégorie ou sous-catégorie a déjà un budget)"""
+    budget_data = budget.model_dump()
+    budget_data["idutilisateur"] = idutilisateur
+    return _insert_returning(
+        db, models.Budget, budget_data,
+        conflict_columns=("idutilisateur", "idcategorie", text("(COALESCE(idsouscategorie, 0))"))
+    )
+
+
+def update_budget(db: Session, budget_id: int, budget_update: schemas.BudgetUpdate) -> Optional[models.Budget]:
+    """Met à jour un budget existant"""
+    update_data = budget_update.model_dump(exclude_unset=True)
+    return _update_returning(db, models.Budget, models.Budget.idbudget, budget_id, update_data)
+
+
+def delete_budget(db: Session, budget_id: int) -> bool:
+    """Supprime un budget"""
+    return _delete_returning(db, models.Budget.idbudget, budget_id)
+
+
+# Dépenses du mois aux deux niveaux (GROUPING SETS sur les agrégats mensuels),
+# rapprochées des budgets actifs du même niveau par une jointure externe complète
+BUDGET_REPORT_SQL = text("""
+    WITH reel AS (
+        SELECT sc.idcategorie,
+               r.idsouscategorie,
+               GROUPING(r.idsouscategorie) AS niveau_categorie,
+               SUM(r.total_depenses) AS reel
+        FROM operation_monthly_rollup r
+        JOIN sous_categorie sc ON sc.idsouscategorie = r.idsouscategorie
+        WHERE r.mois = :mois
+        GROUP BY GROUPING SETS ((sc.idcategorie, r.idsouscategorie), (sc.idcategorie))
+    ),
+    budgets AS (
+        SELECT idbudget, idcategorie, idsouscategorie,
+               (idsouscategorie IS NULL)::INTEGER AS niveau_categorie,
+               montant, alerte_seuil
+        FROM budget
+        WHERE actif
+    )
+    SELECT COALESCE(r.idcategorie, b.idcategorie) AS idcategorie,
+           COALESCE(r.idsouscategorie, b.idsouscategorie) AS idsouscategorie,
+           COALESCE(r.niveau_categorie, b.niveau_categorie) AS niveau_categorie,
+           b.idbudget,
+           b.montant AS budget,
+           b.alerte_seuil,
+           COALESCE(r.reel, 0) AS reel
+    FROM reel r
+    FULL OUTER JOIN budgets b
+      ON b.idcategorie = r.idcategorie
+     AND b.niveau_categorie = r.niveau_categorie
+     AND COALESCE(b.idsouscategorie, 0) = COALESCE(r.idsouscategorie, 0)
+    ORDER BY 1, 3 DESC, 2
+""")
+
+
+def _budget_status(budget: Optional[Decimal], reel: Decimal, alerte_seuil: Optional[Decimal]) -> str:
+    """Statut d'une ligne, mêmes règles que CategoryBudget.status côté client"""
+    if budget is None:
+        return "sans_budget"
+    if budget > 0 and reel > budget:
+        return "over"
+    if budget > 0 and reel / budget >= alerte_seuil:
+        return "warning"
+    return "ok"
+
+
+def get_budget_report(db: Session, mois: date) -> dict:
+    """
+    Rapport budget / réel d'un mois pour les catégories et sous-catégories, en une requête
+
+    Args:
+        mois: N'importe quel jour du mois visé
+    """
+    mois = mois.replace(day=1)
+    lignes = []
+    for row in db.execute(BUDGET_REPORT_SQL, {"mois": mois}):
+        budget = row.budget
+        lignes.append({
+            "niveau": "categorie" if row.niveau_categorie else "souscategorie",
+            "idcategorie": row.idcategorie,
+            "idsouscategorie": row.idsouscategorie,
+            "idbudget": row.idbudget,
+            "budget": budget,
+            "reel": row.reel,
+            "restant": budget - row.reel if budget is not None else None,
+            "pourcentage": float(row.reel / budget * 100) if budget else None,
+            "statut": _budget_status(budget, row.reel, row.alerte_seuil),
+        })
+    return {"mois": mois, "lignes": lignes}
+
+
+# ==================== ALERTES BUDGÉTAIRES ====================
+
+def get_alertes(
+    db: Session,
+    depuis: Optional[int] = None,
+    non_lues: bool = False,
+    limit: int = 100
+) -> List[models.AlerteBudget]:
+    """
+    Récupère les alertes de l'utilisateur, les plus anciennes d'abord
+
+    Args:
+        depuis: Ne renvoyer que les alertes d'ID strictement supérieur (dernière alerte reçue)
+        non_lues: Ne renvoyer que les alertes non lues
+    """
+    query = db.query(models.AlerteBudget)
+    if depuis is not None:
+        query = query.filter(models.AlerteBudget.idalerte > depuis)
+    if non_lues:
+        query = query.filter(models.AlerteBudget.lue.is_(False))
+    return query.order_by(models.AlerteBudget.idalerte).limit(limit).all()
+
 
-    db.delete(db_type)
+def mark_alerte_lue(db: Session, alerte_id: int) -> Optional[models.AlerteBudget]:
+    """Marque une alerte comme lue"""
+    return _update_returning(db, models.AlerteBudget, models.AlerteBudget.idalerte, alerte_id, {"lue": True})
+
+
+# ==================== SYNCHRONISATION ====================
+
+def get_operation_changes(
+    db: Session,
+    depuis: Optional[int] = None,
+    apres: int = 0,
+    limit: int = 1000
+) -> dict:
+    """
+    Opérations créées, modifiées ou supprimées depuis un curseur (journal operation_journal)
+
+    Le curseur courant est lu avant les changements : un changement validé pendant la
+    lecture sera renvoyé à la synchronisation suivante.
+
+    Args:
+        depuis: Curseur de la synchronisation précédente (None : curseur courant seul,
+            à demander avant un chargement complet)
+        apres: Pagination, dernier idoperation de la page précédente
+        limit: Nombre maximal d'opérations par page
+
+    Returns:
+        dict: {'curseur', 'operations', 'supprimees', 'suite'} ; 'suite' vaut None sur
+        la dernière page, sinon la valeur de `apres` pour la page suivante
+    """
+    curseur = db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::TEXT::BIGINT")).scalar_one()
+    if depuis is None:
+        return {"curseur": curseur, "operations": [], "supprimees": [], "suite": None}
+
+    lignes = db.execute(
+        text(
+            "SELECT idoperation, supprime FROM operation_journal"
+            " WHERE xid >= CAST(CAST(:depuis AS TEXT) AS XID8) AND idoperation > :apres"
+            " ORDER BY idoperation LIMIT :limit"
+        ),
+        {"depuis": depuis, "apres": apres, "limit": limit},
+    ).all()
+
+    ids = [ligne.idoperation for ligne in lignes if not ligne.supprime]
+    operations = (
+        db.query(models.Operation).filter(models.Operation.idoperation.in_(ids)).order_by(models.Operation.idoperation).all()
+        if ids else []
+    )
+    presentes = {operation.idoperation for operation in operations}
+    # Une opération absente a été supprimée depuis la lecture du journal
+    supprimees = [ligne.idoperation for ligne in lignes if ligne.idoperation not in presentes]
+    return {
+        "curseur": curseur,
+        "operations": operations,
+        "supprimees": supprimees,
+        "suite": lignes[-1].idoperation if len(lignes) == limit else None,
+    }
+
+
+def apply_operation_writes(db: Session, ecritures: List[schemas.OperationWrite], idutilisateur: int) -> List[dict]:
+    """
+    Applique dans l'ordre un lot d'écritures différées, en une transaction
+
+    Chaque écriture s'exécute dans un point de sauvegarde avec l'enregistrement de sa clé
+    d'idempotence : une écriture refusée n'annule pas les autres, une clé déjà connue
+    renvoie l'état courant sans rien réécrire. Conflit (update / delete) : un champ dont
+    la valeur serveur diffère de `avant` a été modifié par ailleurs ; la valeur serveur
+    est conservée et le reste de l'écriture appliqué (un delete est alors abandonné).
+
+    Returns:
+        Liste de {'cle', 'statut', 'operation', 'detail'} (même ordre que `ecritures`)
+    """
+    resultats = []
+    for ecriture in ecritures:
+        try:
+            with db.begin_nested():
+                resultats.append(_apply_operation_write(db, ecriture, idutilisateur))
+        except (DBAPIError, ValidationError) as e:
+            detail = e.orig.diag.message_primary if isinstance(e, DBAPIError) and hasattr(e.orig, "diag") else str(e)
+            resultats.append({"cle": ecriture.cle, "statut": "erreur", "operation": None, "detail": detail})
     db.commit()
-    return True
+    return resultats
+
+
+def _apply_operation_write(db: Session, ecriture: schemas.OperationWrite, idutilisateur: int) -> dict:
+    """Une écriture différée (voir apply_operation_writes), dans le point de sauvegarde courant"""
+    cle = db.execute(
+        insert(models.EcritureIdempotente)
+        .values(idutilisateur=idutilisateur, cle=ecriture.cle, idoperation=ecriture.idoperation)
+        .on_conflict_do_nothing()
+        .returning(models.EcritureIdempotente.cle)
+    ).first()
+    if cle is None:
+        # Déjà appliquée : l'opération est celle enregistrée avec la clé
+        deja = db.get(models.EcritureIdempotente, (idutilisateur, ecriture.cle))
+        operation = get_operation(db, deja.idoperation) if deja.idoperation is not None else None
+        return {"cle": ecriture.cle, "statut": "ok", "operation": operation, "detail": "Déjà appliquée"}
+
+    if ecriture.action == "create":
+        valeurs = schemas.OperationCreate(**ecriture.donnees.model_dump(exclude_unset=True)).model_dump()
+        operation = db.scalars(insert(models.Operation).values(**valeurs).returning(models.Operation)).first()
+        db.execute(
+            update(models.EcritureIdempotente)
+            .where(models.EcritureIdempotente.idutilisateur == idutilisateur,
+                   models.EcritureIdempotente.cle == ecriture.cle)
+            .values(idoperation=operation.idoperation)
+        )
+        return {"cle": ecriture.cle, "statut": "ok", "operation": operation, "detail": None}
+
+    operation = get_operation(db, ecriture.idoperation)
+    if operation is None:
+        if ecriture.action == "delete":
+            return {"cle": ecriture.cle, "statut": "ok", "operation": None, "detail": "Déjà supprimée"}
+        return {"cle": ecriture.cle, "statut": "conflit", "operation": None, "detail": "Opération supprimée sur le serveur"}
+
+    avant = ecriture.avant.model_dump(exclude_unset=True) if ecriture.avant is not None else {}
+    modifies = sorted(champ for champ, valeur in avant.items() if getattr(operation, champ) != valeur)
+
+    if ecriture.action == "delete":
+        if modifies:
+            return {"cle": ecriture.cle, "statut": "conflit", "operation": operation,
+                    "detail": f"Modifiée sur le serveur : {', '.join(modifies)}"}
+        db.execute(delete(models.Operation).where(models.Operation.idoperation == operation.idoperation))
+        return {"cle": ecriture.cle, "statut": "ok", "operation": None, "detail": None}
+
+    valeurs = {champ: valeur for champ, valeur in ecriture.donnees.model_dump(exclude_unset=True).items()
+               if champ not in modifies}
+    if valeurs:
+        operation = db.scalars(
+            update(models.Operation)
+            .where(models.Operation.idoperation == operation.idoperation)
+            .values(**valeurs)
+            .returning(models.Operation)
+            .execution_options(populate_existing=True)
+        ).first()
+    if modifies:
+        return {"cle": ecriture.cle, "statut": "conflit", "operation": operation,
+                "detail": f"Valeurs du serveur conservées : {', '.join(modifies)}"}
+    return {"cle": ecriture.cle, "statut": "ok", "operation": operation, "detail": None}
 
 
 # ==================== FONCTIONS UTILITAIRES ====================
@@ -331,15 +799,62 @@ def get_statistics(db: Session) -> dict:
         "solde_total": get_total_solde(db)
     }
 
-def search_operations(db: Session, search: str, skip: int = 0, limit: int = 100):
-    """Recherche les opérations par description"""
-    return (
-        db.query(models.Operation)
-        .filter(models.Operation.description.ilike(f"%{search}%"))  # ILIKE = insensible à la casse
-        .order_by(models.Operation.date.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+
+ROLLUP_GROUP_COLUMNS = {
+    "compte": models.OperationMonthlyRollup.idcompte,
+    "souscategorie": models.OperationMonthlyRollup.idsouscategorie,
+    "type": models.OperationMonthlyRollup.idtype,
+    "categorie": models.SousCategorie.idcategorie,
+}
+
+
+def get_monthly_stats(
+    db: Session,
+    date_debut: Optional[date] = None,
+    date_fin: Optional[date] = None,
+    idcompte: Optional[int] = None,
+    par: Optional[str] = None
+) -> List[dict]:
+    """
+    Totaux mensuels lus dans operation_monthly_rollup (quelques lignes par mois)
+
+    Args:
+        date_debut: Premier mois inclus (ramené au 1er du mois)
+        date_fin: Dernier mois inclus
+        idcompte: Limite à un compte
+        par: Regroupement supplémentaire ('compte', 'souscategorie', 'type', 'categorie')
+    """
+    rollup = models.OperationMonthlyRollup
+    cle = ROLLUP_GROUP_COLUMNS[par] if par else literal(None, Integer)
+    revenus = func.sum(rollup.total_revenus)
+    depenses = func.sum(rollup.total_depenses)
+
+    query = select(
+        rollup.mois,
+        cle.label("cle"),
+        revenus.label("total_revenus"),
+        depenses.label("total_depenses"),
+        (revenus - depenses).label("solde"),
+        func.sum(rollup.nb_operations).label("nb_operations"),
     )
+    if par == "categorie":
+        query = query.outerjoin(
+            models.SousCategorie, models.SousCategorie.idsouscategorie == rollup.idsouscategorie
+        )
+    if date_debut is not None:
+        query = query.where(rollup.mois >= date_debut.replace(day=1))
+    if date_fin is not None:
+        query = query.where(rollup.mois <= date_fin)
+    if idcompte is not None:
+        query = query.where(rollup.idcompte == idcompte)
+
+    group_by = [rollup.mois, cle] if par else [rollup.mois]
+    query = query.group_by(*group_by).order_by(*group_by)
+    return [dict(row._mapping) for row in db.execute(query)]
 
 
+def search_operations(db: Session, search: str, skip: int = 0, limit: int = 100):
+    """Recherche les opérations par description"""
+    return get_operations(
+        db, skip=skip, limit=limit, filters=schemas.OperationFilter(search=search), tri="-date"
+    )
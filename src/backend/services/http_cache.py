@@ -0,0 +1,74 @@
+"""
+Validateurs HTTP (ETag / Cache-Control) des réponses GET de l'API
+
+Chaque réponse GET JSON reçoit un ETag (empreinte du corps) et un Cache-Control :
+- données de référence (types, catégories, sous-catégories) : réutilisables par le
+  client pendant HTTP_CACHE_REFERENCE_MAX_AGE secondes sans requête ;
+- synchronisation (/api/sync) : jamais conservée (no-store), chaque réponse est unique ;
+- autres ressources : à revalider à chaque fois (no-cache), dont les comptes, qui
+  incluent leurs opérations et leur solde.
+Une requête portant If-None-Match égal à l'ETag courant reçoit 304 sans corps.
+
+Les réponses dépendent de l'utilisateur (RLS) : elles sont marquées private et
+Vary: Authorization.
+"""
+import hashlib
+import os
+
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+HTTP_CACHE_REFERENCE_MAX_AGE = int(os.getenv("HTTP_CACHE_REFERENCE_MAX_AGE", "60"))
+
+# Ressources qui ne changent presque jamais
+REFERENCE_PREFIXES = ("/api/types", "/api/categories", "/api/sous-categories")
+# Réponses propres à un curseur, inutiles à conserver
+NO_STORE_PREFIXES = ("/api/sync",)
+
+
+def cache_control_for(path: str) -> str:
+    """Cache-Control d'une réponse GET selon la ressource"""
+    if path.startswith(NO_STORE_PREFIXES):
+        return "private, no-store"
+    if path.startswith(REFERENCE_PREFIXES) and not path.endswith("/operations"):
+        return f"private, max-age={HTTP_CACHE_REFERENCE_MAX_AGE}"
+    return "private, no-cache"
+
+
+def compute_etag(body: bytes) -> str:
+    """ETag faible dérivé du corps de la réponse"""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match désigne l'ETag courant"""
+    candidats = {valeur.strip() for valeur in if_none_match.split(",")}
+    return "*" in candidats or etag in candidats
+
+
+class ETagMiddleware(BaseHTTPMiddleware):
+    """Ajoute ETag / Cache-Control aux réponses GET JSON et répond 304 si le client est à jour"""
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if (request.method != "GET" or response.status_code != 200
+                or not response.headers.get("content-type", "").startswith("application/json")):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = compute_etag(body)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": cache_control_for(request.url.path),
+            "Vary": "Authorization",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        response_headers = dict(response.headers)
+        response_headers.pop("content-length", None)
+        response_headers.update(headers)
+        return Response(content=body, status_code=200, headers=response_headers, media_type=response.media_type)
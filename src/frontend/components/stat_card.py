@@ -170,6 +170,57 @@ class StatCard:
         e.control.update()
 
 
+class SkeletonStatCard:
+    """
+    Carte statistique de chargement (squelette)
+    Affichée à la place d'une StatCard tant que ses données ne sont pas arrivées
+    """
+
+    def __init__(self, title: str, icon: str = None):
+        """
+        Initialise une carte squelette
+
+        Args:
+            title: Titre de la carte (affiché dès le premier rendu)
+            icon: Icône de la carte (optionnel)
+        """
+        self.title = title
+        self.icon = icon
+
+    def build(self) -> ft.Container:
+        """Construit la carte squelette"""
+        return ft.Container(
+            content=ft.Column([
+                ft.Text(self.icon or "", size=24, text_align=ft.TextAlign.CENTER),
+                ft.Container(height=16),
+                ft.Text(
+                    self.title,
+                    size=14,
+                    weight=ft.FontWeight.W_500,
+                    color=COLORS.TEXTE_SECONDAIRE,
+                    text_align=ft.TextAlign.CENTER
+                ),
+                ft.Container(height=8),
+                # Emplacement de la valeur
+                ft.Container(
+                    width=120,
+                    height=24,
+                    bgcolor=f"{COLORS.BORDURES}80",
+                    border_radius=6
+                )
+            ],
+                spacing=0,
+                alignment=ft.MainAxisAlignment.CENTER,
+                horizontal_alignment=ft.CrossAxisAlignment.CENTER
+            ),
+            padding=ft.padding.all(20),
+            border_radius=12,
+            border=ft.border.all(1, COLORS.BORDURES),
+            bgcolor=COLORS.CARTES_COMPOSANTS,
+            height=160 if self.icon else 120
+        )
+
+
 class MiniStatCard:
     """
     Version compacte de StatCard pour les widgets plus petits
@@ -4,15 +4,55 @@ Composant TransactionsList pour afficher les transactions
 avec le style DA 2025 et interactions violet lumineux
 """
 
+import threading
+from collections import OrderedDict
 import flet as ft
-from typing import List, Callable, Optional
+from typing import List, Callable, Optional, Set
 from datetime import datetime
 from src.frontend.theme.colors import COLORS
+# Même recherche (sans casse ni accents) que les pages lues dans le miroir local
+from src.services.local_store import normaliser_recherche as _normaliser
+
+
+# Liste virtualisée : hauteur fixe de chaque ligne (espacement compris), lignes construites
+# au-delà de la zone visible (de chaque côté), pages lues à la demande et gardées en cache
+HAUTEUR_LIGNE = 72
+ESPACEMENT_LIGNES = 8
+PAS_LIGNE = HAUTEUR_LIGNE + ESPACEMENT_LIGNES
+HAUTEUR_VUE = 600
+TAMPON_LIGNES = 10
+TAILLE_PAGE = 100
+MAX_PAGES = 20
+
+# Délai sans nouvelle frappe avant d'appliquer la recherche (secondes)
+DELAI_RECHERCHE = 0.15
+
+
+def _mettre_a_jour(control: ft.Control):
+    """update() seulement si le contrôle est affiché (sinon la construction suffit)"""
+    try:
+        control.page
+    except RuntimeError:
+        return
+    control.update()
+
+
+def _mettre_a_jour_controles(controles: List[ft.Control]):
+    """Envoie en un seul update les contrôles modifiés (s'ils sont affichés)"""
+    if not controles:
+        return
+    try:
+        page = controles[0].page
+    except RuntimeError:
+        return
+    page.update(*controles)
 
 
 class TransactionItem:
     """
     Élément de transaction individuel avec style DA 2025
+
+    Réutilisable : bind() affiche une autre transaction dans les mêmes contrôles.
     """
 
     def __init__(self, transaction, on_click: Callable = None,
@@ -21,12 +61,12 @@ class TransactionItem:
         Initialise un élément de transaction
 
         Args:
-            transaction: Objet transaction à afficher
+            transaction: Objet transaction à afficher (None : ligne en attente de chargement)
             on_click: Callback pour le clic sur la transaction
             on_edit: Callback pour l'édition
             on_delete: Callback pour la suppression
         """
-        self.transaction = transaction
+        self.transaction = None
         self.on_click = on_click
         self.on_edit = on_edit
         self.on_delete = on_delete
@@ -36,70 +76,48 @@ class TransactionItem:
         self.VIOLET_GLOW = "#E1BEE7"
 
         self.container = self._build_item()
+        self.bind(transaction)
 
     def _build_item(self) -> ft.Container:
-        """Construit l'élément de transaction"""
-        # Déterminer la couleur selon le type
-        if self.transaction.montant > 0:
-            color = COLORS.SUCCESS_REVENUS
-            sign = "+"
-            icon_bg_color = f"{COLORS.SUCCESS_REVENUS}20"
-        else:
-            color = COLORS.ERREUR_DEPENSES
-            sign = ""
-            icon_bg_color = f"{COLORS.ERREUR_DEPENSES}20"
-
-        # Obtenir l'icône
-        icon = getattr(self.transaction, 'icone', '💰')
+        """Construit l'élément de transaction (contenu rempli par bind)"""
+        self._icone = ft.Text("", size=20)
+        self._fond_icone = ft.Container(
+            content=self._icone,
+            width=40,
+            height=40,
+            border_radius=20,
+            alignment=ft.Alignment(0, 0)
+        )
+        self._description = ft.Text(
+            "",
+            size=16,
+            weight=ft.FontWeight.W_500,
+            color=COLORS.TEXTE_PRINCIPAL,
+            max_lines=1,
+            overflow=ft.TextOverflow.ELLIPSIS
+        )
+        self._categorie = ft.Text("", size=12, color=COLORS.TEXTE_SECONDAIRE)
+        self._date = ft.Text("", size=12, color=COLORS.TEXTE_SECONDAIRE)
+        self._montant = ft.Text("", size=16, weight=ft.FontWeight.BOLD)
 
         return ft.Container(
             content=ft.Row([
                 # Icône de la transaction
-                ft.Container(
-                    content=ft.Text(
-                        icon,
-                        size=20
-                    ),
-                    width=40,
-                    height=40,
-                    bgcolor=icon_bg_color,
-                    border_radius=20,
-                    alignment=ft.Alignment(0, 0)
-                ),
+                self._fond_icone,
                 ft.Container(width=16),  # Espacement
 
-                # Informations principales
+                # Informations principales : description, puis catégorie et date
                 ft.Column([
-                    # Description
-                    ft.Text(
-                        self.transaction.description,
-                        size=16,
-                        weight=ft.FontWeight.W_500,
-                        color=COLORS.TEXTE_PRINCIPAL
-                    ),
-                    # Détails (catégorie et date)
+                    self._description,
                     ft.Row([
-                        ft.Text(
-                            self.transaction.categorie,
-                            size=12,
-                            color=COLORS.TEXTE_SECONDAIRE
-                        ),
+                        self._categorie,
                         ft.Text("•", size=12, color=COLORS.TEXTE_SECONDAIRE),
-                        ft.Text(
-                            self.transaction.date.strftime("%d/%m/%Y"),
-                            size=12,
-                            color=COLORS.TEXTE_SECONDAIRE
-                        )
+                        self._date
                     ], spacing=6)
                 ], spacing=4, expand=True),
 
                 # Montant
-                ft.Text(
-                    f"{sign}{abs(self.transaction.montant):,.2f} €",
-                    size=16,
-                    weight=ft.FontWeight.BOLD,
-                    color=color
-                ),
+                self._montant,
 
                 # Boutons d'action (visibles au survol)
                 ft.Container(
@@ -109,14 +127,14 @@ class TransactionItem:
                             icon_color=self.VIOLET_LUMINEUX,
                             icon_size=16,
                             tooltip="Modifier",
-                            on_click=lambda e: self.on_edit(self.transaction) if self.on_edit else None
+                            on_click=lambda e: self.on_edit(self.transaction) if self.on_edit and self.transaction else None
                         ),
                         ft.IconButton(
                             icon=ft.Icons.DELETE_OUTLINE,
                             icon_color=COLORS.ERREUR_DEPENSES,
                             icon_size=16,
                             tooltip="Supprimer",
-                            on_click=lambda e: self.on_delete(self.transaction) if self.on_delete else None
+                            on_click=lambda e: self.on_delete(self.transaction) if self.on_delete and self.transaction else None
                         )
                     ], spacing=4),
                     width=80,
@@ -124,16 +142,42 @@ class TransactionItem:
                     ref=ft.Ref()
                 )
             ], alignment=ft.MainAxisAlignment.START),
+            height=HAUTEUR_LIGNE,
             padding=ft.padding.all(16),
             bgcolor="transparent",
             border_radius=12,
             border=ft.border.all(1, "transparent"),
             ink=True,
-            on_click=lambda e: self.on_click(self.transaction) if self.on_click else None,
+            on_click=lambda e: self.on_click(self.transaction) if self.on_click and self.transaction else None,
             on_hover=self._on_hover,
             animate=200
         )
 
+    def bind(self, transaction):
+        """Affiche `transaction` dans les contrôles existants (None : ligne vide en attente)"""
+        self.transaction = transaction
+        if transaction is None:
+            self._icone.value = ""
+            self._fond_icone.bgcolor = f"{COLORS.TEXTE_SECONDAIRE}20"
+            self._description.value = "Chargement…"
+            self._categorie.value = self._date.value = self._montant.value = ""
+            return
+
+        # Déterminer la couleur selon le type
+        if transaction.montant > 0:
+            color = COLORS.SUCCESS_REVENUS
+            sign = "+"
+        else:
+            color = COLORS.ERREUR_DEPENSES
+            sign = ""
+        self._icone.value = getattr(transaction, 'icone', '💰')
+        self._fond_icone.bgcolor = f"{color}20"
+        self._description.value = transaction.description
+        self._categorie.value = transaction.categorie
+        self._date.value = transaction.date.strftime("%d/%m/%Y")
+        self._montant.value = f"{sign}{abs(transaction.montant):,.2f} €"
+        self._montant.color = color
+
     def _on_hover(self, e):
         """Gère l'effet de survol"""
         actions_container = e.control.content.controls[-1]  # Dernier élément (actions)
@@ -150,17 +194,116 @@ class TransactionItem:
         e.control.update()
 
 
+class TransactionPages:
+    """
+    Source paginée des transactions d'une liste virtualisée
+
+    Les pages sont lues à la demande par charger_page(skip, limit) et gardées en cache LRU
+    (max_pages pages) : la mémoire reste bornée quelle que soit la longueur de la liste.
+    Le nombre total n'est connu qu'à la première page incomplète ; jusque-là, la liste
+    s'allonge à chaque nouvelle page (défilement infini).
+    """
+
+    def __init__(self, charger_page: Callable, taille_page: int = TAILLE_PAGE,
+                 max_pages: int = MAX_PAGES, asynchrone: bool = True):
+        """
+        Args:
+            charger_page: (skip, limit) -> liste de transactions (ou dict d'erreur)
+            taille_page: Nombre de transactions par page
+            max_pages: Nombre maximal de pages gardées en mémoire
+            asynchrone: Lire les pages dans un thread (source distante)
+        """
+        self._charger_page = charger_page
+        self.taille_page = taille_page
+        self.max_pages = max_pages
+        self.asynchrone = asynchrone
+        self._pages: 'OrderedDict[int, List]' = OrderedDict()
+        self._en_cours: Set[int] = set()
+        self._verrou = threading.Lock()
+        # Nombre de transactions connues (pages lues) et fin de liste atteinte
+        self.nombre = 0
+        self.complete = False
+
+    @classmethod
+    def from_list(cls, transactions: List) -> 'TransactionPages':
+        """Source d'une liste déjà en mémoire (pages = tranches de la liste)"""
+        source = cls(lambda skip, limit: transactions[skip:skip + limit], asynchrone=False)
+        source.nombre = len(transactions)
+        source.complete = True
+        return source
+
+    def __len__(self) -> int:
+        return self.nombre
+
+    def get(self, index: int):
+        """Transaction à une position, None si sa page n'est pas chargée"""
+        with self._verrou:
+            numero, decalage = divmod(index, self.taille_page)
+            page = self._pages.get(numero)
+            if page is None or decalage >= len(page):
+                return None
+            self._pages.move_to_end(numero)
+            return page[decalage]
+
+    def pages_manquantes(self, debut: int, fin: int) -> List[int]:
+        """Pages à lire pour couvrir les positions [debut, fin[ (au plus la page suivant la fin connue)"""
+        with self._verrou:
+            derniere = (self.nombre if self.complete else self.nombre + 1) - 1
+            fin = min(fin, derniere + 1)
+            if fin <= debut:
+                return []
+            return [numero for numero in range(debut // self.taille_page, (fin - 1) // self.taille_page + 1)
+                    if numero not in self._pages and numero not in self._en_cours]
+
+    def charger(self, numero: int) -> bool:
+        """
+        Lit une page (bloquant) et l'ajoute au cache
+
+        Returns:
+            bool: True si la page a été lue (False : déjà en cours ou erreur)
+        """
+        with self._verrou:
+            if numero in self._en_cours:
+                return False
+            self._en_cours.add(numero)
+        try:
+            page = self._charger_page(numero * self.taille_page, self.taille_page)
+        finally:
+            with self._verrou:
+                self._en_cours.discard(numero)
+        if isinstance(page, dict):
+            print(f"Erreur chargement des transactions: {page.get('error')}")
+            return False
+
+        with self._verrou:
+            self._pages[numero] = list(page)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+            self.nombre = max(self.nombre, numero * self.taille_page + len(page))
+            if len(page) < self.taille_page:
+                self.complete = True
+                self.nombre = numero * self.taille_page + len(page)
+        return True
+
+
 class TransactionsList:
     """
     Liste complète des transactions avec filtres et recherche
     Style DA 2025 avec touches violet lumineux
+
+    Liste virtualisée : seules les lignes visibles et un tampon de TAMPON_LIGNES de chaque
+    côté existent ; au défilement, ces mêmes lignes sont réaffectées (bind) aux transactions
+    devenues visibles, et deux espaces vides tiennent la place des autres. Avec charger_page,
+    les transactions sont lues page par page au fil du défilement (ex : miroir local).
     """
 
     def __init__(self, transactions: List = None,
                  on_transaction_click: Callable = None,
                  on_transaction_edit: Callable = None,
                  on_transaction_delete: Callable = None,
-                 max_items: int = None):
+                 max_items: int = None,
+                 charger_page: Callable = None,
+                 hauteur: int = HAUTEUR_VUE):
         """
         Initialise la liste des transactions
 
@@ -170,12 +313,34 @@ class TransactionsList:
             on_transaction_edit: Callback pour l'édition d'une transaction
             on_transaction_delete: Callback pour la suppression d'une transaction
             max_items: Nombre maximum d'éléments à afficher (None = tous)
+            charger_page: Lecture des transactions page par page au lieu de `transactions` :
+                (skip, limit, search=..., categorie=...) -> liste, plus récentes d'abord, avec
+                les mêmes filtres que la liste en mémoire (ex: BudgetManager.get_operations_page)
+            hauteur: Hauteur de la zone de défilement
         """
         self.transactions = transactions or []
         self.on_transaction_click = on_transaction_click
         self.on_transaction_edit = on_transaction_edit
         self.on_transaction_delete = on_transaction_delete
         self.max_items = max_items
+        self.charger_page = charger_page
+        self.hauteur = hauteur
+
+        # Lignes réutilisées et position de la première ligne construite
+        self._source: Optional[TransactionPages] = None
+        self._lignes: List[TransactionItem] = []
+        self._debut = 0
+        self._premier_visible = 0
+        self._verrou_rendu = threading.Lock()
+
+        # Filtrage en mémoire : transactions triées et clés de recherche normalisées (calculées
+        # une fois par liste), positions du dernier résultat et filtres qui l'ont produit
+        self._triees: Optional[List] = None
+        self._cles: List[str] = []
+        self._resultat: Optional[List[int]] = None
+        self._filtres_resultat = ("", None)
+        self._minuteur: Optional[threading.Timer] = None
+        self.delai_recherche = DELAI_RECHERCHE
 
         # Couleurs violet lumineux
         self.VIOLET_LUMINEUX = "#9C27B0"
@@ -227,7 +392,7 @@ class TransactionsList:
                         ],
                         border_color=COLORS.BORDURES,
                         text_style=ft.TextStyle(color=COLORS.TEXTE_PRINCIPAL),
-                        on_change=self._on_category_filter_change
+                        on_select=self._on_category_filter_change
                     ),
                     width=150
                 ),
@@ -247,38 +412,124 @@ class TransactionsList:
             border=ft.border.all(1, COLORS.BORDURES)
         )
 
-    def _build_transactions_container(self) -> ft.Container:
-        """Construit le container des transactions"""
-        filtered_transactions = self._filter_transactions()
-
-        if not filtered_transactions:
+    def _build_transactions_container(self, source: TransactionPages = None) -> ft.Container:
+        """Construit le container des transactions (lignes visibles et tampon seulement)"""
+        self._source = source if source is not None else self._creer_source()
+        if self._nombre_lignes() == 0:
+            self._lignes = []
             return self._build_empty_state()
 
-        # Limiter le nombre d'éléments si nécessaire
-        if self.max_items:
-            filtered_transactions = filtered_transactions[:self.max_items]
-
-        transaction_items = []
-        for transaction in filtered_transactions:
-            item = TransactionItem(
-                transaction=transaction,
+        taille_pool = self._taille_pool(self._source)
+        self._lignes = [
+            TransactionItem(
+                transaction=None,
                 on_click=self.on_transaction_click,
                 on_edit=self.on_transaction_edit,
                 on_delete=self.on_transaction_delete
             )
-            transaction_items.append(item.container)
+            for _ in range(taille_pool)
+        ]
+        for ligne in self._lignes:
+            ligne.container.margin = ft.margin.only(bottom=ESPACEMENT_LIGNES)
+        self._espace_haut = ft.Container(height=0)
+        self._espace_bas = ft.Container(height=0)
+        self._vue = ft.ListView(
+            controls=[self._espace_haut, *(ligne.container for ligne in self._lignes), self._espace_bas],
+            spacing=0,
+            height=self.hauteur,
+            scroll_interval=50,
+            on_scroll=self._on_scroll
+        )
+        self._debut = 0
+        self._premier_visible = 0
+        self._afficher_fenetre()
 
         return ft.Container(
-            content=ft.Column(
-                transaction_items,
-                spacing=8
-            ),
+            content=self._vue,
             bgcolor=COLORS.CARTES_COMPOSANTS,
             border_radius=12,
             border=ft.border.all(1, COLORS.BORDURES),
             padding=ft.padding.all(16)
         )
 
+    def _creer_source(self) -> TransactionPages:
+        """Source des lignes : pages lues par charger_page ou liste filtrée en mémoire"""
+        if self.charger_page is None:
+            return TransactionPages.from_list(self._filter_transactions())
+        filtres = {'search': self.search_query or None, 'categorie': self.selected_category}
+        source = TransactionPages(lambda skip, limit: self.charger_page(skip, limit, **filtres))
+        # Première page lue tout de suite : la liste vide s'affiche sans attendre un défilement
+        source.charger(0)
+        return source
+
+    def _nombre_lignes(self, source: TransactionPages = None) -> int:
+        """Nombre de lignes connues (borné par max_items)"""
+        nombre = len(source if source is not None else self._source)
+        return min(nombre, self.max_items) if self.max_items else nombre
+
+    def _taille_pool(self, source: TransactionPages) -> int:
+        """Nombre de lignes à construire : zone visible et tampons, au plus les lignes connues"""
+        nombre = self._nombre_lignes(source)
+        return min(nombre if source.complete else nombre + TAMPON_LIGNES,
+                   -(-self.hauteur // PAS_LIGNE) + 2 * TAMPON_LIGNES)
+
+    def _on_scroll(self, e):
+        """Réaffecte les lignes à la zone visible ; lit les pages manquantes (défilement infini)"""
+        self._premier_visible = max(0, int(e.pixels // PAS_LIGNE))
+        self._afficher_fenetre()
+        _mettre_a_jour(self._vue)
+
+    def _afficher_fenetre(self) -> List[ft.Control]:
+        """
+        Place les lignes construites autour de la première ligne visible
+
+        Returns:
+            List[ft.Control]: Lignes dont la transaction ou la visibilité a changé
+        """
+        source = self._source
+        with self._verrou_rendu:
+            nombre = self._nombre_lignes()
+            taille_pool = len(self._lignes)
+            debut = max(0, min(self._premier_visible - TAMPON_LIGNES, nombre - taille_pool))
+
+            # Pages à lire : la fenêtre, plus la suivante si la fin connue approche
+            fin = debut + taille_pool + (TAMPON_LIGNES if not source.complete else 0)
+            if self.max_items:
+                fin = min(fin, self.max_items)
+            manquantes = source.pages_manquantes(debut, fin)
+            if manquantes and not source.asynchrone:
+                for numero in manquantes:
+                    source.charger(numero)
+            elif manquantes:
+                threading.Thread(target=self._charger_pages, args=(source, manquantes), daemon=True).start()
+
+            visibles = 0
+            modifiees = []
+            for k, ligne in enumerate(self._lignes):
+                index = debut + k
+                visible = index < nombre
+                modifiee = ligne.container.visible != visible
+                ligne.container.visible = visible
+                if visible:
+                    visibles += 1
+                    transaction = source.get(index)
+                    if transaction is not ligne.transaction:
+                        ligne.bind(transaction)
+                        modifiee = True
+                if modifiee:
+                    modifiees.append(ligne.container)
+            self._debut = debut
+            self._espace_haut.height = debut * PAS_LIGNE
+            self._espace_bas.height = max(0, nombre - debut - visibles) * PAS_LIGNE
+            return modifiees
+
+    def _charger_pages(self, source: TransactionPages, numeros: List[int]):
+        """Lit des pages dans un thread puis rafraîchit les lignes (si la source est toujours affichée)"""
+        lues = [numero for numero in numeros if source.charger(numero)]
+        if lues and source is self._source:
+            self._afficher_fenetre()
+            _mettre_a_jour(self._vue)
+
     def _build_empty_state(self) -> ft.Container:
         """Construit l'état vide"""
         return ft.Container(
@@ -309,51 +560,93 @@ class TransactionsList:
         )
 
     def _filter_transactions(self) -> List:
-        """Filtre les transactions selon les critères"""
-        filtered = self.transactions.copy()
-
-        # Filtre par recherche
-        if self.search_query:
-            filtered = [t for t in filtered
-                        if self.search_query.lower() in t.description.lower()]
-
-        # Filtre par catégorie
-        if self.selected_category:
-            filtered = [t for t in filtered
-                        if t.categorie == self.selected_category]
+        """
+        Filtre les transactions selon les critères (plus récentes d'abord)
 
-        # Tri par date (plus récent en premier)
-        filtered.sort(key=lambda t: t.date, reverse=True)
+        La recherche ignore la casse et les accents. Une requête qui prolonge la précédente
+        (même catégorie) ne parcourt que le résultat précédent : une description qui contient
+        la nouvelle requête contient aussi l'ancienne.
+        """
+        if self._triees is None:
+            # Tri par date (plus récent en premier) et clés normalisées, une fois par liste
+            self._triees = sorted(self.transactions, key=lambda t: t.date, reverse=True)
+            self._cles = [_normaliser(t.description) for t in self._triees]
+            self._resultat = None
+
+        requete = _normaliser(self.search_query)
+        requete_precedente, categorie_precedente = self._filtres_resultat
+        if (self._resultat is not None and categorie_precedente == self.selected_category
+                and requete_precedente in requete):
+            candidats = self._resultat
+        elif self.selected_category:
+            candidats = [i for i, t in enumerate(self._triees) if t.categorie == self.selected_category]
+        else:
+            candidats = range(len(self._triees))
 
-        return filtered
+        if candidats is not self._resultat or requete != requete_precedente:
+            cles = self._cles
+            self._resultat = [i for i in candidats if requete in cles[i]] if requete else list(candidats)
+        self._filtres_resultat = (requete, self.selected_category)
+        return [self._triees[i] for i in self._resultat]
 
     def _on_search_change(self, e):
-        """Gère le changement de recherche"""
+        """Gère le changement de recherche (appliquée après DELAI_RECHERCHE sans nouvelle frappe)"""
         self.search_query = e.control.value or ""
-        self._refresh_list()
+        self._annuler_recherche_en_attente()
+        if self.delai_recherche <= 0:
+            self._appliquer_filtres()
+            return
+        self._minuteur = threading.Timer(self.delai_recherche, self._appliquer_filtres)
+        self._minuteur.daemon = True
+        self._minuteur.start()
+
+    def _annuler_recherche_en_attente(self):
+        if self._minuteur is not None:
+            self._minuteur.cancel()
+            self._minuteur = None
 
     def _on_category_filter_change(self, e):
         """Gère le changement de filtre de catégorie"""
         self.selected_category = e.control.value if e.control.value else None
-        self._refresh_list()
+        self._annuler_recherche_en_attente()
+        self._appliquer_filtres()
+
+    def _appliquer_filtres(self):
+        """
+        Affiche le résultat des filtres courants
+
+        Si les lignes déjà construites suffisent, elles sont réaffectées sur place et seules
+        celles dont la transaction ou la visibilité change sont envoyées à l'affichage ;
+        sinon (liste vide avant ou après, résultat plus long que les lignes construites),
+        le container est reconstruit.
+        """
+        source = self._creer_source()
+        taille_pool = self._taille_pool(source)
+        if not self._lignes or self._nombre_lignes(source) == 0 or taille_pool > len(self._lignes):
+            self._refresh_list(source)
+            return
+        self._source = source
+        modifiees = self._afficher_fenetre()
+        _mettre_a_jour_controles([self._espace_haut, *modifiees, self._espace_bas])
 
     def _on_sort_click(self, e):
         """Gère le clic sur le tri"""
         # Ici vous pouvez implémenter différents modes de tri
         print("Tri des transactions...")
 
-    def _refresh_list(self):
+    def _refresh_list(self, source: TransactionPages = None):
         """Rafraîchit la liste des transactions"""
         # Reconstruire le container des transactions
-        new_container = self._build_transactions_container()
+        new_container = self._build_transactions_container(source)
 
         # Remplacer le container existant
         self.container.content.controls[2] = new_container  # Index 2 = transactions container
-        self.container.update()
+        _mettre_a_jour(self.container)
 
     def update_transactions(self, new_transactions: List):
         """Met à jour la liste des transactions"""
         self.transactions = new_transactions
+        self._triees = None
         self._refresh_list()
 
     def get_container(self) -> ft.Container:
@@ -72,20 +72,22 @@ def main(page: ft.Page):
         # Créer les répertoires nécessaires
         data_directory = create_application_directories()
 
-        # Initialiser le gestionnaire de budget
+        # Initialiser le gestionnaire de budget (sans appel API : chargé en arrière-plan)
         print("🔧 Initialisation du BudgetManager...")
-        budget_manager = BudgetManager(data_directory=data_directory)
-
-        print(f"✅ BudgetManager initialisé:")
-        print(f"   💰 Solde: {budget_manager.get_solde():.2f}€")
-        print(f"   📝 Transactions: {budget_manager.nombre_transactions}")
-        print(f"   📂 Catégories: {len(budget_manager.categories_budgets)}")
-        print(f"   🎯 Données de démo: {'Oui' if budget_manager.has_demo_data else 'Non'}")
+        budget_manager = BudgetManager(data_directory=data_directory, autoload=False)
 
         # Créer et démarrer l'application principale
         print("🚀 Lancement de l'interface Flet...")
         app = BudgetApp(page, budget_manager)
 
+        def on_data_loaded():
+            print(f"✅ BudgetManager initialisé:")
+            print(f"   💰 Solde: {budget_manager.get_solde():.2f}€")
+            print(f"   📝 Transactions: {budget_manager.nombre_transactions}")
+            print(f"   📂 Catégories: {len(budget_manager.categories_budgets)}")
+            print(f"   🎯 Données de démo: {'Oui' if budget_manager.has_demo_data else 'Non'}")
+            app.on_data_loaded()
+
         # Configuration des callbacks pour fermeture propre
         def on_window_close(e):
             print("🔚 Fermeture de l'application...")
@@ -93,8 +95,11 @@ def main(page: ft.Page):
 
         page.on_window_event = lambda e: on_window_close(e) if e.data == "close" else None
 
-        # Démarrer l'application
+        # Afficher l'interface (squelettes) puis charger les données sans bloquer le premier rendu
         app.start()
+        budget_manager.start_background_load(on_loaded=on_data_loaded)
+        # Écritures locales envoyées au serveur par lots, sans bloquer la saisie
+        budget_manager.start_background_sync()
 
         print("✅ Application prête - Interface chargée avec succès!")
         print("🌱⚡ BudgetApp 2025 - Edition Nature & Tech pour développeurs passionnés!")
@@ -4,10 +4,11 @@ Page Dashboard corrigée pour BudgetApp DA 2025
 Utilise les graphiques Plotly corrigés qui fonctionnent avec Flet
 """
 
+import heapq
 import flet as ft
 from typing import Optional, Callable, List
 from src.frontend.theme.colors import COLORS
-from src.frontend.components.stat_card import StatCard
+from src.frontend.components.stat_card import SkeletonStatCard, StatCard
 
 # Import de la version corrigée des graphiques
 try:
@@ -48,17 +49,37 @@ class DashboardPage:
         self.VIOLET_LUMINEUX = "#9C27B0"
         self.VIOLET_GLOW = "#E1BEE7"
 
+        # Sections dépendant des données, remplies dès que le chargement est terminé
+        self.stats_section = ft.Container()
+        self.recent_section = ft.Container()
+
+    def _data_loaded(self) -> bool:
+        """Vrai si le gestionnaire a fini de charger les opérations"""
+        chargement = getattr(self.budget_manager, 'chargement_termine', None)
+        return chargement is None or chargement.is_set()
+
     def build(self) -> ft.Container:
-        """Construit la page Dashboard complète"""
+        """
+        Construit la page Dashboard complète.
+        Tant que les données ne sont pas chargées, les sections correspondantes affichent
+        des squelettes ; show_data() les remplit ensuite sans reconstruire la page.
+        """
         try:
+            if self._data_loaded():
+                self.stats_section.content = self._build_stats_row()
+                self.recent_section.content = self._build_recent_activity()
+            else:
+                self.stats_section.content = self._build_stats_skeleton()
+                self.recent_section.content = self._build_recent_skeleton()
+
             content = ft.Column([
                 self._build_header(),
                 ft.Container(height=24),
-                self._build_stats_row(),
+                self.stats_section,
                 ft.Container(height=32),
                 self._build_charts_section(),
                 ft.Container(height=32),
-                self._build_recent_activity(),
+                self.recent_section,
             ])
 
             return ft.Container(
@@ -118,14 +139,59 @@ class DashboardPage:
             bgcolor="transparent"
         )
 
+    def show_data(self):
+        """
+        Remplit les sections en attente une fois les données chargées.
+        Appelable depuis le thread de chargement : chaque section est mise à jour dès qu'elle est prête.
+        """
+        try:
+            self.stats_section.content = self._build_stats_row()
+            self.stats_section.update()
+            self.recent_section.content = self._build_recent_activity()
+            self.recent_section.update()
+        except Exception as e:
+            print(f"❌ Erreur affichage des données: {e}")
+
+    def _build_stats_skeleton(self) -> ft.Row:
+        """Cartes statistiques de chargement (même disposition que _build_stats_row)"""
+        cards = []
+        for title, icon in (("Solde Total", "💰"), ("Revenus (mois)", "📈"), ("Dépenses (mois)", "📉")):
+            if cards:
+                cards.append(ft.Container(width=15))
+            cards.append(ft.Container(content=SkeletonStatCard(title, icon).build(), expand=True, height=140))
+        return ft.Row(cards, alignment=ft.MainAxisAlignment.CENTER, wrap=False)
+
+    def _build_recent_skeleton(self) -> ft.Container:
+        """Section d'activité récente pendant le chargement"""
+        return ft.Container(
+            content=ft.Column([
+                ft.Text(
+                    "🕒 Activité Récente",
+                    size=20,
+                    weight=ft.FontWeight.BOLD,
+                    color=COLORS.TEXTE_PRINCIPAL
+                ),
+                ft.Container(height=16),
+                ft.Container(
+                    content=ft.ProgressRing(width=32, height=32, color=self.VIOLET_LUMINEUX),
+                    height=200,
+                    alignment=ft.Alignment(0, 0)
+                )
+            ]),
+            padding=ft.padding.all(20),
+            bgcolor=COLORS.CARTES_COMPOSANTS,
+            border_radius=12,
+            border=ft.border.all(1, COLORS.BORDURES)
+        )
+
     def _build_stats_row(self) -> ft.Row:
         """Construit la ligne des statistiques principales"""
         try:
-            # Calcul sécurisé des statistiques
-            transactions = getattr(self.budget_manager, 'transactions', [])
-            revenus = sum(t.montant for t in transactions if hasattr(t, 'montant') and t.montant > 0)
-            depenses = sum(abs(t.montant) for t in transactions if hasattr(t, 'montant') and t.montant < 0)
-            solde = revenus - depenses
+            # Totaux maintenus par le gestionnaire (solde global, revenus et dépenses du mois)
+            stats = self.budget_manager.get_statistics()
+            solde = stats['solde_total']
+            revenus = stats['revenus_mois']
+            depenses = stats['depenses_mois']
 
             return ft.Row([
                 # Carte Solde Total
@@ -272,8 +338,8 @@ class DashboardPage:
     def _build_recent_transactions_list(self) -> ft.Container:
         """Construit la liste des transactions récentes"""
         try:
-            transactions = getattr(self.budget_manager, 'transactions', [])
-            recent_transactions = transactions[-5:] if transactions else []
+            # Les 5 opérations les plus récentes, sans trier tout l'historique
+            recent_transactions = heapq.nlargest(5, self.budget_manager.operations, key=lambda t: t.date)
 
             if not recent_transactions:
                 return ft.Container(
@@ -286,7 +352,7 @@ class DashboardPage:
                 )
 
             transaction_items = []
-            for transaction in reversed(recent_transactions):
+            for transaction in recent_transactions:
                 transaction_items.append(self._build_transaction_item(transaction))
 
             return ft.Container(
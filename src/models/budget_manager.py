@@ -6,21 +6,29 @@ Gère les transactions, catégories et statistiques
 
 import json
 import os
-from datetime import datetime, date
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, date, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
+from typing import Callable, List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, replace
 from src.services.api_client import BudgetAPIClient
+from src.services.http_cache import HTTPCache
+from src.services.local_journal import LocalJournal
+from src.services.local_store import LocalStore
+from src.models.operation_store import ColumnarHistory, OperationColumns, OperationSnapshot, OperationTotals
 
-@dataclass
+@dataclass(frozen=True)
 class Operation:
-    """Modèle de transaction simplifié"""
+    """Modèle de transaction simplifié (immuable : une modification crée une nouvelle instance)"""
     id: int
     description: str
     montant: float
     categorie: str
     date: datetime
     icone: str = "💰"
+    idcompte: int = 1
 
     def to_dict(self) -> Dict[str, Any]:
         """Convertit en dictionnaire pour la sérialisation"""
@@ -30,7 +38,8 @@ class Operation:
             'montant': self.montant,
             'categorie': self.categorie,
             'date': self.date.isoformat(),
-            'icone': self.icone
+            'icone': self.icone,
+            'idcompte': self.idcompte
         }
 
     @classmethod
@@ -42,7 +51,8 @@ class Operation:
             montant=data['montant'],
             categorie=data['categorie'],
             date=datetime.fromisoformat(data['date']),
-            icone=data.get('icone', '💰')
+            icone=data.get('icone', '💰'),
+            idcompte=data.get('idcompte', 1)
         )
 
 
@@ -80,57 +90,833 @@ class CategoryBudget:
         )
 
 
+# Mode fenêtré : nombre de mois récents gardés en mémoire (0 = tout l'historique)
+BUDGET_WINDOW_MONTHS = int(os.getenv("BUDGET_WINDOW_MONTHS", "0"))
+# Mode fenêtré : nombre maximal d'opérations des mois anciens gardées en cache (LRU par mois)
+BUDGET_ARCHIVE_MAX_OPERATIONS = int(os.getenv("BUDGET_ARCHIVE_MAX_OPERATIONS", "20000"))
+# File d'attente des écritures : taille des lots envoyés au serveur
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))
+# Nouvel essai après un échec d'envoi : délai doublé à chaque essai, plafonné (secondes)
+OUTBOX_RETRY_BACKOFF = 2.0
+OUTBOX_RETRY_MAX_DELAY = 300.0
+# Envoi différé pour regrouper les saisies rapprochées (secondes)
+OUTBOX_FLUSH_DELAY = 0.5
+# Journal de l'état local : nombre d'entrées avant réécriture de l'instantané
+JOURNAL_COMPACT_EVERY = int(os.getenv("JOURNAL_COMPACT_EVERY", "1000"))
+# Jeton dont l'utilisateur n'a pas encore été vérifié
+_NON_VERIFIE = object()
+
+
+def _cle_mois(moment: datetime) -> Tuple[int, int]:
+    """Clé (année, mois) de l'index mensuel des opérations"""
+    return moment.year, moment.month
+
+
+def _premier_jour_mois(cle: Tuple[int, int]) -> date:
+    return date(cle[0], cle[1], 1)
+
+
+def _dernier_jour_mois(cle: Tuple[int, int]) -> date:
+    annee, mois = cle
+    suivant = date(annee + 1, 1, 1) if mois == 12 else date(annee, mois + 1, 1)
+    return suivant - timedelta(days=1)
+
+
+def _operation_from_api(op: Dict[str, Any]) -> 'Operation':
+    """Convertit une opération de l'API vers notre format"""
+    return Operation(
+        id=op['idoperation'],
+        description=op['description'],
+        montant=float(op['montant']),
+        categorie="Inconnu",  # Pour l'instant
+        date=datetime.fromisoformat(op['date']),
+        icone="💰",
+        idcompte=op['idcompte']
+    )
+
+
+def _champs_api(operation: 'Operation') -> Dict[str, Any]:
+    """Champs d'une opération gérés par l'API (format de l'API)"""
+    return {
+        'date': operation.date.date().isoformat(),
+        'description': operation.description,
+        'montant': f"{operation.montant:.2f}",
+        'idcompte': operation.idcompte,
+    }
+
+
 class BudgetManager:
     """
     Gestionnaire principal de budget
     Port du BudgetManager C++ vers Python
+
+    Accès concurrents : les modifications sont sérialisées par un verrou ; les lectures
+    (operations, statistiques) passent par un instantané immuable (snapshot()) recréé
+    après chaque modification, sans bloquer les écritures suivantes. Les appels API
+    sont faits hors verrou.
+
+    Hors ligne d'abord : les opérations sont recopiées dans un miroir SQLite local
+    (LocalStore). Au lancement, load_local() affiche ce miroir sans attendre le serveur ;
+    load_operations_from_api() n'applique ensuite que les changements depuis la dernière
+    synchronisation (chargement complet seulement la première fois). Les données locales
+    sont rangées par utilisateur (utilisateurs/<id>, d'après GET /api/auth/me) : un autre
+    jeton ne reprend ni le miroir, ni le curseur, ni les écritures d'un autre utilisateur.
+
+    Écritures optimistes : add_operation, update_operation et remove_operation modifient
+    immédiatement les données locales et consignent l'écriture dans une file d'attente
+    durable, envoyée par lots en arrière-plan (start_background_sync) avec clés
+    d'idempotence et nouveaux essais. En cas de conflit, les valeurs du serveur l'emportent
+    et le conflit est ajouté à `conflits`.
+
+    État local : budgets de catégories et champs locaux des opérations (catégorie, icône,
+    inconnus du serveur) sont enregistrés dans un journal en ajout seul (LocalJournal),
+    compacté tous les JOURNAL_COMPACT_EVERY changements.
+
+    Analyses : les opérations résidentes sont aussi tenues en colonnes .npy (ColumnarHistory),
+    mises à jour ligne à ligne à chaque synchronisation et relues par memory mapping
+    (colonnes_historique()), sans reconstruire de colonnes depuis les objets Operation.
     """
 
-    def __init__(self, data_directory: str = None):
+    def __init__(self, data_directory: str = None, fenetre_mois: Optional[int] = None,
+                 max_operations_archives: Optional[int] = None, autoload: bool = True):
         """
         Initialise le gestionnaire de budget
 
         Args:
             data_directory: Répertoire pour les données (optionnel)
+            fenetre_mois: Mode fenêtré, nombre de mois récents gardés en mémoire
+                (BUDGET_WINDOW_MONTHS par défaut, 0 = tout l'historique)
+            max_operations_archives: Mode fenêtré, budget mémoire des mois anciens chargés
+                à la demande (BUDGET_ARCHIVE_MAX_OPERATIONS par défaut)
+            autoload: Charger les opérations dès la construction (appel API bloquant) ;
+                sinon utiliser start_background_load()
         """
-        self.api_client = BudgetAPIClient()
         self.data_directory = data_directory or self._get_default_data_directory()
         self._ensure_data_directory()
+        # Réponses GET conservées entre les lancements (ETag / Cache-Control)
+        self.api_client = BudgetAPIClient(cache=HTTPCache(str(Path(self.data_directory) / "http_cache.sqlite3")))
+        # Données locales rangées par utilisateur (utilisateurs/<id>), celles du dernier
+        # utilisateur identifié ouvertes au lancement ; jeton dont l'utilisateur a été vérifié
+        self.utilisateur = self._lire_dernier_utilisateur()
+        self._jeton_verifie: Any = _NON_VERIFIE
+        # Miroir local, historique en colonnes et journal de l'état local
+        self._ouvrir_stockage()
+        # IDs modifiés depuis la dernière mise à jour de l'historique
+        self._historique_modifies: set = set()
+        # État propre au client : catégories et champs locaux des opérations, par ID
+        self._annotations: Dict[int, Dict[str, str]] = {}
+        self._journal_verrou = threading.Lock()
 
-        # Collections principales
-        self.operations: List[Operation] = []
+        # Opérations indexées par ID (ordre d'insertion conservé) et par (année, mois)
+        self._par_id: Dict[int, Operation] = {}
+        self._par_mois: Dict[Tuple[int, int], Dict[int, Operation]] = {}
         self.categories_budgets: List[CategoryBudget] = []
 
+        # Totaux maintenus à chaque ajout / modification / suppression
+        self._totaux = OperationTotals()
+        # Mode debug (DEBUG=true) : les totaux sont revérifiés depuis zéro après chaque modification
+        self.debug = os.getenv("DEBUG", "False").lower() == "true"
+
+        # Verrou des écritures et instantané des lectures (recréé à la première lecture
+        # après une modification)
+        self._verrou = threading.RLock()
+        self._version = 0
+        self._snapshot: Optional[OperationSnapshot] = None
+
+        # Mode fenêtré : seuls les mois à partir de _debut_fenetre sont résidents, les mois
+        # antérieurs sont résumés par les agrégats serveur et chargés page par page (LRU)
+        self.fenetre_mois = BUDGET_WINDOW_MONTHS if fenetre_mois is None else fenetre_mois
+        self.max_operations_archives = (
+            BUDGET_ARCHIVE_MAX_OPERATIONS if max_operations_archives is None else max_operations_archives
+        )
+        self._debut_fenetre: Optional[Tuple[int, int]] = None
+        self._agregats_archives: List[Dict[str, Any]] = []
+        self._pages_archives: 'OrderedDict[Tuple[int, int], List[Operation]]' = OrderedDict()
+        self._nb_operations_archives = 0
+
         # Compteurs
         self._next_transaction_id = 1
         self._next_category_id = 1
 
         # État
         self.has_demo_data = False
+        # Vrai dès que les opérations en mémoire correspondent au miroir local
+        self._miroir_charge = False
+        # File d'attente des écritures : envoi en cours, réveil du thread d'envoi, arrêt
+        self._envoi_verrou = threading.Lock()
+        self._ecritures_en_attente = threading.Event()
+        self._arret = threading.Event()
+        # Conflits et écritures refusées par le serveur (à signaler à l'utilisateur)
+        self.conflits: deque = deque(maxlen=100)
+        self._dernier_idalerte: Optional[int] = None
+        # Signalé à la fin du premier chargement (réussi ou non)
+        self.chargement_termine = threading.Event()
 
         # Initialisation
-        self.load_operations_from_api()
         self._initialize_demo_categories()
+        self._charger_etat_local()
+        if autoload:
+            self.load_operations_from_api()
+
+    def start_background_load(self, on_loaded: Optional[Callable[[], None]] = None) -> threading.Thread:
+        """
+        Charge les opérations dans un thread, sans bloquer l'interface
+
+        Args:
+            on_loaded: Appelé (depuis le thread de chargement) une fois le chargement terminé
+
+        Returns:
+            threading.Thread: Thread de chargement démarré
+        """
+        def charger():
+            # Affichage immédiat depuis le miroir local, puis synchronisation avec le serveur
+            if self.load_local():
+                self.chargement_termine.set()
+                if on_loaded:
+                    on_loaded()
+            self.load_operations_from_api()
+            if on_loaded:
+                on_loaded()
+
+        thread = threading.Thread(target=charger, name="budget-load", daemon=True)
+        thread.start()
+        return thread
 
     def load_operations_from_api(self):
-        """Charge les opérations depuis l'API"""
-        result = self.api_client.get_operations()
+        """
+        Synchronise les opérations avec l'API
+
+        Si le miroir local couvre la fenêtre courante, seuls les changements depuis la
+        dernière synchronisation sont demandés ; sinon tout est rechargé. En mode fenêtré,
+        seules les opérations des `fenetre_mois` derniers mois sont chargées ; les totaux
+        des mois antérieurs viennent des agrégats mensuels du serveur. API injoignable :
+        les données du miroir local restent affichées.
+        """
+        try:
+            with self._envoi_verrou:
+                identifie = self._verifier_utilisateur()
+            if not identifie:
+                # Utilisateur du jeton inconnu (hors ligne) : données locales du dernier utilisateur
+                if not self._miroir_charge:
+                    self.load_local()
+                return
+            # Écritures locales envoyées d'abord : les changements du serveur ne les écrasent pas
+            self.flush_outbox(ignorer_delai=True)
+            debut = self._debut_fenetre_courante()
+            if self._miroir_valide(debut) and (self._miroir_charge or self.load_local()):
+                self._sync_operations()
+            else:
+                self._load_operations(debut)
+            self._sync_references()
+        finally:
+            self.chargement_termine.set()
+
+    def _debut_fenetre_courante(self) -> Optional[Tuple[int, int]]:
+        """Premier mois résident en mode fenêtré (None : tout l'historique)"""
+        if self.fenetre_mois <= 0:
+            return None
+        now = datetime.now()
+        index = now.year * 12 + now.month - self.fenetre_mois
+        return index // 12, index % 12 + 1
+
+    def _miroir_valide(self, debut: Optional[Tuple[int, int]]) -> bool:
+        """Vrai si le miroir local a été rempli pour cette fenêtre"""
+        fenetre = _premier_jour_mois(debut).isoformat() if debut else ""
+        return self.local_store.curseur is not None and self.local_store.get_meta("fenetre") == fenetre
+
+    def load_local(self) -> bool:
+        """
+        Charge les opérations depuis le miroir local (aucun appel API)
+
+        Returns:
+            bool: True si le miroir couvrait la fenêtre courante et a été chargé
+        """
+        debut = self._debut_fenetre_courante()
+        if not self._miroir_valide(debut):
+            return False
 
+        date_debut = _premier_jour_mois(debut).isoformat() if debut else None
+        operations = [self._depuis_api(op) for op in self.local_store.load_operations(date_debut)]
+        with self._verrou:
+            self._debut_fenetre = debut
+            self._agregats_archives = (self.local_store.load_reference("agregats_archives") or []) if debut else []
+            self._pages_archives.clear()
+            self._nb_operations_archives = 0
+            self.operations = operations
+            self._miroir_charge = True
+        return True
+
+    def _load_operations(self, debut: Optional[Tuple[int, int]]):
+        """Chargement complet depuis l'API, recopié dans le miroir local"""
+        if self.local_store.nombre_ecritures_en_attente:
+            print("Écritures locales non envoyées : rechargement complet reporté")
+            return
+
+        # Curseur lu avant le chargement : les écritures concurrentes seront resynchronisées
+        changements = self.api_client.get_operation_changes()
+        if "error" in changements:
+            print(f"Erreur API: {changements['error']}")
+            return
+
+        filtres: Dict[str, Any] = {}
+        agregats: List[Dict[str, Any]] = []
+        if debut is not None:
+            filtres["date_debut"] = _premier_jour_mois(debut).isoformat()
+            agregats = self.api_client.get_monthly_stats(date_fin=(_premier_jour_mois(debut) - timedelta(days=1)).isoformat())
+            if "error" in agregats:
+                print(f"Erreur API: {agregats['error']}")
+                return
+
+        result = self.api_client.get_all_operations(**filtres)
         if "error" in result:
             print(f"Erreur API: {result['error']}")
             return
 
-        # Convertir les opérations de l'API vers notre format
-        self.operations = []
-        for op in result:
-            self.operations.append(Operation(
-                id=op['idoperation'],
-                description=op['description'],
-                montant=float(op['montant']),
-                categorie="Inconnu",  # Pour l'instant
-                date=datetime.fromisoformat(op['date']),
-                icone="💰"
-            ))
+        operations = [self._depuis_api(op) for op in result]
+        with self._verrou:
+            self._debut_fenetre = debut
+            self._agregats_archives = agregats
+            self._pages_archives.clear()
+            self._nb_operations_archives = 0
+            self.historique.invalider()
+            self.operations = operations
+            self._miroir_charge = True
+
+        self.local_store.save_reference("agregats_archives", agregats)
+        self.local_store.replace_operations(result, changements["curseur"], filtres.get("date_debut", ""))
+
+    def _sync_operations(self):
+        """Applique les changements du serveur depuis le curseur du miroir local"""
+        changements = self.api_client.get_operation_changes(depuis=self.local_store.curseur)
+        if "error" in changements:
+            print(f"Erreur API (données locales conservées): {changements['error']}")
+            return
+        # Opérations ayant des écritures locales non confirmées : l'état local est conservé
+        en_attente = self.local_store.pending_ids()
+        operations_serveur = [op for op in changements["operations"] if op['idoperation'] not in en_attente]
+        supprimees_serveur = [i for i in changements["supprimees"] if i not in en_attente]
+        if not operations_serveur and not supprimees_serveur:
+            self.local_store.apply_changes([], [], changements["curseur"])
+            return
+
+        # Mode fenêtré : une opération (re)datée avant la fenêtre quitte les mois résidents
+        upserts = []
+        supprimees = list(supprimees_serveur)
+        archives_modifiees = False
+        with self._verrou:
+            for op in operations_serveur:
+                operation = self._depuis_api(op)
+                if self._est_archive(_cle_mois(operation.date)):
+                    supprimees.append(operation.id)
+                    archives_modifiees = True
+                else:
+                    upserts.append(operation)
+            archives_modifiees = archives_modifiees or any(i not in self._par_id for i in supprimees_serveur)
+
+        agregats = None
+        if self._debut_fenetre is not None and archives_modifiees:
+            agregats = self.api_client.get_monthly_stats(
+                date_fin=(_premier_jour_mois(self._debut_fenetre) - timedelta(days=1)).isoformat()
+            )
+            if "error" in agregats:
+                print(f"Erreur API (données locales conservées): {agregats['error']}")
+                return
+
+        self.apply_sync_delta(upserts, supprimees)
+        with self._verrou:
+            self._mettre_a_jour_historique()
+        if agregats is not None:
+            with self._verrou:
+                self._agregats_archives = agregats
+                self._pages_archives.clear()
+                self._nb_operations_archives = 0
+                self.operations = list(self._par_id.values())
+            self.local_store.save_reference("agregats_archives", agregats)
+        self.local_store.apply_changes(operations_serveur, supprimees_serveur, changements["curseur"])
+
+    # ========== UTILISATEUR ==========
+    def _repertoire_utilisateur(self, utilisateur: Optional[int]) -> Path:
+        """Données locales d'un utilisateur ('anonyme' tant qu'aucun n'a été identifié)"""
+        return Path(self.data_directory) / "utilisateurs" / (str(utilisateur) if utilisateur is not None else "anonyme")
+
+    def _lire_dernier_utilisateur(self) -> Optional[int]:
+        try:
+            return int((Path(self.data_directory) / "utilisateur").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _ouvrir_stockage(self):
+        """Ouvre le miroir local, l'historique en colonnes et le journal de l'utilisateur courant"""
+        repertoire = self._repertoire_utilisateur(self.utilisateur)
+        repertoire.mkdir(parents=True, exist_ok=True)
+        # Miroir local des opérations, des données de référence et de la file d'attente
+        self.local_store = LocalStore(str(repertoire / "budget_local.sqlite3"))
+        # Colonnes des opérations pour les analyses (fichiers .npy projetés en mémoire)
+        self.historique = ColumnarHistory(str(repertoire / "historique"))
+        self.journal = LocalJournal(str(repertoire / "etat_local"))
+
+    def _verifier_utilisateur(self) -> bool:
+        """
+        Rattache les données locales à l'utilisateur du jeton courant (GET /api/auth/me)
+
+        Vérifié une fois par jeton, avant tout échange avec le serveur (verrou d'envoi tenu) :
+        le curseur de synchronisation et les écritures en attente d'un utilisateur ne sont
+        jamais utilisés avec le jeton d'un autre.
+
+        Returns:
+            bool: False si l'utilisateur n'a pas pu être identifié (API injoignable)
+        """
+        jeton = getattr(self.api_client, 'token', None)
+        if jeton == self._jeton_verifie:
+            return True
+        utilisateur = self.api_client.get_current_user()
+        if "error" in utilisateur:
+            print(f"Erreur API (utilisateur non vérifié): {utilisateur['error']}")
+            return False
+        if utilisateur['idutilisateur'] != self.utilisateur:
+            self._changer_utilisateur(utilisateur['idutilisateur'])
+        self._jeton_verifie = jeton
+        return True
+
+    def _changer_utilisateur(self, utilisateur: int):
+        """
+        Remplace les données locales ouvertes par celles de `utilisateur`
+
+        Celles de l'utilisateur précédent restent dans leur répertoire. Les données saisies
+        avant toute identification (répertoire 'anonyme') reviennent au premier utilisateur
+        identifié.
+        """
+        with self._verrou, self._journal_verrou:
+            self.local_store.close()
+            self.journal.close()
+            nouveau = self._repertoire_utilisateur(utilisateur)
+            if self.utilisateur is None and not nouveau.exists():
+                try:
+                    nouveau.parent.mkdir(parents=True, exist_ok=True)
+                    self._repertoire_utilisateur(None).rename(nouveau)
+                except OSError:
+                    pass
+            self.utilisateur = utilisateur
+            (Path(self.data_directory) / "utilisateur").write_text(str(utilisateur), encoding="utf-8")
+            self._ouvrir_stockage()
+
+            self._annotations = {}
+            self._initialize_demo_categories()
+            self._charger_etat_local()
+            self._debut_fenetre = None
+            self._agregats_archives = []
+            self._pages_archives.clear()
+            self._nb_operations_archives = 0
+            self._miroir_charge = False
+            self.conflits.clear()
+            self._dernier_idalerte = None
+            if not self.load_local():
+                self.operations = []
+
+    # ========== FILE D'ATTENTE DES ÉCRITURES ==========
+    def start_background_sync(self, intervalle: float = 30.0) -> threading.Thread:
+        """
+        Envoie la file d'attente des écritures en arrière-plan
+
+        Le thread est réveillé par chaque écriture locale (envoi groupé après OUTBOX_FLUSH_DELAY)
+        et, pour les nouveaux essais, toutes les `intervalle` secondes.
+
+        Returns:
+            threading.Thread: Thread d'envoi démarré
+        """
+        def envoyer():
+            while not self._arret.is_set():
+                if self._ecritures_en_attente.wait(intervalle):
+                    time.sleep(OUTBOX_FLUSH_DELAY)
+                self._ecritures_en_attente.clear()
+                if not self._arret.is_set():
+                    self.flush_outbox()
+
+        thread = threading.Thread(target=envoyer, name="budget-outbox", daemon=True)
+        thread.start()
+        return thread
+
+    def stop_background_sync(self):
+        """Arrête le thread d'envoi (les écritures non envoyées restent dans la file)"""
+        self._arret.set()
+        self._ecritures_en_attente.set()
+
+    @property
+    def nombre_ecritures_en_attente(self) -> int:
+        """Nombre d'écritures locales pas encore confirmées par le serveur"""
+        return self.local_store.nombre_ecritures_en_attente
+
+    def flush_outbox(self, ignorer_delai: bool = False) -> int:
+        """
+        Envoie les écritures en attente, par lots de OUTBOX_BATCH_SIZE
+
+        Un lot qui échoue (réseau, serveur indisponible) reste dans la file et sera renvoyé
+        plus tard avec les mêmes clés d'idempotence. Sans effet si un envoi est déjà en cours.
+
+        Args:
+            ignorer_delai: Renvoyer sans attendre la fin du délai avant nouvel essai
+
+        Returns:
+            int: Nombre d'écritures traitées par le serveur
+        """
+        if not self._envoi_verrou.acquire(blocking=False):
+            return 0
+        try:
+            # Écritures envoyées seulement avec le jeton de leur utilisateur
+            if not self._verifier_utilisateur():
+                return 0
+            traitees = 0
+            while True:
+                lot = self.local_store.pending_writes(OUTBOX_BATCH_SIZE, ignorer_delai)
+                if not lot:
+                    return traitees
+                resultats = self.api_client.push_operation_writes(lot)
+                if isinstance(resultats, dict) and "error" in resultats:
+                    print(f"Erreur API (écritures conservées): {resultats['error']}")
+                    self.local_store.postpone_writes([e['cle'] for e in lot], OUTBOX_RETRY_BACKOFF,
+                                                     OUTBOX_RETRY_MAX_DELAY)
+                    return traitees
+
+                self.local_store.complete_writes([e['cle'] for e in lot])
+                en_attente = self.local_store.pending_ids()
+                for ecriture, resultat in zip(lot, resultats):
+                    self._appliquer_resultat(ecriture, resultat, en_attente)
+                traitees += len(lot)
+        finally:
+            self._envoi_verrou.release()
+
+    def _appliquer_resultat(self, ecriture: Dict[str, Any], resultat: Dict[str, Any], en_attente: set):
+        """
+        Reporte localement le résultat serveur d'une écriture
+
+        L'état serveur remplace l'état local, sauf si d'autres écritures locales sur la même
+        opération sont encore en attente (seul l'ID d'une création est alors remplacé).
+        """
+        identifiant = ecriture['idoperation']
+        etat = resultat.get('operation')
+        if resultat['statut'] != 'ok':
+            self.conflits.append({**resultat, 'action': ecriture['action'], 'idoperation': identifiant})
+
+        if resultat['statut'] == 'erreur':
+            if ecriture['action'] == 'create':
+                # Création refusée : l'opération locale et ses écritures suivantes sont abandonnées
+                self.local_store.discard_writes(identifiant)
+                self._remplacer_operation(identifiant, None)
+                return
+            etat = self.api_client.get_operation(identifiant)
+            if "error" in etat:
+                if not etat['error'].startswith("404"):
+                    return
+                etat = None
+
+        if ecriture['action'] == 'create' and etat is not None:
+            self.local_store.map_local_id(identifiant, etat['idoperation'])
+            if identifiant in en_attente:
+                self._renumeroter_operation(identifiant, etat['idoperation'])
+                return
+        if (etat['idoperation'] if etat is not None else identifiant) not in en_attente:
+            self._remplacer_operation(identifiant, etat)
+
+    def _remplacer_operation(self, identifiant: int, etat: Optional[Dict[str, Any]]):
+        """Remplace (ou supprime si `etat` est None) une opération locale par l'état du serveur"""
+        with self._verrou:
+            ancienne = self._par_id.get(identifiant)
+            if ancienne is not None:
+                self._desindexer(ancienne)
+            if etat is not None:
+                operation = self._depuis_api(etat)
+                if ancienne is not None:
+                    operation = replace(operation, categorie=ancienne.categorie, icone=ancienne.icone)
+                precedente = self._par_id.get(operation.id)
+                if precedente is not None:
+                    self._desindexer(precedente)
+                if not self._est_archive(_cle_mois(operation.date)):
+                    self._indexer(operation)
+            self._invalider_vues()
+        remplacees = [identifiant] if etat is None or etat['idoperation'] != identifiant else []
+        self.local_store.apply_changes([etat] if etat is not None else [], remplacees)
+        if remplacees:
+            self._deplacer_annotation(identifiant, etat['idoperation'] if etat is not None else None)
+
+    def _renumeroter_operation(self, identifiant: int, idoperation: int):
+        """Donne son ID serveur à une opération créée localement, sans toucher à ses valeurs"""
+        with self._verrou:
+            ancienne = self._par_id.get(identifiant)
+            if ancienne is None:
+                return
+            operation = replace(ancienne, id=idoperation)
+            self._desindexer(ancienne)
+            self._indexer(operation)
+            self._invalider_vues()
+        self.local_store.renumber_operation(identifiant, idoperation)
+        self._deplacer_annotation(identifiant, idoperation)
+
+    # ========== ÉTAT LOCAL (JOURNAL) ==========
+    def _charger_etat_local(self):
+        """Rétablit catégories et champs locaux depuis l'instantané et les entrées du journal"""
+        etat, entrees = self.journal.load()
+        if etat is not None:
+            self.categories_budgets = [CategoryBudget.from_dict(c) for c in etat['categories']]
+            self._next_category_id = etat['next_category_id']
+            self._annotations = {int(i): champs for i, champs in etat['annotations'].items()}
+        for entree in entrees:
+            self._rejouer(entree)
+
+    def _etat_local(self) -> Dict[str, Any]:
+        """État local complet (contenu de l'instantané)"""
+        return {
+            'categories': [c.to_dict() for c in self.categories_budgets],
+            'next_category_id': self._next_category_id,
+            'annotations': {str(i): champs for i, champs in self._annotations.items()},
+        }
+
+    def _rejouer(self, entree: Dict[str, Any]):
+        """Applique une entrée du journal à l'état en mémoire"""
+        if entree['type'] == 'categorie':
+            categorie = CategoryBudget.from_dict(entree['categorie'])
+            self.categories_budgets = [c for c in self.categories_budgets if c.id != categorie.id] + [categorie]
+            self._next_category_id = max(self._next_category_id, categorie.id + 1)
+        elif entree['type'] == 'annotation':
+            self._annotations[entree['id']] = {'categorie': entree['categorie'], 'icone': entree['icone']}
+        elif entree['type'] == 'annotation_supprimee':
+            self._annotations.pop(entree['id'], None)
+
+    def _journaliser(self, entree: Dict[str, Any]):
+        """Applique une entrée et l'ajoute au journal (instantané réécrit tous les JOURNAL_COMPACT_EVERY ajouts)"""
+        with self._journal_verrou:
+            self._rejouer(entree)
+            self.journal.append(entree)
+            if self.journal.nombre_entrees >= JOURNAL_COMPACT_EVERY:
+                self.journal.compact(self._etat_local())
+
+    def _annoter(self, operation: Operation):
+        """Enregistre les champs locaux d'une opération s'ils diffèrent des valeurs par défaut"""
+        if (operation.categorie, operation.icone) != ("Inconnu", "💰"):
+            self._journaliser({'type': 'annotation', 'id': operation.id,
+                               'categorie': operation.categorie, 'icone': operation.icone})
+        elif operation.id in self._annotations:
+            self._journaliser({'type': 'annotation_supprimee', 'id': operation.id})
+
+    def _deplacer_annotation(self, identifiant: int, idoperation: Optional[int]):
+        """Reporte les champs locaux sur l'ID serveur (ou les oublie si l'opération a disparu)"""
+        champs = self._annotations.get(identifiant)
+        if champs is None:
+            return
+        if idoperation is not None:
+            self._journaliser({'type': 'annotation', 'id': idoperation, **champs})
+        self._journaliser({'type': 'annotation_supprimee', 'id': identifiant})
+
+    def _depuis_api(self, op: Dict[str, Any]) -> Operation:
+        """Opération de l'API complétée par ses champs locaux"""
+        operation = _operation_from_api(op)
+        champs = self._annotations.get(operation.id)
+        return replace(operation, **champs) if champs else operation
+
+    def _sync_references(self):
+        """Recopie les comptes, catégories et sous-catégories dans le miroir local"""
+        for nom, lire in (("comptes", self.api_client.get_comptes),
+                          ("categories", self.api_client.get_categories),
+                          ("sous_categories", self.api_client.get_sous_categories)):
+            result = lire()
+            if isinstance(result, dict) and "error" in result:
+                continue
+            self.local_store.save_reference(nom, result)
+
+    def get_comptes(self) -> List[Dict[str, Any]]:
+        """Comptes de l'utilisateur (miroir local, format de l'API)"""
+        return self.local_store.load_reference("comptes") or []
+
+    def get_categories(self) -> List[Dict[str, Any]]:
+        """Catégories (miroir local, format de l'API)"""
+        return self.local_store.load_reference("categories") or []
+
+    def get_sous_categories(self) -> List[Dict[str, Any]]:
+        """Sous-catégories (miroir local, format de l'API)"""
+        return self.local_store.load_reference("sous_categories") or []
+
+    def _est_archive(self, cle: Tuple[int, int]) -> bool:
+        """Vrai si le mois est antérieur à la fenêtre résidente"""
+        return self._debut_fenetre is not None and cle < self._debut_fenetre
+
+    def _page_archive(self, cle: Tuple[int, int]) -> List[Operation]:
+        """
+        Opérations d'un mois antérieur à la fenêtre, chargées à la demande
+
+        Les mois chargés sont gardés en cache LRU ; les moins récemment consultés sont
+        évincés dès que le cache dépasse max_operations_archives opérations.
+        """
+        with self._verrou:
+            if cle in self._pages_archives:
+                self._pages_archives.move_to_end(cle)
+                return self._pages_archives[cle]
+
+        result = self.api_client.get_all_operations(
+            date_debut=_premier_jour_mois(cle).isoformat(),
+            date_fin=_dernier_jour_mois(cle).isoformat()
+        )
+        if "error" in result:
+            print(f"Erreur API: {result['error']}")
+            return []
+
+        page = [self._depuis_api(op) for op in result]
+        with self._verrou:
+            if cle not in self._pages_archives:
+                self._pages_archives[cle] = page
+                self._nb_operations_archives += len(page)
+            while self._nb_operations_archives > self.max_operations_archives and len(self._pages_archives) > 1:
+                _, evincee = self._pages_archives.popitem(last=False)
+                self._nb_operations_archives -= len(evincee)
+        return page
+
+    # ========== INDEX DES OPÉRATIONS ==========
+    def snapshot(self) -> OperationSnapshot:
+        """
+        Instantané immuable et cohérent des opérations et des totaux
+
+        Recréé au plus une fois par modification ; à utiliser pour toute lecture qui
+        parcourt les opérations ou combine plusieurs totaux.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._verrou:
+            if self._snapshot is None:
+                self._snapshot = OperationSnapshot(
+                    self._version, tuple(self._par_id.values()), self._totaux.copie()
+                )
+            return self._snapshot
+
+    @property
+    def operations(self) -> Tuple[Operation, ...]:
+        """Opérations de l'instantané courant (lecture seule : passer par les méthodes pour modifier)"""
+        return self.snapshot().operations
+
+    @operations.setter
+    def operations(self, operations: List[Operation]):
+        """Remplace toutes les opérations et reconstruit les index"""
+        with self._verrou:
+            self._par_id = {}
+            self._par_mois = {}
+            self._totaux = self._totaux_archives()
+            for operation in operations:
+                self._indexer(operation)
+            # Historique en colonnes conservé s'il correspond déjà (relance depuis le miroir local)
+            self._historique_modifies.clear()
+            if not self.historique.propre or self.historique.empreinte() != self._empreinte():
+                self.historique.rebuild(self._par_id.values())
+            self._invalider_vues()
+
+    def _empreinte(self) -> Tuple[int, int, int, int]:
+        """Résumé des opérations résidentes au format de ColumnarHistory.empreinte()"""
+        epoque = date(1970, 1, 1)
+        operations = self._par_id.values()
+        return (len(self._par_id), sum(self._par_id), sum(round(op.montant * 100) for op in operations),
+                sum((op.date.date() - epoque).days for op in operations))
+
+    def _totaux_archives(self) -> OperationTotals:
+        """Totaux des mois antérieurs à la fenêtre (vides hors mode fenêtré)"""
+        totaux = OperationTotals()
+        for agregat in self._agregats_archives:
+            mois = date.fromisoformat(agregat['mois'])
+            totaux.ajouter_agregat(mois.year, mois.month, float(agregat['total_revenus']),
+                                   float(agregat['total_depenses']), agregat['nb_operations'])
+        return totaux
+
+    @property
+    def colonnes(self) -> OperationColumns:
+        """Vue colonnes des opérations de l'instantané courant"""
+        return self.snapshot().colonnes
+
+    def colonnes_historique(self) -> OperationColumns:
+        """
+        Colonnes des opérations résidentes, projetées depuis les fichiers .npy
+
+        Rien n'est construit ni parsé : seules les pages lues par les agrégations sont
+        chargées. L'ordre des lignes n'a pas de sens (utiliser la colonne ids).
+        """
+        with self._verrou:
+            self._mettre_a_jour_historique()
+            return self.historique.colonnes
+
+    def _mettre_a_jour_historique(self):
+        """Reporte dans l'historique en colonnes les opérations modifiées (verrou tenu)"""
+        if not self._historique_modifies:
+            return
+        modifies = self._historique_modifies
+        self._historique_modifies = set()
+        self.historique.apply([self._par_id[i] for i in modifies if i in self._par_id],
+                              [i for i in modifies if i not in self._par_id])
+
+    def get_operation(self, operation_id: int) -> Optional[Operation]:
+        """Retourne une opération par son ID (None si inconnue)"""
+        with self._verrou:
+            return self._par_id.get(operation_id)
+
+    def get_operations_of_month(self, year: int, month: int) -> List[Operation]:
+        """
+        Retourne les opérations d'un mois sans parcourir tout l'historique
+        (en mode fenêtré, les mois antérieurs à la fenêtre sont chargés depuis l'API)
+        """
+        if self._est_archive((year, month)):
+            return list(self._page_archive((year, month)))
+        with self._verrou:
+            return list(self._par_mois.get((year, month), {}).values())
+
+    def _indexer(self, operation: Operation):
+        """Ajoute une opération aux index par ID et par mois et à ses totaux"""
+        self._par_id[operation.id] = operation
+        self._par_mois.setdefault(_cle_mois(operation.date), {})[operation.id] = operation
+        self._totaux.ajouter(operation)
+        self._historique_modifies.add(operation.id)
+
+    def _desindexer(self, operation: Operation):
+        """Retire une opération des index par ID et par mois et de ses totaux"""
+        self._totaux.retirer(operation)
+        del self._par_id[operation.id]
+        self._historique_modifies.add(operation.id)
+        cle = _cle_mois(operation.date)
+        bucket = self._par_mois[cle]
+        del bucket[operation.id]
+        if not bucket:
+            del self._par_mois[cle]
+
+    def _invalider_vues(self):
+        """À appeler (verrou tenu) après toute modification des opérations"""
+        self._version += 1
+        self._snapshot = None
+        # Historique mis à jour en différé : marqué à reconstruire si l'application s'arrête avant
+        if self._historique_modifies:
+            self.historique.invalider()
+        if self.debug:
+            self._verifier_totaux()
+
+    def _verifier_totaux(self):
+        """Compare les totaux incrémentaux à un recalcul complet (mode debug)"""
+        recalcul = self._totaux_archives()
+        for operation in self._par_id.values():
+            recalcul.ajouter(operation)
+        if recalcul != self._totaux:
+            raise AssertionError("Totaux incrémentaux incohérents avec les opérations")
+
+    def apply_sync_delta(self, upserts: List[Operation], deleted_ids: List[int]):
+        """
+        Applique un delta de synchronisation sans recharger toutes les opérations
+
+        Args:
+            upserts: Opérations créées ou modifiées (remplacent celles de même ID)
+            deleted_ids: IDs des opérations supprimées
+        """
+        with self._verrou:
+            for operation_id in deleted_ids:
+                operation = self._par_id.get(operation_id)
+                if operation is not None:
+                    self._desindexer(operation)
+            for operation in upserts:
+                ancienne = self._par_id.get(operation.id)
+                if ancienne is not None:
+                    self._desindexer(ancienne)
+                self._indexer(operation)
+            self._invalider_vues()
 
     def _get_default_data_directory(self) -> str:
         """Retourne le répertoire par défaut pour les données"""
@@ -143,21 +929,21 @@ class BudgetManager:
         Path(self.data_directory).mkdir(parents=True, exist_ok=True)
 
     def get_solde(self) -> float:
-        """Calcule le solde total"""
-        return sum(t.montant for t in self.operations)
+        """Solde total (total maintenu incrémentalement)"""
+        return self.snapshot().totaux.solde
 
     def get_revenus_total(self) -> float:
         """Calcule le total des revenus"""
-        return sum(t.montant for t in self.operations if t.montant > 0)
+        return self.snapshot().totaux.revenus_total
 
     def get_depenses_total(self) -> float:
         """Calcule le total des dépenses (valeur absolue)"""
-        return sum(abs(t.montant) for t in self.operations if t.montant < 0)
+        return self.snapshot().totaux.depenses_total
 
     @property
     def nombre_transactions(self) -> int:
         """Nombre total de transactions"""
-        return len(self.operations)
+        return len(self.snapshot().operations)
 
     def _initialize_demo_categories(self):
         """Catégories de démo temporaires (en attendant l'API)"""
@@ -168,19 +954,37 @@ class BudgetManager:
             CategoryBudget(4, "Salaire", 3000.0, "#00E5FF", "💼"),
             CategoryBudget(5, "Factures", 500.0, "#FF6B6B", "🧾"),
         ]
+        self._next_category_id = len(self.categories_budgets) + 1
 
     def add_operation(self, description: str, montant: float, categorie: str = "", date_operation: datetime = None,
                       icone: str = "💰"):
-        """Ajoute une opération via l'API"""
-        result = self.api_client.create_operation(
-            date=datetime.now().strftime("%Y-%m-%d"),  # Date du jour
+        """
+        Ajoute une opération localement, sans attendre le réseau
+
+        L'opération reçoit un ID local négatif, remplacé par l'ID serveur quand la file
+        d'attente des écritures a été envoyée.
+
+        Returns:
+            Dict: Opération au format de l'API
+        """
+        jour = (date_operation or datetime.now()).date()  # Date du jour par défaut
+        operation = Operation(
+            id=self.local_store.next_local_id(),
             description=description,
-            montant=montant,
+            montant=float(montant),
+            categorie=categorie or "Inconnu",
+            date=datetime(jour.year, jour.month, jour.day),
+            icone=icone,
             idcompte=1  # Pour l'instant, toujours le compte 1
         )
-        # Recharge les opérations depuis l'API pour mettre à jour la liste locale
-        self.load_operations_from_api()
-        return result
+        donnees = {**_champs_api(operation), 'idtype': 1}
+        with self._verrou:
+            self._indexer(operation)
+            self._invalider_vues()
+        self.local_store.enqueue_write("create", operation.id, donnees, ligne={'idoperation': operation.id, **donnees})
+        self._annoter(operation)
+        self._ecritures_en_attente.set()
+        return {'idoperation': operation.id, **donnees}
 
     def add_category(self, nom: str, budget_mensuel: float, couleur: str,
                      icone: str = "📁") -> CategoryBudget:
@@ -204,9 +1008,7 @@ class BudgetManager:
             icone=icone
         )
 
-        self.categories_budgets.append(category)
-        self._next_category_id += 1
-
+        self._journaliser({'type': 'categorie', 'categorie': category.to_dict()})
         return category
 
     def get_operations_by_category(self, category_name: str) -> List[Operation]:
@@ -221,6 +1023,37 @@ class BudgetManager:
         """
         return [t for t in self.operations if t.categorie == category_name]
 
+    def get_operations_page(self, skip: int, limit: int, search: Optional[str] = None,
+                            categorie: Optional[str] = None) -> List[Operation]:
+        """
+        Page d'opérations lue dans le miroir local, plus récentes d'abord (listes à défilement infini)
+
+        Mêmes règles que le filtrage en mémoire de TransactionsList : opérations pas encore
+        envoyées comprises (ID local négatif), catégorie locale des opérations
+        (Operation.categorie), recherche sans casse ni accents. En mode fenêtré, seuls les
+        mois résidents sont couverts.
+
+        Args:
+            skip: Nombre d'opérations sautées
+            limit: Taille de la page
+            search: Texte recherché dans la description
+            categorie: Catégorie locale des opérations
+
+        Returns:
+            List[Operation]: Opérations de la page
+        """
+        ids, exclure_ids = None, False
+        if categorie:
+            with self._journal_verrou:
+                categories = {i: champs['categorie'] for i, champs in self._annotations.items()}
+            if categorie == "Inconnu":
+                # Catégorie par défaut : toutes les opérations sauf celles classées ailleurs
+                ids, exclure_ids = [i for i, nom in categories.items() if nom != categorie], True
+            else:
+                ids = [i for i, nom in categories.items() if nom == categorie]
+        lignes = self.local_store.page_operations(skip, limit, search=search, ids=ids, exclure_ids=exclure_ids)
+        return [self._depuis_api(op) for op in lignes]
+
     def get_monthly_summary(self, year: int = None, month: int = None) -> Dict[str, Any]:
         """
         Retourne un résumé mensuel
@@ -236,21 +1069,46 @@ class BudgetManager:
         target_year = year or now.year
         target_month = month or now.month
 
-        # Filtrer les transactions du mois
-        monthly_transactions = [
-            t for t in self.operations
-            if t.date.year == target_year and t.date.month == target_month
+        if self._est_archive((target_year, target_month)):
+            resume = self.snapshot().totaux.mois(target_year, target_month)
+            resume['transactions'] = self.get_operations_of_month(target_year, target_month)
+            return resume
+
+        # Totaux et opérations lus ensemble pour rester cohérents
+        with self._verrou:
+            resume = self._totaux.mois(target_year, target_month)
+            resume['transactions'] = list(self._par_mois.get((target_year, target_month), {}).values())
+        return resume
+
+    def get_monthly_history(self) -> List[Dict[str, Any]]:
+        """
+        Résumé de chaque mois présent dans l'historique (mois hors fenêtre compris)
+
+        Returns:
+            List[Dict]: {'mois', 'revenus', 'depenses', 'solde', 'nb_transactions'} par mois
+        """
+        totaux = self.snapshot().totaux
+        return [
+            {'mois': f"{annee:04d}-{mois:02d}", **totaux.mois(annee, mois)}
+            for annee, mois in sorted(totaux.par_mois)
         ]
 
-        revenus = sum(t.montant for t in monthly_transactions if t.montant > 0)
-        depenses = sum(abs(t.montant) for t in monthly_transactions if t.montant < 0)
+    def get_analytics(self, top: int = 5) -> Dict[str, Any]:
+        """
+        Analyse de tout l'historique résident, agrégée sur les colonnes .npy projetées
+
+        Args:
+            top: Nombre de catégories dans 'top_categories'
 
+        Returns:
+            Dict: 'totaux', 'mensuel' (résumé par mois), 'depenses_par_categorie', 'top_categories'
+        """
+        colonnes = self.colonnes_historique()
         return {
-            'revenus': revenus,
-            'depenses': depenses,
-            'solde': revenus - depenses,
-            'nb_transactions': len(monthly_transactions),
-            'transactions': monthly_transactions
+            'totaux': colonnes.totaux(),
+            'mensuel': colonnes.resume_mensuel(),
+            'depenses_par_categorie': colonnes.depenses_par_categorie(),
+            'top_categories': colonnes.top_categories(top),
         }
 
     def get_category_spending(self, category_name: str, year: int = None, month: int = None) -> float:
@@ -269,19 +1127,15 @@ class BudgetManager:
         target_year = year or now.year
         target_month = month or now.month
 
-        category_transactions = [
-            t for t in self.operations
-            if (t.categorie == category_name and
-                t.date.year == target_year and
-                t.date.month == target_month and
-                t.montant < 0)  # Seulement les dépenses
-        ]
-
-        return sum(abs(t.montant) for t in category_transactions)
+        if self._est_archive((target_year, target_month)):
+            # Mois hors fenêtre : pas de détail par catégorie dans les agrégats, lire la page
+            return sum(abs(t.montant) for t in self._page_archive((target_year, target_month))
+                       if t.categorie == category_name and t.montant < 0)
+        return self.snapshot().totaux.depenses_categorie(category_name, target_year, target_month)
 
     def remove_operation(self, operation_id: int) -> bool:
         """
-        Supprime une opération
+        Supprime une opération localement ; la suppression est envoyée par la file d'attente
 
         Args:
             operation_id: ID de l'opération à supprimer
@@ -289,15 +1143,21 @@ class BudgetManager:
         Returns:
             bool: True si supprimée avec succès
         """
-        for i, operation in enumerate(self.operations):
-            if operation.id == operation_id:
-                del self.operations[i]
-                return True
-        return False
+        with self._verrou:
+            operation = self._par_id.get(operation_id)
+            if operation is None:
+                return False
+            self._desindexer(operation)
+            self._invalider_vues()
+        self.local_store.enqueue_write("delete", operation_id, avant=_champs_api(operation))
+        if operation_id in self._annotations:
+            self._journaliser({'type': 'annotation_supprimee', 'id': operation_id})
+        self._ecritures_en_attente.set()
+        return True
 
     def update_operation(self, operation_id: int, **kwargs) -> Optional[Operation]:
         """
-        Met à jour une opération
+        Met à jour une opération localement ; la modification est envoyée par la file d'attente
 
         Args:
             operation_id: ID de l'opération
@@ -306,13 +1166,148 @@ class BudgetManager:
         Returns:
             Transaction: Opération mise à jour ou None si non trouvée
         """
-        for operation in self.operations:
-            if operation.id == operation_id:
-                for key, value in kwargs.items():
-                    if hasattr(operation, key):
-                        setattr(operation, key, value)
-                return operation
-        return None
+        with self._verrou:
+            operation = self._par_id.get(operation_id)
+            if operation is None:
+                return None
+
+            # Les opérations sont immuables : la version modifiée remplace l'ancienne
+            nouvelle = replace(operation, **{key: value for key, value in kwargs.items() if hasattr(operation, key)})
+            self._remplacer_localement(operation, nouvelle)
+            self._invalider_vues()
+
+        # Seuls les champs gérés par l'API sont envoyés (catégorie et icône restent locales)
+        if (nouvelle.id, nouvelle.categorie, nouvelle.icone) != (operation.id, operation.categorie, operation.icone):
+            self._annoter(nouvelle)
+        avant, apres = _champs_api(operation), _champs_api(nouvelle)
+        modifies = {champ: valeur for champ, valeur in apres.items() if avant[champ] != valeur}
+        if modifies:
+            self.local_store.enqueue_write("update", operation.id, modifies,
+                                           avant={champ: avant[champ] for champ in modifies})
+            self._ecritures_en_attente.set()
+        return nouvelle
+
+    def _remplacer_localement(self, operation: Operation, nouvelle: Operation):
+        """Remplace une opération indexée par sa version modifiée (verrou tenu)"""
+        # L'ID et la date sont des clés d'index : retirer puis réindexer si elles changent,
+        # sinon remplacer sur place (l'opération garde sa place) et corriger les totaux
+        if nouvelle.id != operation.id or nouvelle.date != operation.date:
+            self._desindexer(operation)
+            self._indexer(nouvelle)
+        else:
+            self._totaux.retirer(operation)
+            self._par_id[operation.id] = nouvelle
+            self._par_mois[_cle_mois(operation.date)][operation.id] = nouvelle
+            self._totaux.ajouter(nouvelle)
+            self._historique_modifies.add(operation.id)
+
+    def remove_operations(self, operation_ids: List[int]) -> int:
+        """
+        Supprime plusieurs opérations localement ; une suppression par opération est consignée
+        dans la file d'attente, envoyée par lots de OUTBOX_BATCH_SIZE
+
+        Comme pour remove_operation, une opération créée hors ligne (ID local négatif) n'est
+        supprimée sur le serveur qu'après sa création : les écritures d'une même opération
+        sont envoyées dans l'ordre.
+
+        Args:
+            operation_ids: IDs des opérations à supprimer
+
+        Returns:
+            int: Nombre d'opérations supprimées
+        """
+        with self._verrou:
+            supprimees = []
+            for operation_id in dict.fromkeys(operation_ids):
+                operation = self._par_id.get(operation_id)
+                if operation is not None:
+                    self._desindexer(operation)
+                    supprimees.append(operation)
+            if supprimees:
+                self._invalider_vues()
+        for operation in supprimees:
+            self.local_store.enqueue_write("delete", operation.id, avant=_champs_api(operation))
+            if operation.id in self._annotations:
+                self._journaliser({'type': 'annotation_supprimee', 'id': operation.id})
+        if supprimees:
+            self._ecritures_en_attente.set()
+        return len(supprimees)
+
+    def update_operations(self, operation_ids: List[int], **changements) -> int:
+        """
+        Applique les mêmes changements à plusieurs opérations localement ; une modification par
+        opération est consignée dans la file d'attente, envoyée par lots de OUTBOX_BATCH_SIZE
+
+        Args:
+            operation_ids: IDs des opérations à modifier
+            **changements: Champs API à mettre à jour (ex: idsouscategorie=7) ; date, description,
+                montant et idcompte sont aussi appliqués aux opérations locales
+
+        Returns:
+            int: Nombre d'opérations modifiées
+        """
+        locaux: Dict[str, Any] = {}
+        if 'description' in changements:
+            locaux['description'] = changements['description']
+        if 'montant' in changements:
+            locaux['montant'] = float(changements['montant'])
+        if 'idcompte' in changements:
+            locaux['idcompte'] = changements['idcompte']
+        if 'date' in changements:
+            jour = changements['date']
+            jour = date.fromisoformat(jour) if isinstance(jour, str) else jour
+            locaux['date'] = datetime(jour.year, jour.month, jour.day)
+
+        with self._verrou:
+            modifiees = []
+            for operation_id in dict.fromkeys(operation_ids):
+                operation = self._par_id.get(operation_id)
+                if operation is None:
+                    continue
+                nouvelle = replace(operation, **locaux)
+                self._remplacer_localement(operation, nouvelle)
+                modifiees.append((operation, nouvelle))
+            if modifiees:
+                self._invalider_vues()
+
+        for operation, nouvelle in modifiees:
+            avant, apres = _champs_api(operation), _champs_api(nouvelle)
+            # Champs gérés localement au format de l'API, les autres (idtype, idsouscategorie) tels quels
+            donnees = {champ: apres.get(champ, valeur) for champ, valeur in changements.items()}
+            self.local_store.enqueue_write("update", operation.id, donnees,
+                                           avant={champ: avant[champ] for champ in donnees if champ in avant})
+        if modifiees:
+            self._ecritures_en_attente.set()
+        return len(modifiees)
+
+    def get_budget_report(self, year: int = None, month: int = None) -> Dict[str, Any]:
+        """
+        Rapport budget / réel calculé côté serveur (GET /api/budgets/report)
+
+        Args:
+            year: Année (année courante par défaut)
+            month: Mois (mois courant par défaut)
+
+        Returns:
+            Dict: {'mois', 'lignes'} ou {'error'} si l'API est injoignable
+        """
+        now = datetime.now()
+        mois = date(year or now.year, month or now.month, 1)
+        return self.api_client.get_budget_report(mois=mois.isoformat())
+
+    def poll_alertes(self) -> List[Dict[str, Any]]:
+        """
+        Récupère les alertes budgétaires apparues depuis le dernier appel
+
+        Returns:
+            List[Dict]: Nouvelles alertes (vide si aucune ou si l'API est injoignable)
+        """
+        result = self.api_client.get_alertes(depuis=self._dernier_idalerte)
+        if isinstance(result, dict) and "error" in result:
+            return []
+        if result:
+            self._dernier_idalerte = result[-1]["idalerte"]
+        return result
 
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -323,21 +1318,14 @@ class BudgetManager:
         """
         now = datetime.now()
         today = now.date()
-
-        # Transactions du mois courant
-        current_month_transactions = [
-            t for t in self.operations
-            if t.date.year == now.year and t.date.month == now.month
-        ]
-
-        # Revenus et dépenses du mois
-        revenus_mois = [t for t in current_month_transactions if t.montant > 0]
-        depenses_mois = [t for t in current_month_transactions if t.montant < 0]
+        snapshot = self.snapshot()
+        totaux = snapshot.totaux
+        mois = totaux.mois(now.year, now.month)
 
         # Statistiques par catégorie
         categories_stats = {}
         for category in self.categories_budgets:
-            spent = self.get_category_spending(category.nom)
+            spent = totaux.depenses_categorie(category.nom, now.year, now.month)
             remaining = max(0, category.budget_mensuel - spent)
             percentage = (spent / category.budget_mensuel * 100) if category.budget_mensuel > 0 else 0
 
@@ -353,32 +1341,30 @@ class BudgetManager:
                 'remaining': remaining,
                 'percentage': percentage,
                 'status': status,
-                'transactions_count': len(self.get_operations_by_category(category.nom))
+                'transactions_count': totaux.nombre_par_categorie.get(category.nom, 0)
             }
 
         # Top catégories par dépenses
-        category_spending = [(cat.nom, self.get_category_spending(cat.nom))
-                             for cat in self.categories_budgets]
         top_categories = sorted(
-            [(name, amount) for name, amount in category_spending if amount > 0],
+            [(name, stats['spent']) for name, stats in categories_stats.items() if stats['spent'] > 0],
             key=lambda x: x[1],
             reverse=True
         )[:5]
 
         return {
-            'solde_total': self.get_solde(),
-            'revenus_total': self.get_revenus_total(),
-            'depenses_total': self.get_depenses_total(),
-            'revenus_mois': sum(t.montant for t in revenus_mois),
-            'depenses_mois': sum(abs(t.montant) for t in depenses_mois),
-            'nombre_transactions': len(self.operations),
-            'nombre_transactions_mois': len(current_month_transactions),
+            'solde_total': totaux.solde,
+            'revenus_total': totaux.revenus_total,
+            'depenses_total': totaux.depenses_total,
+            'revenus_mois': mois['revenus'],
+            'depenses_mois': mois['depenses'],
+            'nombre_transactions': totaux.nombre,
+            'nombre_transactions_mois': mois['nb_transactions'],
             'nombre_categories': len(self.categories_budgets),
             'categories_actives': len([c for c in self.categories_budgets if c.actif]),
             'categories_stats': categories_stats,
             'top_categories_depenses': top_categories,
-            'derniere_transaction': self.operations[-1].date.isoformat() if self.operations else None,
-            'moyenne_depense_jour': (sum(abs(t.montant) for t in depenses_mois) / today.day) if today.day > 0 else 0,
+            'derniere_transaction': snapshot.operations[-1].date.isoformat() if snapshot.operations else None,
+            'moyenne_depense_jour': (mois['depenses'] / today.day) if today.day > 0 else 0,
             'derniere_mise_a_jour': now.isoformat()
         }
 
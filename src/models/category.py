@@ -4,7 +4,7 @@ Modèle CategoryBudget - Port exact de la logique C++ vers Python
 Gère les catégories avec budgets et limites de dépenses
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional, Sequence
 import json
 
 
@@ -485,4 +485,149 @@ class CategoryBudget:
         """Pour le tri par nom"""
         if not isinstance(other, CategoryBudget):
             return NotImplemented
-        return self._name.lower() < other._name.lower()
\ No newline at end of file
+        return self._name.lower() < other._name.lower()
+
+
+# Colonnes du format de sérialisation, dans l'ordre des arguments de CompactCategoryBudget
+_CHAMPS_CATEGORIE = ("name", "budget", "spent", "icon", "color", "description", "actif",
+                     "budget_mensuel", "alerte_seuil", "limite_stricte")
+_DEFAUTS_CATEGORIE = ("", 0.0, 0.0, "💰", "#00E5FF", "", True, True, 0.8, False)
+
+
+class CompactCategoryBudget:
+    """
+    Variante compacte de CategoryBudget pour les grands volumes
+
+    Attributs en __slots__ (pas de __dict__ par instance) lus directement, sans propriété
+    Python intermédiaire. Même format de sérialisation que CategoryBudget ; from_dicts /
+    from_columns construisent toute une liste en un appel.
+    """
+
+    __slots__ = _CHAMPS_CATEGORIE
+
+    def __init__(self, name: str = "", budget: float = 0.0, spent: float = 0.0, icon: str = "💰",
+                 color: str = "#00E5FF", description: str = "", actif: bool = True,
+                 budget_mensuel: bool = True, alerte_seuil: float = 0.8, limite_stricte: bool = False):
+        self.name = name
+        self.budget = budget
+        self.spent = spent
+        self.icon = icon
+        self.color = color if color.startswith('#') else "#00E5FF"
+        self.description = description
+        self.actif = actif
+        self.budget_mensuel = budget_mensuel
+        self.alerte_seuil = max(0.0, min(1.0, alerte_seuil))
+        self.limite_stricte = limite_stricte
+
+    # ===== PROPRIÉTÉS CALCULÉES =====
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.budget - self.spent)
+
+    @property
+    def percentage_used(self) -> float:
+        if self.budget <= 0:
+            return 0.0
+        return (self.spent / self.budget) * 100.0
+
+    @property
+    def is_over_budget(self) -> bool:
+        return self.spent > self.budget and self.budget > 0
+
+    @property
+    def is_near_limit(self) -> bool:
+        if self.budget <= 0:
+            return False
+        return (self.spent / self.budget) >= self.alerte_seuil
+
+    @property
+    def status(self) -> str:
+        """Statut de la catégorie : 'ok', 'warning', 'over', 'inactive'"""
+        if not self.actif:
+            return 'inactive'
+        elif self.is_over_budget:
+            return 'over'
+        elif self.is_near_limit:
+            return 'warning'
+        return 'ok'
+
+    # ===== SÉRIALISATION =====
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Même format que CategoryBudget.to_dict"""
+        donnees = {nom: getattr(self, nom) for nom in _CHAMPS_CATEGORIE}
+        donnees["version"] = "2.0"
+        return donnees
+
+    def to_json(self) -> str:
+        """JSON compact (sans indentation)"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CompactCategoryBudget':
+        return cls.from_dicts([data])[0]
+
+    @classmethod
+    def from_dicts(cls, donnees: Iterable[Dict[str, Any]]) -> List['CompactCategoryBudget']:
+        """
+        Construit une liste de catégories depuis des dictionnaires (format de to_dict)
+
+        Raises:
+            ValueError: Dictionnaire invalide
+        """
+        try:
+            return [
+                cls(str(d.get("name", "")), float(d.get("budget", 0.0)), float(d.get("spent", 0.0)),
+                    str(d.get("icon", "💰")), str(d.get("color", "#00E5FF")), str(d.get("description", "")),
+                    bool(d.get("actif", True)), bool(d.get("budget_mensuel", True)),
+                    float(d.get("alerte_seuil", 0.8)), bool(d.get("limite_stricte", False)))
+                for d in donnees
+            ]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Erreur lors de la désérialisation des catégories: {e}")
+
+    @classmethod
+    def from_columns(cls, colonnes: Dict[str, Sequence[Any]]) -> List['CompactCategoryBudget']:
+        """
+        Construit une liste de catégories depuis un format en colonnes
+
+        Args:
+            colonnes: Nom de champ (format de to_dict) -> valeurs, toutes de même longueur ;
+                les champs absents prennent leur valeur par défaut
+
+        Raises:
+            ValueError: Colonnes de longueurs différentes ou valeurs invalides
+        """
+        longueurs = {len(valeurs) for nom, valeurs in colonnes.items() if nom in _CHAMPS_CATEGORIE}
+        if len(longueurs) > 1:
+            raise ValueError(f"Colonnes de longueurs différentes: {sorted(longueurs)}")
+        n = longueurs.pop() if longueurs else 0
+        try:
+            champs = [
+                [float(v) for v in colonnes[nom]] if nom in colonnes and isinstance(defaut, float)
+                else colonnes.get(nom, [defaut] * n)
+                for nom, defaut in zip(_CHAMPS_CATEGORIE, _DEFAUTS_CATEGORIE)
+            ]
+            return [cls(*valeurs) for valeurs in zip(*champs)]
+        except (ValueError, TypeError, AttributeError) as e:
+            raise ValueError(f"Erreur lors de la désérialisation des catégories: {e}")
+
+    @staticmethod
+    def to_columns(categories: Sequence['CompactCategoryBudget']) -> Dict[str, List[Any]]:
+        """Format en colonnes d'une liste de catégories (inverse de from_columns)"""
+        return {nom: [getattr(c, nom) for c in categories] for nom in _CHAMPS_CATEGORIE}
+
+    # ===== REPRÉSENTATION =====
+
+    def __repr__(self) -> str:
+        return (f"CompactCategoryBudget(name='{self.name}', budget={self.budget}, "
+                f"spent={self.spent}, status='{self.status}')")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactCategoryBudget):
+            return False
+        return self.name.lower() == other.name.lower()
+
+    def __hash__(self) -> int:
+        return hash(self.name.lower())
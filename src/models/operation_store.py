@@ -0,0 +1,553 @@
+# src/models/operation_store.py - Stockage en colonnes des opérations
+"""
+Stockage en colonnes (NumPy) des opérations du BudgetManager
+
+Les statistiques du tableau de bord (soldes, résumés mensuels, dépenses par catégorie,
+top catégories) sont calculées par opérations vectorisées sur des tableaux contigus
+(dates, montants, codes de catégorie, comptes) au lieu de parcourir la liste d'objets
+Operation à chaque appel. Les catégories sont codées en entiers (index dans `categories`)
+pour permettre les regroupements par np.bincount.
+
+Les totaux consultés en permanence par le tableau de bord (solde, revenus, dépenses,
+dépenses du mois par catégorie) sont en plus maintenus incrémentalement par
+OperationTotals, en centimes entiers pour éviter toute dérive d'arrondi.
+
+OperationSnapshot fige un état cohérent (opérations + totaux) pour les lecteurs
+concurrents (threads Flet) : il n'est jamais modifié après sa création.
+
+ColumnarHistory persiste ces colonnes en fichiers .npy dans le répertoire de données :
+relues par memory mapping, elles donnent à l'analyse de tout l'historique des tableaux
+prêts à agréger, sans parser ni construire d'objets, et seules les pages lues sont en RAM.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Décalage entre date.toordinal() (1er janvier de l'an 1 = 1) et l'époque de datetime64
+_EPOCH_ORDINAL = 719163
+
+
+class OperationColumns:
+    """
+    Vue colonnes d'une liste d'opérations (même ordre que la liste source)
+
+    Attributes:
+        ids: IDs des opérations (int64)
+        dates: Dates des opérations (datetime64[D])
+        montants: Montants signés (float64)
+        comptes: IDs des comptes (int32)
+        codes: Code de catégorie de chaque opération (int32, index dans `categories`)
+        categories: Noms des catégories, dans l'ordre des codes
+    """
+
+    def __init__(self, ids: np.ndarray, dates: np.ndarray, montants: np.ndarray,
+                 comptes: np.ndarray, codes: np.ndarray, categories: List[str]):
+        self.ids = ids
+        self.dates = dates
+        self.montants = montants
+        self.comptes = comptes
+        self.codes = codes
+        self.categories = categories
+        self._mois: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_operations(cls, operations: Sequence) -> 'OperationColumns':
+        """
+        Construit les colonnes depuis une séquence d'Operation
+
+        Args:
+            operations: Opérations (id, date, montant, categorie, idcompte)
+
+        Returns:
+            OperationColumns: Colonnes alignées sur l'ordre de `operations`
+        """
+        n = len(operations)
+        categories: List[str] = []
+        code_par_nom: Dict[str, int] = {}
+
+        def code(nom: str) -> int:
+            if nom not in code_par_nom:
+                code_par_nom[nom] = len(categories)
+                categories.append(nom)
+            return code_par_nom[nom]
+
+        ordinals = np.fromiter((op.date.toordinal() for op in operations), dtype=np.int64, count=n)
+        return cls(
+            ids=np.fromiter((op.id for op in operations), dtype=np.int64, count=n),
+            dates=(ordinals - _EPOCH_ORDINAL).astype('datetime64[D]'),
+            montants=np.fromiter((op.montant for op in operations), dtype=np.float64, count=n),
+            comptes=np.fromiter((op.idcompte for op in operations), dtype=np.int32, count=n),
+            codes=np.fromiter((code(op.categorie) for op in operations), dtype=np.int32, count=n),
+            categories=categories,
+        )
+
+    def __len__(self) -> int:
+        return len(self.montants)
+
+    @property
+    def mois(self) -> np.ndarray:
+        """Mois de chaque opération (datetime64[M]), calculé une seule fois"""
+        if self._mois is None:
+            self._mois = self.dates.astype('datetime64[M]')
+        return self._mois
+
+    def masque_mois(self, year: int, month: int) -> np.ndarray:
+        """Masque booléen des opérations d'un mois"""
+        return self.mois == np.datetime64(f"{year:04d}-{month:02d}", 'M')
+
+    def indices(self, masque: np.ndarray) -> np.ndarray:
+        """Positions (dans la liste source) des opérations sélectionnées par un masque"""
+        return np.flatnonzero(masque)
+
+    def totaux(self, masque: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        Revenus, dépenses (valeur absolue), solde et nombre d'opérations
+
+        Args:
+            masque: Sélection d'opérations (toutes si None)
+        """
+        montants = self.montants if masque is None else self.montants[masque]
+        revenus = float(montants[montants > 0].sum())
+        depenses = float(-montants[montants < 0].sum())
+        return {
+            'revenus': revenus,
+            'depenses': depenses,
+            'solde': float(montants.sum()),
+            'nb_transactions': int(len(montants)),
+        }
+
+    def _selection(self, masque: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        if masque is None:
+            return self.codes, self.montants
+        return self.codes[masque], self.montants[masque]
+
+    def depenses_par_categorie(self, masque: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """Total des dépenses (valeur absolue) par catégorie, catégories sans dépense exclues"""
+        codes, montants = self._selection(masque)
+        depense = montants < 0
+        sommes = np.bincount(codes[depense], weights=-montants[depense], minlength=len(self.categories))
+        return {self.categories[i]: float(sommes[i]) for i in np.flatnonzero(sommes)}
+
+    def compte_par_categorie(self, masque: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """Nombre d'opérations par catégorie"""
+        codes, _ = self._selection(masque)
+        comptes = np.bincount(codes, minlength=len(self.categories))
+        return {self.categories[i]: int(comptes[i]) for i in np.flatnonzero(comptes)}
+
+    def top_categories(self, n: int = 5, masque: Optional[np.ndarray] = None,
+                       parmi: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Catégories ayant le plus de dépenses
+
+        Args:
+            n: Nombre de catégories retournées
+            masque: Sélection d'opérations (toutes si None)
+            parmi: Restreindre à ces noms de catégories (toutes si None)
+
+        Returns:
+            List[Tuple[str, float]]: (nom, dépenses) par dépenses décroissantes
+        """
+        codes, montants = self._selection(masque)
+        depense = montants < 0
+        sommes = np.bincount(codes[depense], weights=-montants[depense], minlength=len(self.categories))
+        if parmi is not None:
+            noms = set(parmi)
+            sommes[[i for i, nom in enumerate(self.categories) if nom not in noms]] = 0
+        ordre = np.argsort(-sommes, kind='stable')[:n]
+        return [(self.categories[i], float(sommes[i])) for i in ordre if sommes[i] > 0]
+
+    def resume_mensuel(self) -> List[Dict[str, object]]:
+        """
+        Revenus, dépenses, solde et nombre d'opérations pour chaque mois présent
+
+        Returns:
+            List[Dict]: Un résumé par mois ('mois' au format AAAA-MM), ordre chronologique
+        """
+        if len(self) == 0:
+            return []
+        mois, inverse = np.unique(self.mois, return_inverse=True)
+        revenus = np.bincount(inverse, weights=np.where(self.montants > 0, self.montants, 0.0), minlength=len(mois))
+        depenses = np.bincount(inverse, weights=np.where(self.montants < 0, -self.montants, 0.0), minlength=len(mois))
+        nombres = np.bincount(inverse, minlength=len(mois))
+        return [
+            {
+                'mois': str(mois[i]),
+                'revenus': float(revenus[i]),
+                'depenses': float(depenses[i]),
+                'solde': float(revenus[i] - depenses[i]),
+                'nb_transactions': int(nombres[i]),
+            }
+            for i in range(len(mois))
+        ]
+
+
+def _centimes(montant: float) -> int:
+    """Montant en centimes entiers"""
+    return int(round(montant * 100))
+
+
+class OperationTotals:
+    """
+    Totaux des opérations maintenus incrémentalement (O(1) par ajout ou retrait)
+
+    Tous les montants sont stockés en centimes entiers : ajouter puis retirer une
+    opération ramène exactement à l'état précédent.
+
+    Attributes:
+        revenus: Total des revenus
+        depenses: Total des dépenses (valeur absolue)
+        nombre: Nombre d'opérations
+        par_mois: (année, mois) -> [revenus, dépenses, nombre]
+        depenses_categorie_mois: (catégorie, année, mois) -> dépenses
+        nombre_par_categorie: catégorie -> nombre d'opérations
+        solde_par_compte: idcompte -> solde
+    """
+
+    def __init__(self):
+        self.revenus = 0
+        self.depenses = 0
+        self.nombre = 0
+        self.par_mois: Dict[Tuple[int, int], List[int]] = {}
+        self.depenses_categorie_mois: Dict[Tuple[str, int, int], int] = {}
+        self.nombre_par_categorie: Dict[str, int] = {}
+        self.solde_par_compte: Dict[int, int] = {}
+
+    @classmethod
+    def from_operations(cls, operations: Iterable) -> 'OperationTotals':
+        """Recalcule tous les totaux depuis zéro"""
+        totaux = cls()
+        for operation in operations:
+            totaux.ajouter(operation)
+        return totaux
+
+    def ajouter(self, operation):
+        """Ajoute une opération aux totaux"""
+        self._appliquer(operation, 1)
+
+    def retirer(self, operation):
+        """Retire une opération des totaux (avec ses valeurs au moment de l'ajout)"""
+        self._appliquer(operation, -1)
+
+    def copie(self) -> 'OperationTotals':
+        """Copie indépendante des totaux"""
+        totaux = OperationTotals()
+        totaux.revenus, totaux.depenses, totaux.nombre = self.revenus, self.depenses, self.nombre
+        totaux.par_mois = {cle: list(valeurs) for cle, valeurs in self.par_mois.items()}
+        totaux.depenses_categorie_mois = dict(self.depenses_categorie_mois)
+        totaux.nombre_par_categorie = dict(self.nombre_par_categorie)
+        totaux.solde_par_compte = dict(self.solde_par_compte)
+        return totaux
+
+    def ajouter_agregat(self, annee: int, mois: int, revenus: float, depenses: float, nombre: int):
+        """
+        Ajoute le total d'un mois dont les opérations ne sont pas chargées (agrégat serveur)
+
+        Le détail par catégorie et par compte de ce mois n'est pas connu.
+        """
+        revenus, depenses = _centimes(revenus), _centimes(depenses)
+        mensuel = self.par_mois.setdefault((annee, mois), [0, 0, 0])
+        mensuel[0] += revenus
+        mensuel[1] += depenses
+        mensuel[2] += nombre
+        self.revenus += revenus
+        self.depenses += depenses
+        self.nombre += nombre
+
+    def _appliquer(self, operation, signe: int):
+        montant = _centimes(operation.montant)
+        annee, mois = operation.date.year, operation.date.month
+        categorie = operation.categorie
+
+        mensuel = self.par_mois.setdefault((annee, mois), [0, 0, 0])
+        if montant > 0:
+            self.revenus += signe * montant
+            mensuel[0] += signe * montant
+        elif montant < 0:
+            self.depenses -= signe * montant
+            mensuel[1] -= signe * montant
+            cle = (categorie, annee, mois)
+            self.depenses_categorie_mois[cle] = self.depenses_categorie_mois.get(cle, 0) - signe * montant
+            if self.depenses_categorie_mois[cle] == 0:
+                del self.depenses_categorie_mois[cle]
+        mensuel[2] += signe
+        if mensuel == [0, 0, 0]:
+            del self.par_mois[(annee, mois)]
+
+        self.nombre += signe
+        self.nombre_par_categorie[categorie] = self.nombre_par_categorie.get(categorie, 0) + signe
+        if self.nombre_par_categorie[categorie] == 0:
+            del self.nombre_par_categorie[categorie]
+        self.solde_par_compte[operation.idcompte] = self.solde_par_compte.get(operation.idcompte, 0) + signe * montant
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, OperationTotals):
+            return NotImplemented
+        soldes = {k: v for k, v in self.solde_par_compte.items() if v}
+        autres_soldes = {k: v for k, v in other.solde_par_compte.items() if v}
+        return (self.revenus, self.depenses, self.nombre, self.par_mois,
+                self.depenses_categorie_mois, self.nombre_par_categorie, soldes) == \
+               (other.revenus, other.depenses, other.nombre, other.par_mois,
+                other.depenses_categorie_mois, other.nombre_par_categorie, autres_soldes)
+
+    # ========== LECTURE (en euros) ==========
+    @property
+    def solde(self) -> float:
+        return (self.revenus - self.depenses) / 100
+
+    @property
+    def revenus_total(self) -> float:
+        return self.revenus / 100
+
+    @property
+    def depenses_total(self) -> float:
+        return self.depenses / 100
+
+    def mois(self, annee: int, mois: int) -> Dict[str, float]:
+        """Revenus, dépenses, solde et nombre d'opérations d'un mois"""
+        revenus, depenses, nombre = self.par_mois.get((annee, mois), (0, 0, 0))
+        return {
+            'revenus': revenus / 100,
+            'depenses': depenses / 100,
+            'solde': (revenus - depenses) / 100,
+            'nb_transactions': nombre,
+        }
+
+    def depenses_categorie(self, categorie: str, annee: int, mois: int) -> float:
+        """Dépenses (valeur absolue) d'une catégorie sur un mois"""
+        return self.depenses_categorie_mois.get((categorie, annee, mois), 0) / 100
+
+    def solde_compte(self, idcompte: int) -> float:
+        """Solde d'un compte"""
+        return self.solde_par_compte.get(idcompte, 0) / 100
+
+
+class OperationSnapshot:
+    """
+    Vue immuable des opérations et de leurs totaux à une version donnée
+
+    Attributes:
+        version: Numéro de version du gestionnaire au moment de la capture
+        operations: Opérations (tuple d'objets Operation immuables)
+        totaux: Copie des totaux (à ne pas modifier)
+    """
+
+    def __init__(self, version: int, operations: Tuple, totaux: OperationTotals):
+        self.version = version
+        self.operations = operations
+        self.totaux = totaux
+        self._colonnes: Optional[OperationColumns] = None
+
+    @property
+    def colonnes(self) -> OperationColumns:
+        """Vue colonnes, construite à la première lecture"""
+        if self._colonnes is None:
+            self._colonnes = OperationColumns.from_operations(self.operations)
+        return self._colonnes
+
+
+class ColumnarHistory:
+    """
+    Colonnes des opérations persistées en fichiers .npy, lues par memory mapping
+
+    Un fichier par colonne (ids, dates, montants, comptes, codes) et meta.json (nombre de
+    lignes, capacité, catégories, état). Les fichiers ont une capacité d'avance : une
+    création écrit après la dernière ligne, une modification réécrit sa ligne en place,
+    une suppression déplace la dernière ligne dans le trou (l'ordre des lignes n'a pas de
+    sens). Une mise à jour n'écrit donc que les lignes concernées.
+
+    Un agrandissement ou une reconstruction écrit une nouvelle génération de fichiers
+    (les vues encore ouvertes sur l'ancienne restent valides). meta.json est marqué
+    « modifié » avant toute écriture en place : après un arrêt brutal, l'historique est
+    reconnu incohérent et doit être reconstruit (rebuild).
+    """
+
+    COLONNES = {
+        'ids': np.dtype(np.int64),
+        'dates': np.dtype('datetime64[D]'),
+        'montants': np.dtype(np.float64),
+        'comptes': np.dtype(np.int32),
+        'codes': np.dtype(np.int32),
+    }
+    CAPACITE_MIN = 1024
+
+    def __init__(self, repertoire: str):
+        """
+        Args:
+            repertoire: Répertoire des fichiers (créé si absent)
+        """
+        self.repertoire = Path(repertoire)
+        self.repertoire.mkdir(parents=True, exist_ok=True)
+        self._meta = {'generation': 0, 'taille': 0, 'capacite': 0, 'categories': [], 'propre': False}
+        self._fichiers: Dict[str, np.memmap] = {}
+
+        chemin = self.repertoire / "meta.json"
+        if chemin.exists():
+            try:
+                meta = json.loads(chemin.read_text(encoding="utf-8"))
+                fichiers = {nom: np.load(self._chemin(nom, meta['generation']), mmap_mode='r+')
+                            for nom in self.COLONNES}
+            except (OSError, ValueError, KeyError):
+                # Fichiers absents ou illisibles : historique vide, à reconstruire
+                pass
+            else:
+                self._meta, self._fichiers = meta, fichiers
+        self._code_par_nom = {nom: i for i, nom in enumerate(self._meta['categories'])}
+
+    def __len__(self) -> int:
+        return self._meta['taille']
+
+    @property
+    def propre(self) -> bool:
+        """Faux si l'historique a pu diverger des opérations (écriture interrompue, invalider())"""
+        return self._meta['propre']
+
+    @property
+    def colonnes(self) -> OperationColumns:
+        """
+        Vue colonnes (lecture seule) projetée depuis les fichiers
+
+        Les tableaux restent adossés aux fichiers : à agréger immédiatement, une mise à
+        jour ultérieure peut réécrire des lignes en place.
+        """
+        taille = self._meta['taille']
+        vues = {}
+        for nom, dtype in self.COLONNES.items():
+            vue = self._fichiers[nom][:taille].view() if self._fichiers else np.empty(0, dtype)
+            vue.flags.writeable = False
+            vues[nom] = vue
+        return OperationColumns(categories=list(self._meta['categories']), **vues)
+
+    def empreinte(self) -> Tuple[int, int, int, int]:
+        """
+        Résumé du contenu, comparé à celui des opérations avant de réutiliser les fichiers
+
+        Returns:
+            (nombre de lignes, somme des IDs, somme des montants en centimes, somme des dates en jours)
+        """
+        colonnes = self.colonnes
+        return (len(colonnes.ids), int(colonnes.ids.sum()), int(np.rint(colonnes.montants * 100).sum()),
+                int(colonnes.dates.astype(np.int64).sum()))
+
+    def invalider(self):
+        """Marque l'historique comme à reconstruire"""
+        if self._meta['propre']:
+            self._meta['propre'] = False
+            self._ecrire_meta()
+
+    def rebuild(self, operations: Sequence):
+        """Réécrit tout l'historique depuis une séquence d'Operation"""
+        operations = list(operations)
+        generation = self._meta['generation']
+        self._meta['categories'] = []
+        self._code_par_nom = {}
+        self._nouvelle_generation(len(operations) + len(operations) // 2, 0)
+        self._ecrire_lignes(np.arange(len(operations)), operations)
+        self._meta['taille'] = len(operations)
+        self._terminer(generation)
+
+    def apply(self, upserts: Sequence, deleted_ids: Iterable[int]):
+        """
+        Applique des créations / modifications / suppressions
+
+        Args:
+            upserts: Opérations créées ou modifiées (remplacent celles de même ID)
+            deleted_ids: IDs des opérations supprimées (inconnus ignorés)
+        """
+        supprimes = set(deleted_ids) - {op.id for op in upserts}
+        touches = np.fromiter([op.id for op in upserts] + list(supprimes), dtype=np.int64)
+        if len(touches) == 0:
+            return
+        self.invalider()
+        generation = self._meta['generation']
+        taille = self._meta['taille']
+        ids = self._fichiers['ids'][:taille] if self._fichiers else np.empty(0, np.int64)
+        positions = np.flatnonzero(np.isin(ids, touches))
+        position_par_id = dict(zip(ids[positions].tolist(), positions.tolist()))
+
+        # Modifications en place ; les créations comblent d'abord les trous des suppressions
+        trous = sorted((position_par_id[i] for i in supprimes if i in position_par_id), reverse=True)
+        nouvelles = [op for op in upserts if op.id not in position_par_id]
+        existantes = [op for op in upserts if op.id in position_par_id]
+        cibles = [position_par_id[op.id] for op in existantes]
+        while nouvelles and trous:
+            existantes.append(nouvelles.pop())
+            cibles.append(trous.pop())
+        if taille + len(nouvelles) > self._meta['capacite']:
+            capacite = max(2 * self._meta['capacite'], taille + len(nouvelles))
+            self._nouvelle_generation(capacite, taille)
+        existantes += nouvelles
+        cibles += range(taille, taille + len(nouvelles))
+        taille += len(nouvelles)
+        self._ecrire_lignes(np.array(cibles, dtype=np.int64), existantes)
+
+        # Trous restants (par position décroissante) : comblés par la dernière ligne
+        for trou in sorted(trous, reverse=True):
+            taille -= 1
+            if trou != taille:
+                for fichier in self._fichiers.values():
+                    fichier[trou] = fichier[taille]
+        self._meta['taille'] = taille
+        self._terminer(generation)
+
+    # ========== FICHIERS ==========
+    def _chemin(self, nom: str, generation: int) -> Path:
+        return self.repertoire / f"{nom}-{generation}.npy"
+
+    def _nouvelle_generation(self, capacite: int, conserver: int):
+        """Crée les fichiers d'une nouvelle génération en recopiant les `conserver` premières lignes"""
+        capacite = max(capacite, self.CAPACITE_MIN)
+        generation = self._meta['generation'] + 1
+        fichiers = {}
+        for nom, dtype in self.COLONNES.items():
+            fichier = np.lib.format.open_memmap(self._chemin(nom, generation), mode='w+',
+                                                dtype=dtype, shape=(capacite,))
+            if conserver:
+                fichier[:conserver] = self._fichiers[nom][:conserver]
+            fichiers[nom] = fichier
+        self._fichiers = fichiers
+        self._meta.update(generation=generation, capacite=capacite, propre=False)
+
+    def _ecrire_lignes(self, positions: np.ndarray, operations: Sequence):
+        """Écrit des opérations aux positions données (catégories nouvelles ajoutées aux codes)"""
+        if not operations:
+            return
+        lot = OperationColumns.from_operations(operations)
+        codes = np.array([self._code(nom) for nom in lot.categories], dtype=np.int32)
+        self._fichiers['ids'][positions] = lot.ids
+        self._fichiers['dates'][positions] = lot.dates
+        self._fichiers['montants'][positions] = lot.montants
+        self._fichiers['comptes'][positions] = lot.comptes
+        self._fichiers['codes'][positions] = codes[lot.codes]
+
+    def _code(self, nom: str) -> int:
+        if nom not in self._code_par_nom:
+            self._code_par_nom[nom] = len(self._meta['categories'])
+            self._meta['categories'].append(nom)
+        return self._code_par_nom[nom]
+
+    def _terminer(self, generation_precedente: int):
+        """Marque l'historique cohérent et supprime les fichiers des générations précédentes"""
+        # Pas de flush (msync) : les pages modifiées sont dans le cache du système, déjà
+        # visibles par le fichier ; seule une coupure de courant peut les perdre (même
+        # compromis que le miroir local en synchronous=NORMAL)
+        self._meta['propre'] = True
+        self._ecrire_meta()
+        if self._meta['generation'] == generation_precedente:
+            return
+        actuels = {self._chemin(nom, self._meta['generation']).name for nom in self.COLONNES}
+        for chemin in self.repertoire.glob("*.npy"):
+            if chemin.name not in actuels:
+                try:
+                    chemin.unlink()
+                except OSError:
+                    # Encore projeté ailleurs (Windows) : supprimé lors d'un prochain agrandissement
+                    pass
+
+    def _ecrire_meta(self):
+        temporaire = self.repertoire / "meta.json.tmp"
+        temporaire.write_text(json.dumps(self._meta), encoding="utf-8")
+        os.replace(temporaire, self.repertoire / "meta.json")
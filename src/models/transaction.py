@@ -5,7 +5,7 @@ Conserve toutes les propriétés et méthodes de l'original
 """
 
 from datetime import datetime, date
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Sequence
 import json
 
 
@@ -304,4 +304,205 @@ class Transaction:
                 self._id_transaction is not None)
 
     def __hash__(self) -> int:
-        return hash(self._id_transaction) if self._id_transaction else hash(id(self))
\ No newline at end of file
+        return hash(self._id_transaction) if self._id_transaction else hash(id(self))
+
+
+# Colonnes du format de sérialisation, dans l'ordre des arguments de CompactTransaction
+_CHAMPS_TRANSACTION = ("montant", "description", "categorie", "date_transaction", "type_transaction",
+                       "id_transaction", "tags", "note", "recurrente", "frequence_recurrence", "date_creation")
+_TYPES_TRANSACTION = frozenset(("depense", "revenu"))
+
+
+def _verifier_types(types: Iterable[str]) -> None:
+    """Lève ValueError si un type de transaction n'est ni 'depense' ni 'revenu'"""
+    invalides = set(types) - _TYPES_TRANSACTION
+    if invalides:
+        raise ValueError(f"Type de transaction invalide: {sorted(invalides)}")
+
+
+class CompactTransaction:
+    """
+    Variante compacte de Transaction pour les grands volumes (historique complet, imports)
+
+    Attributs en __slots__ (pas de __dict__ par instance) lus directement, sans propriété
+    Python intermédiaire ; les tags sont un tuple (le tuple vide est partagé). Même format
+    de sérialisation que Transaction ; from_dicts / from_columns construisent toute une
+    liste en un appel (valeurs par défaut et parseurs résolus une seule fois) et rejettent
+    un type_transaction inconnu ; le constructeur, lui, ne le vérifie pas.
+    """
+
+    __slots__ = _CHAMPS_TRANSACTION
+
+    def __init__(self, montant: float = 0.0, description: str = "", categorie: str = "",
+                 date_transaction: Optional[date] = None, type_transaction: str = "depense",
+                 id_transaction: Optional[int] = None, tags: tuple = (), note: str = "",
+                 recurrente: bool = False, frequence_recurrence: str = "",
+                 date_creation: Optional[datetime] = None):
+        self.montant = montant
+        self.description = description
+        self.categorie = categorie
+        self.date_transaction = date_transaction or date.today()
+        self.type_transaction = type_transaction
+        self.id_transaction = id_transaction
+        self.tags = tags
+        self.note = note
+        self.recurrente = recurrente
+        self.frequence_recurrence = frequence_recurrence
+        self.date_creation = date_creation or datetime.now()
+
+    # ===== PROPRIÉTÉS CALCULÉES =====
+
+    @property
+    def est_depense(self) -> bool:
+        return self.type_transaction == "depense"
+
+    @property
+    def est_revenu(self) -> bool:
+        return self.type_transaction == "revenu"
+
+    @property
+    def montant_affichage(self) -> str:
+        """Montant formaté pour affichage avec signe"""
+        signe = "+" if self.est_revenu else "-"
+        return f"{signe}{abs(self.montant):.2f}€"
+
+    @property
+    def montant_absolu(self) -> float:
+        return abs(self.montant)
+
+    # ===== MÉTHODES =====
+
+    def ajouter_tag(self, tag: str) -> bool:
+        """Ajoute un tag s'il n'existe pas déjà"""
+        tag = str(tag).strip()
+        if tag and tag not in self.tags:
+            self.tags = self.tags + (tag,)
+            return True
+        return False
+
+    def has_tag(self, tag: str) -> bool:
+        return tag in self.tags
+
+    def est_dans_mois(self, annee: int, mois: int) -> bool:
+        return self.date_transaction.year == annee and self.date_transaction.month == mois
+
+    def est_dans_periode(self, date_debut: date, date_fin: date) -> bool:
+        return date_debut <= self.date_transaction <= date_fin
+
+    # ===== SÉRIALISATION =====
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Même format que Transaction.to_dict"""
+        return {
+            "montant": self.montant,
+            "description": self.description,
+            "categorie": self.categorie,
+            "date_transaction": self.date_transaction.isoformat(),
+            "type_transaction": self.type_transaction,
+            "id_transaction": self.id_transaction,
+            "tags": list(self.tags),
+            "note": self.note,
+            "recurrente": self.recurrente,
+            "frequence_recurrence": self.frequence_recurrence,
+            "date_creation": self.date_creation.isoformat(),
+            "version": "2.0"
+        }
+
+    def to_json(self) -> str:
+        """JSON compact (sans indentation)"""
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CompactTransaction':
+        return cls.from_dicts([data])[0]
+
+    @classmethod
+    def from_dicts(cls, donnees: Iterable[Dict[str, Any]]) -> List['CompactTransaction']:
+        """
+        Construit une liste de transactions depuis des dictionnaires (format de to_dict)
+
+        Raises:
+            ValueError: Dictionnaire invalide ou type_transaction autre que 'depense'/'revenu'
+        """
+        aujourd_hui = date.today()
+        maintenant = datetime.now()
+        date_iso, datetime_iso = date.fromisoformat, datetime.fromisoformat
+        try:
+            transactions = [
+                cls(float(d.get("montant", 0.0)), str(d.get("description", "")), str(d.get("categorie", "")),
+                    date_iso(d["date_transaction"]) if "date_transaction" in d else aujourd_hui,
+                    str(d.get("type_transaction", "depense")), d.get("id_transaction"),
+                    tuple(d["tags"]) if d.get("tags") else (), str(d.get("note", "")),
+                    bool(d.get("recurrente", False)), str(d.get("frequence_recurrence", "")),
+                    datetime_iso(d["date_creation"]) if "date_creation" in d else maintenant)
+                for d in donnees
+            ]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Erreur lors de la désérialisation des transactions: {e}")
+        _verifier_types(t.type_transaction for t in transactions)
+        return transactions
+
+    @classmethod
+    def from_columns(cls, colonnes: Dict[str, Sequence[Any]]) -> List['CompactTransaction']:
+        """
+        Construit une liste de transactions depuis un format en colonnes
+
+        Args:
+            colonnes: Nom de champ (format de to_dict) -> valeurs, toutes de même longueur ;
+                les champs absents prennent leur valeur par défaut
+
+        Raises:
+            ValueError: Colonnes de longueurs différentes ou valeurs invalides
+                (dont un type_transaction autre que 'depense'/'revenu')
+        """
+        longueurs = {len(valeurs) for nom, valeurs in colonnes.items() if nom in _CHAMPS_TRANSACTION}
+        if len(longueurs) > 1:
+            raise ValueError(f"Colonnes de longueurs différentes: {sorted(longueurs)}")
+        n = longueurs.pop() if longueurs else 0
+        aujourd_hui = date.today()
+        maintenant = datetime.now()
+        try:
+            champs = (
+                [float(v) for v in colonnes["montant"]] if "montant" in colonnes else [0.0] * n,
+                colonnes.get("description", [""] * n),
+                colonnes.get("categorie", [""] * n),
+                list(map(date.fromisoformat, colonnes["date_transaction"]))
+                if "date_transaction" in colonnes else [aujourd_hui] * n,
+                colonnes.get("type_transaction", ["depense"] * n),
+                colonnes.get("id_transaction", [None] * n),
+                [tuple(t) if t else () for t in colonnes["tags"]] if "tags" in colonnes else [()] * n,
+                colonnes.get("note", [""] * n),
+                colonnes.get("recurrente", [False] * n),
+                colonnes.get("frequence_recurrence", [""] * n),
+                list(map(datetime.fromisoformat, colonnes["date_creation"]))
+                if "date_creation" in colonnes else [maintenant] * n,
+            )
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Erreur lors de la désérialisation des transactions: {e}")
+        _verifier_types(champs[4])
+        return [cls(*valeurs) for valeurs in zip(*champs)]
+
+    @staticmethod
+    def to_columns(transactions: Sequence['CompactTransaction']) -> Dict[str, List[Any]]:
+        """Format en colonnes d'une liste de transactions (inverse de from_columns)"""
+        colonnes: Dict[str, List[Any]] = {nom: [getattr(t, nom) for t in transactions]
+                                          for nom in _CHAMPS_TRANSACTION}
+        colonnes["date_transaction"] = [d.isoformat() for d in colonnes["date_transaction"]]
+        colonnes["date_creation"] = [d.isoformat() for d in colonnes["date_creation"]]
+        colonnes["tags"] = [list(t) for t in colonnes["tags"]]
+        return colonnes
+
+    # ===== REPRÉSENTATION =====
+
+    def __repr__(self) -> str:
+        return (f"CompactTransaction(montant={self.montant}, description='{self.description}', "
+                f"categorie='{self.categorie}', date={self.date_transaction}, "
+                f"type='{self.type_transaction}')")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactTransaction):
+            return False
+        return self.id_transaction == other.id_transaction and self.id_transaction is not None
+
+    def __hash__(self) -> int:
+        return hash(self.id_transaction) if self.id_transaction else hash(id(self))
@@ -1,72 +1,440 @@
-import requests
-from typing import List, Dict, Optional
+"""
+Client de l'API Budget
 
-BASE_URL = "http://localhost:8000/api"
+AsyncBudgetAPIClient (httpx) : pool de connexions, timeouts, reprises avec backoff
+exponentiel, jeton JWT et récupération complète des listes paginées (pagination par
+clé, tranches d'IDs demandées en parallèle, nombre de requêtes simultanées borné). Avec un HTTPCache, les GET
+respectent ETag / Cache-Control et les GET identiques simultanés sont fusionnés.
 
+BudgetAPIClient : façade synchrone du client asynchrone pour le code non async
+(BudgetManager, pages Flet). Les coroutines sont exécutées sur une boucle asyncio
+dédiée (thread de fond partagé), utilisable depuis n'importe quel thread.
 
-class BudgetAPIClient:
-    def __init__(self, base_url: str = BASE_URL):
+Toutes les méthodes retournent le JSON de la réponse, ou {"error": str} en cas d'échec.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from src.services.http_cache import HTTPCache, parse_cache_control
+
+BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000") + "/api"
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "30"))
+
+# Reprises : erreurs réseau et réponses temporaires, attente doublée à chaque essai
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.2
+RETRY_STATUS = {429, 502, 503, 504}
+# Seules les méthodes idempotentes sont rejouées après une réponse du serveur
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+
+# Pagination : taille des pages et nombre de pages demandées simultanément
+PAGE_SIZE = 1000
+MAX_PARALLEL_PAGES = 4
+
+
+class AsyncBudgetAPIClient:
+    """Client asynchrone de l'API Budget"""
+
+    def __init__(self, base_url: str = BASE_URL, token: Optional[str] = None,
+                 timeout: float = API_TIMEOUT, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 cache: Optional[HTTPCache] = None):
+        """
+        Args:
+            base_url: URL de l'API (terminée par /api)
+            token: Jeton JWT (API_TOKEN par défaut, ou obtenu par login())
+            timeout: Timeout de chaque requête en secondes
+            transport: Transport httpx (tests)
+            cache: Cache HTTP persistant des réponses GET (aucun cache si None)
+        """
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({"Content-Type": "application/json"})
+        self.token = token or os.getenv("API_TOKEN")
+        self.cache = cache
+        self._timeout = timeout
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        # GET en cours, partagés par les appels identiques simultanés
+        self._en_cours: Dict[str, asyncio.Future] = {}
 
-    # ========== GET ==========
-    def get_operations(self) -> List[Dict]:
-        """Récupère toutes les opérations"""
+    def _http(self) -> httpx.AsyncClient:
+        """Client httpx (pool de connexions), créé au premier appel dans la boucle courante"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self._timeout,
+                limits=httpx.Limits(max_connections=MAX_PARALLEL_PAGES * 2, max_keepalive_connections=MAX_PARALLEL_PAGES),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        """Ferme les connexions du pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _cache_prefix(self) -> str:
+        """Préfixe des clés de cache : les réponses dépendent de l'utilisateur (jeton)"""
+        jeton = hashlib.sha256((self.token or "").encode()).hexdigest()[:16]
+        return f"{self.base_url}|{jeton}|"
+
+    async def _request(self, method: str, path: str, params: Optional[Dict] = None,
+                       json: Any = None) -> Any:
+        """
+        Exécute une requête (GET : via le cache HTTP et la fusion des appels identiques)
+
+        Returns:
+            JSON de la réponse, ou {"error": str}
+        """
+        if params is not None:
+            params = {key: value for key, value in params.items() if value is not None}
+        if method != "GET":
+            result = await self._send(method, path, params, json)
+            if self.cache is not None and not (isinstance(result, dict) and "error" in result):
+                self._invalidate_after_write(path)
+            return result
+
+        cle = self._cache_prefix() + str(httpx.URL(path, params=sorted((params or {}).items())))
+        en_cours = self._en_cours.get(cle)
+        if en_cours is not None:
+            return await asyncio.shield(en_cours)
+
+        future = asyncio.get_running_loop().create_future()
+        self._en_cours[cle] = future
         try:
-            response = self.session.get(f"{self.base_url}/operations")
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": str(e)}
+            result = await self._cached_get(cle, path, params)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # marquée comme lue si aucun autre appel n'attend
+            raise
+        finally:
+            del self._en_cours[cle]
+
+    async def _cached_get(self, cle: str, path: str, params: Optional[Dict]) -> Any:
+        """GET servi depuis le cache si frais, sinon revalidé (If-None-Match) ou téléchargé"""
+        entree = self.cache.get(cle) if self.cache is not None else None
+        if entree is not None and entree.fraiche:
+            return entree.corps
+
+        headers = {"If-None-Match": entree.etag} if entree is not None and entree.etag else None
+        response = await self._send("GET", path, params, None, headers=headers, brut=True)
+        if isinstance(response, dict):
+            return response
+
+        directives = parse_cache_control(response.headers.get("cache-control"))
+        if response.status_code == 304 and entree is not None:
+            self.cache.touch(cle, directives["max_age"])
+            return entree.corps
 
-    def get_operation(self, operation_id: int) -> Dict:
+        corps = response.json()
+        if self.cache is not None and not directives["no_store"] and (response.headers.get("etag") or directives["max_age"]):
+            self.cache.put(cle, response.headers.get("etag"), directives["max_age"], corps)
+        return corps
+
+    def _invalidate_after_write(self, path: str):
+        """Retire du cache les réponses de la ressource modifiée (et des ressources liées)"""
+        ressource = "/" + path.strip("/").split("/")[0]
+        ressources = {ressource}
+        if ressource in ("/categories", "/sous-categories"):
+            ressources = {"/categories", "/sous-categories"}
+        elif ressource in ("/operations", "/sync"):
+            # Les comptes incluent leurs opérations et leur solde
+            ressources = {"/operations", "/comptes"}
+        for ressource in ressources:
+            self.cache.invalidate(self._cache_prefix() + ressource)
+
+    async def _send(self, method: str, path: str, params: Optional[Dict], json: Any,
+                    headers: Optional[Dict] = None, brut: bool = False) -> Any:
+        """
+        Envoie une requête avec reprises
+
+        Returns:
+            JSON de la réponse (ou la réponse httpx si `brut`, 304 compris), ou {"error": str}
+        """
+        headers = dict(headers or {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = await self._http().request(method, path, params=params, json=json, headers=headers)
+            except httpx.TransportError as e:
+                # Requête non partie (connexion impossible) : toujours rejouable
+                rejouable = isinstance(e, httpx.ConnectError) or method in IDEMPOTENT_METHODS
+                if attempt == MAX_RETRIES or not rejouable:
+                    return {"error": str(e) or type(e).__name__}
+            else:
+                if response.status_code in RETRY_STATUS and method in IDEMPOTENT_METHODS and attempt < MAX_RETRIES:
+                    pass
+                elif response.is_error:
+                    return {"error": f"{response.status_code} {response.reason_phrase}: {response.text}"}
+                else:
+                    return response if brut else response.json()
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+    # ========== AUTHENTIFICATION ==========
+    async def login(self, email: str, mot_de_passe: str) -> Dict:
+        """Authentifie l'utilisateur et conserve le jeton pour les requêtes suivantes"""
+        result = await self._request("POST", "/auth/login", json={"email": email, "mot_de_passe": mot_de_passe})
+        if "access_token" in result:
+            self.token = result["access_token"]
+        return result
+
+    def set_token(self, token: Optional[str]):
+        """Définit (ou retire) le jeton JWT envoyé avec chaque requête"""
+        self.token = token
+
+    async def get_current_user(self) -> Dict:
+        """Récupère l'utilisateur du jeton courant"""
+        return await self._request("GET", "/auth/me")
+
+    # ========== GET ==========
+    async def get_operations(self, **filters) -> List[Dict]:
+        """
+        Récupère une page d'opérations, filtrées et triées côté serveur
+
+        Args:
+            **filters: Paramètres de GET /api/operations (search, date_debut, date_fin,
+                montant_min, montant_max, idcompte, idtype, idsouscategorie, idcategorie,
+                sens, tri, skip, limit)
+        """
+        return await self._request("GET", "/operations", params=filters)
+
+    async def get_all_operations(self, page_size: int = PAGE_SIZE, parallelisme: int = MAX_PARALLEL_PAGES,
+                                 **filters) -> List[Dict]:
+        """
+        Récupère toutes les opérations correspondant aux filtres, par ID croissant
+
+        Pagination par clé (apres = dernier ID reçu) : une suppression ou une création
+        pendant le téléchargement ne décale pas les pages suivantes, aucune opération
+        inchangée n'est sautée. Les IDs jusqu'au plus grand au début du téléchargement sont
+        découpés en `parallelisme` tranches, parcourues simultanément (les opérations créées
+        ensuite sont renvoyées par la synchronisation suivante).
+
+        Args:
+            page_size: Nombre d'opérations par page
+            parallelisme: Nombre de tranches d'IDs téléchargées simultanément
+            **filters: Filtres de GET /api/operations (hors tri, skip, limit, apres, jusqua)
+        """
+        dernier = await self.get_operations(tri="-idoperation", limit=1, **filters)
+        if isinstance(dernier, dict):
+            return dernier
+        if not dernier:
+            return []
+        id_max = dernier[0]["idoperation"]
+        tranches = max(1, parallelisme)
+        bornes = [-1] + [id_max * k // tranches for k in range(1, tranches + 1)]
+
+        async def tranche(apres: int, jusqua: int):
+            operations = []
+            while apres < jusqua:
+                page = await self.get_operations(tri="idoperation", apres=apres, jusqua=jusqua,
+                                                 limit=page_size, **filters)
+                if isinstance(page, dict):
+                    return page
+                operations.extend(page)
+                if len(page) < page_size:
+                    break
+                apres = page[-1]["idoperation"]
+            return operations
+
+        resultats = await asyncio.gather(*(tranche(bornes[k], bornes[k + 1]) for k in range(tranches)))
+        for resultat in resultats:
+            if isinstance(resultat, dict):
+                return resultat
+        return [operation for resultat in resultats for operation in resultat]
+
+    async def get_operation(self, operation_id: int) -> Dict:
         """Récupère une opération par son ID"""
-        try:
-            response = self.session.get(f"{self.base_url}/operations/{operation_id}")
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": str(e)}
+        return await self._request("GET", f"/operations/{operation_id}")
+
+    async def get_comptes(self) -> List[Dict]:
+        """Récupère les comptes de l'utilisateur"""
+        return await self._request("GET", "/comptes", params={"limit": 1000})
+
+    async def get_categories(self) -> List[Dict]:
+        """Récupère les catégories"""
+        return await self._request("GET", "/categories", params={"limit": 1000})
+
+    async def get_sous_categories(self) -> List[Dict]:
+        """Récupère les sous-catégories"""
+        return await self._request("GET", "/sous-categories", params={"limit": 1000})
+
+    # ========== SYNCHRONISATION ==========
+    async def get_operation_changes(self, depuis: Optional[int] = None, page_size: int = PAGE_SIZE) -> Dict:
+        """
+        Récupère les opérations modifiées ou supprimées depuis un curseur (toutes les pages)
+
+        Args:
+            depuis: Curseur de la synchronisation précédente (None : curseur courant seul)
+            page_size: Nombre d'opérations par page
+
+        Returns:
+            {"curseur": int, "operations": [...], "supprimees": [...]}, ou {"error": str}
+        """
+        changements = {"curseur": None, "operations": [], "supprimees": []}
+        apres = 0
+        while True:
+            page = await self._request("GET", "/sync/operations",
+                                       params={"depuis": depuis, "apres": apres, "limit": page_size})
+            if "error" in page:
+                return page
+            # Le curseur de la première page est le plus ancien : aucun changement n'est manqué
+            if changements["curseur"] is None:
+                changements["curseur"] = page["curseur"]
+            changements["operations"].extend(page["operations"])
+            changements["supprimees"].extend(page["supprimees"])
+            if page["suite"] is None:
+                return changements
+            apres = page["suite"]
+
+    async def push_operation_writes(self, ecritures: List[Dict]) -> List[Dict]:
+        """
+        Envoie un lot d'écritures différées (POST /api/sync/operations)
+
+        Chaque écriture porte une clé d'idempotence : renvoyer un lot après une erreur
+        réseau ne l'applique pas deux fois.
+
+        Returns:
+            Un résultat par écriture ({"cle", "statut", "operation", "detail"}), ou {"error": str}
+        """
+        return await self._request("POST", "/sync/operations", json={"ecritures": ecritures})
 
     # ========== POST ==========
-    def create_operation(self, date: str, description: str, montant: float, idcompte: int, idtype: int = 1, idsouscategorie: Optional[int] = None) -> Dict:
+    async def create_operation(self, date: str, description: str, montant: float, idcompte: int, idtype: int = 1,
+                               idsouscategorie: Optional[int] = None) -> Dict:
         """Crée une opération"""
-        try:
-            data = {
-                "date": date,
-                "description": description,
-                "montant": montant,
-                "idcompte": idcompte,
-                "idtype": idtype
-            }
-            if idsouscategorie:
-                data["idsouscategorie"] = idsouscategorie
-            response = self.session.post(f"{self.base_url}/operations", json=data)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": str(e)}
+        data = {
+            "date": date,
+            "description": description,
+            "montant": montant,
+            "idcompte": idcompte,
+            "idtype": idtype
+        }
+        if idsouscategorie:
+            data["idsouscategorie"] = idsouscategorie
+        return await self._request("POST", "/operations", json=data)
 
     # ========== PUT ==========
-    def update_operation(self, operation_id: int, **kwargs) -> Dict:
+    async def update_operation(self, operation_id: int, **kwargs) -> Dict:
         """Modifie une opération"""
-        try:
-            response = self.session.put(
-                f"{self.base_url}/operations/{operation_id}",
-                json=kwargs
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": str(e)}
+        return await self._request("PUT", f"/operations/{operation_id}", json=kwargs)
 
     # ========== DELETE ==========
-    def delete_operation(self, operation_id: int) -> Dict:
+    async def delete_operation(self, operation_id: int) -> Dict:
         """Supprime une opération"""
-        try:
-            response = self.session.delete(f"{self.base_url}/operations/{operation_id}")
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": str(e)}
+        return await self._request("DELETE", f"/operations/{operation_id}")
+
+    # ========== ACTIONS GROUPÉES ==========
+    async def bulk_update_operations(self, changements: Dict, ids: Optional[List[int]] = None,
+                                     filtre: Optional[Dict] = None) -> Dict:
+        """Modifie en une requête toutes les opérations sélectionnées (IDs et/ou filtre)"""
+        data = {"changements": changements, "ids": ids, "filtre": filtre}
+        return await self._request("PATCH", "/operations", json=data)
+
+    async def bulk_delete_operations(self, ids: Optional[List[int]] = None, filtre: Optional[Dict] = None) -> Dict:
+        """Supprime en une requête toutes les opérations sélectionnées (IDs et/ou filtre)"""
+        return await self._request("DELETE", "/operations", json={"ids": ids, "filtre": filtre})
+
+    # ========== STATISTIQUES ==========
+    async def get_monthly_stats(self, **params) -> List[Dict]:
+        """
+        Récupère les totaux mensuels (GET /api/stats/mensuel)
+
+        Args:
+            **params: date_debut, date_fin, idcompte, par ('compte', 'categorie', 'souscategorie', 'type')
+        """
+        return await self._request("GET", "/stats/mensuel", params=params)
+
+    async def get_analytics_series(self, granularite: str = "month", **params) -> Dict:
+        """
+        Récupère les séries revenus / dépenses / net (GET /api/analytics/series)
+
+        Args:
+            granularite: 'day', 'week', 'month' ou 'year'
+            **params: date_debut, date_fin, par ('categorie' ou 'compte'), max_points
+        """
+        return await self._request("GET", "/analytics/series", params={**params, "granularite": granularite})
+
+    # ========== BUDGETS ==========
+    async def get_budgets(self) -> List[Dict]:
+        """Récupère les budgets mensuels"""
+        return await self._request("GET", "/budgets")
+
+    async def create_budget(self, montant: float, idcategorie: Optional[int] = None,
+                            idsouscategorie: Optional[int] = None, **options) -> Dict:
+        """Crée le budget d'une catégorie ou d'une sous-catégorie (options: alerte_seuil, limite_stricte, actif)"""
+        data = {"montant": montant, "idcategorie": idcategorie, "idsouscategorie": idsouscategorie, **options}
+        return await self._request("POST", "/budgets", json=data)
+
+    async def get_budget_report(self, mois: Optional[str] = None) -> Dict:
+        """Récupère le rapport budget / réel d'un mois (YYYY-MM-DD, mois courant par défaut)"""
+        return await self._request("GET", "/budgets/report", params={"mois": mois})
+
+    # ========== ALERTES ==========
+    async def get_alertes(self, depuis: Optional[int] = None, non_lues: bool = False) -> List[Dict]:
+        """Récupère les alertes budgétaires postérieures à l'alerte `depuis`"""
+        return await self._request("GET", "/alertes", params={"depuis": depuis, "non_lues": non_lues})
+
+    async def mark_alerte_lue(self, alerte_id: int) -> Dict:
+        """Marque une alerte comme lue"""
+        return await self._request("PUT", f"/alertes/{alerte_id}/lue")
+
+
+# ==================== FAÇADE SYNCHRONE ====================
+
+_boucle: Optional[asyncio.AbstractEventLoop] = None
+_boucle_verrou = threading.Lock()
+
+
+def _get_boucle() -> asyncio.AbstractEventLoop:
+    """Boucle asyncio partagée, exécutée dans un thread de fond (créée au premier appel)"""
+    global _boucle
+    with _boucle_verrou:
+        if _boucle is None:
+            _boucle = asyncio.new_event_loop()
+            threading.Thread(target=_boucle.run_forever, name="api-client-loop", daemon=True).start()
+        return _boucle
+
+
+class BudgetAPIClient:
+    """
+    Façade synchrone de AsyncBudgetAPIClient
+
+    Chaque méthode asynchrone du client (get_operations, get_all_operations, create_operation,
+    login, ...) est exposée sous le même nom et bloque jusqu'au résultat.
+    """
+
+    def __init__(self, base_url: str = BASE_URL, token: Optional[str] = None, **options):
+        self.client = AsyncBudgetAPIClient(base_url, token=token, **options)
+
+    @property
+    def base_url(self) -> str:
+        return self.client.base_url
+
+    @property
+    def token(self) -> Optional[str]:
+        return self.client.token
+
+    def set_token(self, token: Optional[str]):
+        """Définit (ou retire) le jeton JWT envoyé avec chaque requête"""
+        self.client.set_token(token)
+
+    def close(self):
+        """Ferme les connexions du pool"""
+        self._run(self.client.aclose())
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, _get_boucle()).result()
+
+    def __getattr__(self, name: str):
+        methode = getattr(self.client, name)
+        if not asyncio.iscoroutinefunction(methode):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._run(methode(*args, **kwargs))
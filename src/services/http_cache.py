@@ -0,0 +1,97 @@
+"""
+Cache HTTP persistant du client API (SQLite dans le répertoire de données de l'application)
+
+Chaque réponse GET est conservée avec son ETag et sa date d'expiration (Cache-Control
+max-age). Une entrée encore fraîche est servie sans requête ; une entrée expirée est
+revalidée avec If-None-Match (304 : le corps en cache est réutilisé).
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class CacheEntry(NamedTuple):
+    """Réponse en cache"""
+    etag: Optional[str]
+    expire: float
+    corps: Any
+
+    @property
+    def fraiche(self) -> bool:
+        return time.time() < self.expire
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Any]:
+    """
+    Analyse un en-tête Cache-Control
+
+    Returns:
+        {"no_store": bool, "max_age": int (0 si absent ou no-cache)}
+    """
+    value = (value or "").lower()
+    max_age = _MAX_AGE.search(value)
+    return {
+        "no_store": "no-store" in value,
+        "max_age": 0 if "no-cache" in value or not max_age else int(max_age.group(1)),
+    }
+
+
+class HTTPCache:
+    """Cache des réponses GET, persistant entre les lancements"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Fichier SQLite du cache (créé si absent)
+        """
+        self._verrou = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reponse ("
+            " cle TEXT PRIMARY KEY, etag TEXT, expire REAL NOT NULL, corps TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, cle: str) -> Optional[CacheEntry]:
+        """Entrée en cache (fraîche ou non), None si absente"""
+        with self._verrou:
+            ligne = self._db.execute("SELECT etag, expire, corps FROM reponse WHERE cle = ?", (cle,)).fetchone()
+        if ligne is None:
+            return None
+        return CacheEntry(ligne[0], ligne[1], json.loads(ligne[2]))
+
+    def put(self, cle: str, etag: Optional[str], max_age: int, corps: Any):
+        """Enregistre (ou remplace) une réponse"""
+        with self._verrou:
+            self._db.execute(
+                "INSERT OR REPLACE INTO reponse (cle, etag, expire, corps) VALUES (?, ?, ?, ?)",
+                (cle, etag, time.time() + max_age, json.dumps(corps)),
+            )
+            self._db.commit()
+
+    def touch(self, cle: str, max_age: int):
+        """Prolonge une entrée revalidée (réponse 304)"""
+        with self._verrou:
+            self._db.execute("UPDATE reponse SET expire = ? WHERE cle = ?", (time.time() + max_age, cle))
+            self._db.commit()
+
+    def invalidate(self, prefixe: str):
+        """Supprime les entrées dont la clé commence par `prefixe`"""
+        with self._verrou:
+            self._db.execute("DELETE FROM reponse WHERE substr(cle, 1, ?) = ?", (len(prefixe), prefixe))
+            self._db.commit()
+
+    def clear(self):
+        """Vide le cache"""
+        with self._verrou:
+            self._db.execute("DELETE FROM reponse")
+            self._db.commit()
+
+    def close(self):
+        with self._verrou:
+            self._db.close()
@@ -0,0 +1,132 @@
+"""
+Journal local (ajout seul) et instantané compacté de l'état propre au client
+
+Conserve ce que le serveur ne connaît pas : budgets de catégories et champs locaux des
+opérations (catégorie, icône). Chaque modification ajoute une ligne JSON au journal
+(journal.jsonl, fsync) : une sauvegarde coûte O(1), quelle que soit la taille de l'état.
+Périodiquement, l'état complet est réécrit dans un instantané (etat.json, remplacement
+atomique) et le journal est vidé : le chargement lit l'instantané puis rejoue au plus
+les entrées écrites depuis.
+
+Chaque entrée porte un numéro de séquence ; l'instantané retient le dernier numéro qu'il
+inclut. Un arrêt entre l'écriture de l'instantané et le vidage du journal, ou au milieu
+d'une ligne, ne rejoue donc rien deux fois et ne perd que l'entrée incomplète.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _fsync_repertoire(repertoire: Path):
+    """Rend durable un renommage dans `repertoire` (sans effet là où un répertoire ne s'ouvre pas)"""
+    try:
+        fd = os.open(repertoire, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class LocalJournal:
+    """Journal d'entrées JSON en ajout seul, compacté dans un instantané"""
+
+    def __init__(self, repertoire: str):
+        """
+        Args:
+            repertoire: Répertoire du journal et de l'instantané (créé si absent)
+        """
+        self.repertoire = Path(repertoire)
+        self.repertoire.mkdir(parents=True, exist_ok=True)
+        self._chemin_journal = self.repertoire / "journal.jsonl"
+        self._chemin_etat = self.repertoire / "etat.json"
+        self._verrou = threading.Lock()
+        self._sequence = 0
+        self._fichier = None
+        # Entrées du journal non encore incluses dans un instantané
+        self.nombre_entrees = 0
+
+    def load(self) -> Tuple[Optional[Any], List[Dict[str, Any]]]:
+        """
+        Lit l'instantané et les entrées écrites depuis (à appeler une fois, avant append)
+
+        Une dernière ligne incomplète (arrêt pendant l'écriture) est retirée du journal.
+
+        Returns:
+            (état de l'instantané ou None, entrées à rejouer dans l'ordre)
+        """
+        with self._verrou:
+            etat, sequence_etat = None, 0
+            if self._chemin_etat.exists():
+                instantane = json.loads(self._chemin_etat.read_text(encoding="utf-8"))
+                etat, sequence_etat = instantane["etat"], instantane["sequence"]
+
+            entrees = []
+            sequence = sequence_etat
+            valide = 0
+            if self._chemin_journal.exists():
+                with open(self._chemin_journal, "rb") as fichier:
+                    for ligne in fichier:
+                        if not ligne.endswith(b"\n"):
+                            break
+                        try:
+                            entree = json.loads(ligne)
+                        except ValueError:
+                            break
+                        valide += len(ligne)
+                        if entree["seq"] > sequence_etat:
+                            entrees.append(entree["entree"])
+                            sequence = entree["seq"]
+                if valide != self._chemin_journal.stat().st_size:
+                    os.truncate(self._chemin_journal, valide)
+
+            self._sequence = sequence
+            self.nombre_entrees = len(entrees)
+            return etat, entrees
+
+    def append(self, entree: Dict[str, Any]):
+        """Ajoute une entrée au journal, durable au retour (fsync)"""
+        with self._verrou:
+            if self._fichier is None:
+                self._fichier = open(self._chemin_journal, "ab")
+            self._sequence += 1
+            ligne = json.dumps({"seq": self._sequence, "entree": entree}, ensure_ascii=False, separators=(",", ":"))
+            self._fichier.write(ligne.encode("utf-8") + b"\n")
+            self._fichier.flush()
+            os.fsync(self._fichier.fileno())
+            self.nombre_entrees += 1
+
+    def compact(self, etat: Any):
+        """
+        Remplace l'instantané par `etat` (qui inclut toutes les entrées ajoutées) et vide le journal
+
+        L'instantané est écrit dans un fichier temporaire, rendu durable puis renommé.
+        """
+        with self._verrou:
+            temporaire = self.repertoire / "etat.json.tmp"
+            with open(temporaire, "w", encoding="utf-8") as fichier:
+                json.dump({"sequence": self._sequence, "etat": etat}, fichier, ensure_ascii=False,
+                          separators=(",", ":"))
+                fichier.flush()
+                os.fsync(fichier.fileno())
+            os.replace(temporaire, self._chemin_etat)
+            _fsync_repertoire(self.repertoire)
+
+            # Entrées désormais couvertes par l'instantané (ignorées au rejeu si le vidage n'a pas lieu)
+            if self._fichier is not None:
+                self._fichier.close()
+                self._fichier = None
+            if self._chemin_journal.exists():
+                os.truncate(self._chemin_journal, 0)
+            self.nombre_entrees = 0
+
+    def close(self):
+        with self._verrou:
+            if self._fichier is not None:
+                self._fichier.close()
+                self._fichier = None
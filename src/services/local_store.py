@@ -0,0 +1,310 @@
+"""
+Miroir local (SQLite) des données de l'utilisateur, dans le répertoire de données de l'application
+
+Conserve les opérations (au format de l'API), les données de référence (comptes, catégories,
+sous-catégories, agrégats mensuels) et le curseur de synchronisation. Au lancement,
+l'application s'affiche depuis ce miroir sans attendre le serveur, puis applique les
+changements renvoyés par GET /api/sync/operations depuis le curseur enregistré.
+
+Les écritures locales sont appliquées immédiatement au miroir et consignées dans une file
+d'attente durable (table ecriture), envoyée par lots à POST /api/sync/operations. Une
+opération créée hors ligne porte un ID local négatif jusqu'à sa confirmation par le serveur.
+"""
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Colonnes des opérations, dans l'ordre de la table
+_COLONNES = ("idoperation", "date", "description", "montant", "idcompte", "idtype", "idsouscategorie")
+
+
+def normaliser_recherche(texte: str) -> str:
+    """Clé de recherche : minuscules, sans accents ("Café Crème" -> "cafe creme")"""
+    if texte.isascii():
+        return texte.lower()
+    decompose = unicodedata.normalize("NFKD", texte.casefold())
+    return "".join(c for c in decompose if not unicodedata.combining(c))
+
+
+class LocalStore:
+    """Miroir local des opérations et des données de référence"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Fichier SQLite du miroir (créé si absent)
+        """
+        self._verrou = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # WAL + synchronous=NORMAL : une écriture locale ne coûte pas un fsync (seule une coupure
+        # de courant peut perdre les dernières transactions, pas un arrêt de l'application)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.create_function("normaliser", 1, normaliser_recherche, deterministic=True)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS operation ("
+            " idoperation INTEGER PRIMARY KEY, date TEXT NOT NULL, description TEXT NOT NULL,"
+            " montant TEXT NOT NULL, idcompte INTEGER NOT NULL, idtype INTEGER, idsouscategorie INTEGER);"
+            "CREATE INDEX IF NOT EXISTS idx_operation_date ON operation (date);"
+            "CREATE TABLE IF NOT EXISTS reference (nom TEXT PRIMARY KEY, corps TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS meta (cle TEXT PRIMARY KEY, valeur TEXT);"
+            "CREATE TABLE IF NOT EXISTS ecriture ("
+            " rang INTEGER PRIMARY KEY AUTOINCREMENT, cle TEXT NOT NULL UNIQUE, action TEXT NOT NULL,"
+            " idoperation INTEGER, donnees TEXT, avant TEXT,"
+            " tentatives INTEGER NOT NULL DEFAULT 0, prochaine_tentative REAL NOT NULL DEFAULT 0);"
+            "CREATE TABLE IF NOT EXISTS id_local (local INTEGER PRIMARY KEY, serveur INTEGER NOT NULL);"
+        )
+        self._db.commit()
+
+    # ========== OPÉRATIONS ==========
+    def load_operations(self, date_debut: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Opérations du miroir (format de l'API), par date
+
+        Args:
+            date_debut: Date minimale incluse (YYYY-MM-DD), toutes si None
+        """
+        with self._verrou:
+            lignes = self._db.execute(
+                f"SELECT {', '.join(_COLONNES)} FROM operation WHERE date >= ? ORDER BY date, idoperation",
+                (date_debut or "",),
+            ).fetchall()
+        return [dict(zip(_COLONNES, ligne)) for ligne in lignes]
+
+    def page_operations(self, skip: int, limit: int, search: Optional[str] = None,
+                        ids: Optional[Iterable[int]] = None, exclure_ids: bool = False) -> List[Dict[str, Any]]:
+        """
+        Page d'opérations du miroir (format de l'API), plus récentes d'abord
+
+        Les écritures locales pas encore envoyées y sont déjà appliquées.
+
+        Args:
+            skip: Nombre d'opérations sautées
+            limit: Taille de la page
+            search: Texte recherché dans la description (sans casse ni accents)
+            ids: Seulement ces opérations (toutes sauf celles-ci si exclure_ids)
+        """
+        conditions, parametres = [], []
+        if search:
+            conditions.append("instr(normaliser(description), ?) > 0")
+            parametres.append(normaliser_recherche(search))
+        if ids is not None:
+            conditions.append(f"idoperation {'NOT IN' if exclure_ids else 'IN'} (SELECT value FROM json_each(?))")
+            parametres.append(json.dumps(list(ids)))
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._verrou:
+            lignes = self._db.execute(
+                f"SELECT {', '.join(_COLONNES)} FROM operation{where}"
+                " ORDER BY date DESC, idoperation DESC LIMIT ? OFFSET ?",
+                (*parametres, limit, skip),
+            ).fetchall()
+        return [dict(zip(_COLONNES, ligne)) for ligne in lignes]
+
+    def replace_operations(self, operations: Iterable[Dict[str, Any]], curseur: int, fenetre: str = ""):
+        """
+        Remplace tout le miroir (chargement complet depuis le serveur)
+
+        Args:
+            operations: Opérations au format de l'API
+            curseur: Curseur de synchronisation obtenu avant le chargement
+            fenetre: Début de la fenêtre chargée (YYYY-MM-DD), vide pour tout l'historique
+        """
+        with self._verrou, self._db:
+            self._db.execute("DELETE FROM operation")
+            self._inserer(operations)
+            self._set_meta("curseur", str(curseur))
+            self._set_meta("fenetre", fenetre)
+
+    def apply_changes(self, operations: Iterable[Dict[str, Any]], supprimees: Iterable[int],
+                      curseur: Optional[int] = None):
+        """
+        Applique des créations / modifications / suppressions
+
+        Args:
+            operations: Opérations créées ou modifiées (format de l'API)
+            supprimees: IDs des opérations supprimées
+            curseur: Nouveau curseur de synchronisation (inchangé si None)
+        """
+        with self._verrou, self._db:
+            self._db.executemany("DELETE FROM operation WHERE idoperation = ?", [(i,) for i in supprimees])
+            self._inserer(operations)
+            if curseur is not None:
+                self._set_meta("curseur", str(curseur))
+
+    def _inserer(self, operations: Iterable[Dict[str, Any]]):
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO operation ({', '.join(_COLONNES)}) VALUES ({', '.join('?' * len(_COLONNES))})",
+            ([op['idoperation'], op['date'], op['description'], str(op['montant']), op['idcompte'],
+              op.get('idtype'), op.get('idsouscategorie')] for op in operations),
+        )
+
+    def _fusionner(self, idoperation: int, valeurs: Dict[str, Any]):
+        colonnes = [colonne for colonne in _COLONNES[1:] if colonne in valeurs]
+        if colonnes:
+            self._db.execute(
+                f"UPDATE operation SET {', '.join(f'{colonne} = ?' for colonne in colonnes)} WHERE idoperation = ?",
+                (*(str(valeurs[c]) if c == 'montant' else valeurs[c] for c in colonnes), idoperation),
+            )
+
+    def renumber_operation(self, local: int, serveur: int):
+        """Donne son ID serveur à une opération créée localement (ses colonnes sont conservées)"""
+        with self._verrou, self._db:
+            self._db.execute("UPDATE OR REPLACE operation SET idoperation = ? WHERE idoperation = ?", (serveur, local))
+
+    # ========== SYNCHRONISATION ==========
+    @property
+    def curseur(self) -> Optional[int]:
+        """Curseur de la dernière synchronisation (None si le miroir n'a jamais été rempli)"""
+        valeur = self.get_meta("curseur")
+        return int(valeur) if valeur is not None else None
+
+    def get_meta(self, cle: str) -> Optional[str]:
+        with self._verrou:
+            ligne = self._db.execute("SELECT valeur FROM meta WHERE cle = ?", (cle,)).fetchone()
+        return ligne[0] if ligne else None
+
+    def _set_meta(self, cle: str, valeur: str):
+        self._db.execute("INSERT OR REPLACE INTO meta (cle, valeur) VALUES (?, ?)", (cle, valeur))
+
+    # ========== FILE D'ATTENTE DES ÉCRITURES ==========
+    def next_local_id(self) -> int:
+        """ID local (négatif) d'une opération créée avant sa confirmation par le serveur"""
+        with self._verrou, self._db:
+            ligne = self._db.execute("SELECT valeur FROM meta WHERE cle = 'dernier_id_local'").fetchone()
+            identifiant = (int(ligne[0]) if ligne else 0) - 1
+            self._set_meta("dernier_id_local", str(identifiant))
+        return identifiant
+
+    def enqueue_write(self, action: str, idoperation: int, donnees: Optional[Dict[str, Any]] = None,
+                      avant: Optional[Dict[str, Any]] = None, ligne: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Applique une écriture locale au miroir et la consigne pour le serveur (même transaction)
+
+        Args:
+            action: 'create', 'update' ou 'delete'
+            idoperation: ID de l'opération (ID local négatif pour une création)
+            donnees: Valeurs écrites (format de l'API)
+            avant: Valeurs connues avant l'écriture (détection des conflits)
+            ligne: Opération complète créée (format de l'API, create) ; une modification
+                fusionne donnees dans la ligne du miroir (les autres colonnes sont conservées)
+
+        Returns:
+            str: Clé d'idempotence de l'écriture
+        """
+        cle = str(uuid.uuid4())
+        with self._verrou, self._db:
+            if action == "delete":
+                self._db.execute("DELETE FROM operation WHERE idoperation = ?", (idoperation,))
+            elif action == "update":
+                self._fusionner(idoperation, donnees or {})
+            elif ligne is not None:
+                self._inserer([ligne])
+            self._db.execute(
+                "INSERT INTO ecriture (cle, action, idoperation, donnees, avant) VALUES (?, ?, ?, ?, ?)",
+                (cle, action, idoperation, json.dumps(donnees) if donnees is not None else None,
+                 json.dumps(avant) if avant is not None else None),
+            )
+        return cle
+
+    def pending_writes(self, limit: int, ignorer_delai: bool = False) -> List[Dict[str, Any]]:
+        """
+        Prochain lot d'écritures à envoyer, dans l'ordre de saisie
+
+        Le lot s'arrête avant une écriture en attente d'un nouvel essai, ou visant une
+        opération créée localement dont l'ID serveur n'est pas encore connu.
+
+        Args:
+            limit: Taille maximale du lot
+            ignorer_delai: Inclure les écritures dont le prochain essai n'est pas encore dû
+        """
+        with self._verrou:
+            lignes = self._db.execute(
+                "SELECT e.cle, e.action, e.idoperation, e.donnees, e.avant, e.prochaine_tentative, i.serveur"
+                " FROM ecriture e LEFT JOIN id_local i ON i.local = e.idoperation"
+                " ORDER BY e.rang LIMIT ?", (limit,)
+            ).fetchall()
+
+        lot = []
+        maintenant = time.time()
+        for cle, action, idoperation, donnees, avant, prochaine_tentative, serveur in lignes:
+            if not ignorer_delai and prochaine_tentative > maintenant:
+                break
+            if action != "create" and idoperation < 0:
+                if serveur is None:
+                    break
+                idoperation = serveur
+            lot.append({
+                "cle": cle,
+                "action": action,
+                "idoperation": idoperation,
+                "donnees": json.loads(donnees) if donnees is not None else None,
+                "avant": json.loads(avant) if avant is not None else None,
+            })
+        return lot
+
+    def complete_writes(self, cles: Iterable[str]):
+        """Retire de la file les écritures traitées par le serveur"""
+        with self._verrou, self._db:
+            self._db.executemany("DELETE FROM ecriture WHERE cle = ?", [(cle,) for cle in cles])
+
+    def postpone_writes(self, cles: Iterable[str], backoff: float, max_delai: float):
+        """Reporte les écritures après un échec d'envoi (délai doublé à chaque essai)"""
+        with self._verrou, self._db:
+            self._db.executemany(
+                "UPDATE ecriture SET tentatives = tentatives + 1,"
+                " prochaine_tentative = ? + min(?, ? * (1 << min(tentatives, 20))) WHERE cle = ?",
+                [(time.time(), max_delai, backoff, cle) for cle in cles],
+            )
+
+    def discard_writes(self, idoperation: int):
+        """Abandonne les écritures en attente sur une opération (création refusée par le serveur)"""
+        with self._verrou, self._db:
+            self._db.execute("DELETE FROM ecriture WHERE idoperation = ?", (idoperation,))
+
+    def map_local_id(self, local: int, serveur: int):
+        """Associe l'ID local d'une opération créée hors ligne à son ID serveur"""
+        with self._verrou, self._db:
+            self._db.execute("INSERT OR REPLACE INTO id_local (local, serveur) VALUES (?, ?)", (local, serveur))
+
+    def pending_ids(self) -> Set[int]:
+        """IDs serveur des opérations ayant des écritures non encore confirmées"""
+        with self._verrou:
+            lignes = self._db.execute(
+                "SELECT COALESCE(i.serveur, e.idoperation) FROM ecriture e"
+                " LEFT JOIN id_local i ON i.local = e.idoperation"
+            ).fetchall()
+        return {ligne[0] for ligne in lignes}
+
+    @property
+    def nombre_ecritures_en_attente(self) -> int:
+        with self._verrou:
+            return self._db.execute("SELECT COUNT(*) FROM ecriture").fetchone()[0]
+
+    # ========== DONNÉES DE RÉFÉRENCE ==========
+    def save_reference(self, nom: str, donnees: Any):
+        """Enregistre une liste de référence (comptes, catégories, ...) telle que renvoyée par l'API"""
+        with self._verrou, self._db:
+            self._db.execute("INSERT OR REPLACE INTO reference (nom, corps) VALUES (?, ?)", (nom, json.dumps(donnees)))
+
+    def load_reference(self, nom: str) -> Optional[Any]:
+        """Liste de référence enregistrée, None si absente"""
+        with self._verrou:
+            ligne = self._db.execute("SELECT corps FROM reference WHERE nom = ?", (nom,)).fetchone()
+        return json.loads(ligne[0]) if ligne else None
+
+    def clear(self):
+        """Vide le miroir (changement d'utilisateur)"""
+        with self._verrou, self._db:
+            self._db.execute("DELETE FROM operation")
+            self._db.execute("DELETE FROM reference")
+            self._db.execute("DELETE FROM meta")
+            self._db.execute("DELETE FROM ecriture")
+            self._db.execute("DELETE FROM id_local")
+
+    def close(self):
+        with self._verrou:
+            self._db.close()
@@ -0,0 +1,52 @@
+"""
+Tests du sous-échantillonnage LTTB des séries analytics
+Fonctions pures : ces tests ne nécessitent pas de base de données
+"""
+import sys
+import math
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.backend.services.analytics import lttb, _downsample
+
+
+def test_lttb_keeps_short_series():
+    """Une série plus courte que le seuil est conservée telle quelle"""
+    assert lttb([0, 1, 2], [5, 6, 7], 10) == [0, 1, 2]
+
+
+def test_lttb_reduces_and_keeps_bounds():
+    """Le nombre de points est respecté, le premier et le dernier sont conservés, l'ordre est croissant"""
+    x = list(range(10_000))
+    y = [math.sin(i / 100) for i in x]
+    indices = lttb(x, y, 200)
+
+    assert len(indices) == 200
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert indices == sorted(set(indices))
+
+
+def test_lttb_keeps_spike():
+    """Un pic isolé est conservé (c'est le plus grand triangle de son bucket)"""
+    x = list(range(1000))
+    y = [0.0] * 1000
+    y[437] = 100.0
+    assert 437 in lttb(x, y, 20)
+
+
+def test_downsample_points():
+    """Les points renvoyés gardent revenus, dépenses et net alignés"""
+    start = date(2015, 1, 1)
+    points = [
+        {"periode": start + timedelta(days=i), "revenus": Decimal(i), "depenses": Decimal(0), "net": Decimal(i)}
+        for i in range(3650)
+    ]
+    result = _downsample(points, 300)
+
+    assert len(result) == 300
+    assert result[0]["periode"] == start
+    assert all(p["net"] == p["revenus"] - p["depenses"] for p in result)
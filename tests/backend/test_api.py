@@ -102,6 +102,47 @@ def test_model_attributes():
         return False
 
 
+def test_integrity_errors_map_to_http_status():
+    """Violation d'unicité -> 409, clé étrangère -> 400, autres erreurs non traduites"""
+    import asyncio
+    from types import SimpleNamespace
+    from sqlalchemy.exc import IntegrityError
+    from src.backend.main import database_error_handler
+
+    def erreur(pgcode):
+        orig = SimpleNamespace(pgcode=pgcode, diag=SimpleNamespace(message_primary=f"violation {pgcode}"))
+        return IntegrityError("UPDATE ...", {}, orig)
+
+    assert asyncio.run(database_error_handler(None, erreur("23505"))).status_code == 409
+    assert asyncio.run(database_error_handler(None, erreur("23503"))).status_code == 400
+    try:
+        asyncio.run(database_error_handler(None, erreur("23514")))
+    except IntegrityError:
+        pass
+    else:
+        raise AssertionError("Les autres violations doivent remonter")
+
+
+def test_moving_or_deleting_sous_categorie_rebuilds_consommation():
+    """Déplacement ou suppression d'une sous-catégorie : consommation recalculée avant le commit"""
+    from unittest import mock
+    from src.backend.services import crud
+    from src.backend.api import schemas
+
+    def appels(db):
+        return [nom if nom == "commit" else str(args[0]) for nom, args, _ in db.method_calls
+                if nom == "commit" or (nom == "execute" and "rebuild_budget_consommation" in str(args[0]))]
+
+    db = mock.MagicMock()
+    crud.update_sous_categorie(db, 5, schemas.SousCategorieUpdate(nomsouscategorie="Courses"))
+    assert appels(db) == ["commit"]
+
+    db = mock.MagicMock()
+    crud.update_sous_categorie(db, 5, schemas.SousCategorieUpdate(idcategorie=2))
+    crud.delete_sous_categorie(db, 5)
+    assert appels(db) == ["SELECT rebuild_budget_consommation()", "commit"] * 2
+
+
 def main():
     """Point d'entrée principal"""
     print("=" * 60)
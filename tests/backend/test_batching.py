@@ -0,0 +1,82 @@
+"""
+Tests du coalesceur d'écritures (group commit) des opérations
+Le writer est simulé : ces tests ne nécessitent pas de base de données
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.backend.services.batching import OperationWriteCoalescer
+
+
+def _fake_writer(calls):
+    """Writer qui enregistre les lots reçus et échoue sur les montants négatifs"""
+    def writer(items):
+        calls.append(list(items))
+        results = []
+        for user_id, values in items:
+            if values["montant"] < 0:
+                results.append(ValueError(f"montant invalide: {values['montant']}"))
+            else:
+                results.append({"idoperation": len(results) + 1, "idutilisateur": user_id, **values})
+        return results
+    return writer
+
+
+def test_concurrent_creates_are_coalesced():
+    """Les créations concurrentes partent en un seul lot"""
+    calls = []
+
+    async def scenario():
+        coalescer = OperationWriteCoalescer(writer=_fake_writer(calls), window_ms=20, max_batch_size=100)
+        results = await asyncio.gather(*[
+            coalescer.submit(1, {"montant": i}) for i in range(25)
+        ])
+        await coalescer.close()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert len(calls[0]) == 25
+    assert [r["montant"] for r in results] == list(range(25))
+
+
+def test_errors_are_fanned_out_to_their_caller():
+    """Une ligne invalide n'échoue que pour son appelant"""
+    calls = []
+
+    async def scenario():
+        coalescer = OperationWriteCoalescer(writer=_fake_writer(calls), window_ms=20)
+        results = await asyncio.gather(
+            coalescer.submit(1, {"montant": 10}),
+            coalescer.submit(2, {"montant": -1}),
+            coalescer.submit(1, {"montant": 30}),
+            return_exceptions=True
+        )
+        await coalescer.close()
+        return results
+
+    ok_1, error, ok_2 = asyncio.run(scenario())
+
+    assert ok_1["montant"] == 10
+    assert isinstance(error, ValueError)
+    assert ok_2["montant"] == 30
+
+
+def test_max_batch_size_splits_batches():
+    """Un lot ne dépasse jamais max_batch_size"""
+    calls = []
+
+    async def scenario():
+        coalescer = OperationWriteCoalescer(writer=_fake_writer(calls), window_ms=50, max_batch_size=10)
+        await asyncio.gather(*[coalescer.submit(1, {"montant": i}) for i in range(35)])
+        await coalescer.close()
+
+    asyncio.run(scenario())
+
+    assert sum(len(batch) for batch in calls) == 35
+    assert max(len(batch) for batch in calls) <= 10
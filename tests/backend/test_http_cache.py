@@ -0,0 +1,48 @@
+"""
+Tests du middleware ETag / Cache-Control
+Application FastAPI minimale : ces tests ne nécessitent pas de base de données
+"""
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.backend.services.http_cache import ETagMiddleware, cache_control_for
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware)
+
+    @app.get("/api/categories")
+    def categories():
+        return [{"idcategorie": 1, "nom": "Courses"}]
+
+    return TestClient(app)
+
+
+def test_cache_control_by_resource():
+    """Données de référence réutilisables, autres ressources revalidées"""
+    assert "max-age" in cache_control_for("/api/categories/3/sous-categories")
+    assert cache_control_for("/api/operations") == "private, no-cache"
+    assert cache_control_for("/api/comptes/1/operations") == "private, no-cache"
+    assert cache_control_for("/api/comptes") == "private, no-cache"
+    assert cache_control_for("/api/sync/operations") == "private, no-store"
+
+
+def test_etag_and_not_modified():
+    """La réponse porte un ETag ; If-None-Match correspondant renvoie 304 sans corps"""
+    client = _client()
+    response = client.get("/api/categories")
+    assert response.status_code == 200
+    assert response.json() == [{"idcategorie": 1, "nom": "Courses"}]
+    etag = response.headers["ETag"]
+
+    response = client.get("/api/categories", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert client.get("/api/categories", headers={"If-None-Match": 'W/"autre"'}).status_code == 200
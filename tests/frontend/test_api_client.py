@@ -0,0 +1,154 @@
+"""
+Tests du client API asynchrone (pagination parallèle, reprises, jeton, cache HTTP)
+Le serveur est simulé par un transport httpx : ces tests ne nécessitent pas l'API
+"""
+import sys
+import asyncio
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import httpx
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services import api_client
+from src.services.api_client import AsyncBudgetAPIClient, BudgetAPIClient
+from src.services.http_cache import HTTPCache
+
+OPERATIONS = [{"idoperation": i} for i in range(2345)]
+
+
+def _serveur(requetes, echecs=0, operations=OPERATIONS, apres_requete=None):
+    """
+    Transport simulant GET /api/operations (skip / limit, tri par ID, apres / jusqua) ;
+    les `echecs` premiers appels renvoient 503, apres_requete() est appelé après chaque réponse
+    """
+    def handler(request: httpx.Request) -> httpx.Response:
+        requetes.append(request)
+        if len(requetes) <= echecs:
+            return httpx.Response(503)
+        params = request.url.params
+        selection = [op for op in operations
+                     if op["idoperation"] > int(params.get("apres", -10**9))
+                     and op["idoperation"] <= int(params.get("jusqua", 10**9))]
+        selection.sort(key=lambda op: op["idoperation"], reverse=params.get("tri") == "-idoperation")
+        skip = int(params.get("skip", 0))
+        limit = int(params.get("limit", 100))
+        response = httpx.Response(200, json=selection[skip:skip + limit])
+        if apres_requete:
+            apres_requete()
+        return response
+    return httpx.MockTransport(handler)
+
+
+def test_get_all_operations_fetches_every_page_in_order():
+    """Toutes les pages sont récupérées, dans l'ordre, avec le jeton"""
+    requetes = []
+    client = AsyncBudgetAPIClient("http://test/api", token="abc", transport=_serveur(requetes))
+    operations = asyncio.run(client.get_all_operations(page_size=100, parallelisme=4))
+    assert operations == OPERATIONS
+    assert all(r.headers["Authorization"] == "Bearer abc" for r in requetes)
+
+
+def test_get_all_operations_does_not_skip_rows_when_deleting_between_pages():
+    """Pagination par clé : une suppression pendant le téléchargement ne fait sauter aucune autre opération"""
+    operations = list(OPERATIONS)
+    supprimee = operations[150]
+    client = AsyncBudgetAPIClient("http://test/api", transport=_serveur(
+        [], operations=operations, apres_requete=lambda: supprimee in operations and operations.remove(supprimee)
+    ))
+    resultat = asyncio.run(client.get_all_operations(page_size=100, parallelisme=1))
+    assert [op["idoperation"] for op in resultat] == [op["idoperation"] for op in OPERATIONS if op is not supprimee]
+
+
+def test_retries_transient_errors():
+    """Les réponses 503 sont rejouées avec backoff, puis les erreurs définitives remontent"""
+    with mock.patch.object(api_client, "RETRY_BACKOFF", 0):
+        requetes = []
+        client = AsyncBudgetAPIClient("http://test/api", transport=_serveur(requetes, echecs=2))
+        assert len(asyncio.run(client.get_operations(limit=10))) == 10
+        assert len(requetes) == 3
+
+        requetes = []
+        client = AsyncBudgetAPIClient("http://test/api", transport=_serveur(requetes, echecs=10))
+        assert "error" in asyncio.run(client.get_operations())
+        assert len(requetes) == api_client.MAX_RETRIES + 1
+
+
+def test_sync_facade():
+    """La façade synchrone expose les méthodes du client asynchrone"""
+    client = BudgetAPIClient("http://test/api", transport=_serveur([]))
+    assert len(client.get_all_operations(page_size=1000)) == len(OPERATIONS)
+    client.close()
+
+
+def _serveur_reference(requetes, cache_control):
+    """Transport simulant GET /api/categories avec ETag (304 si If-None-Match correspond)"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requetes.append(request)
+        await asyncio.sleep(0.01)
+        headers = {"ETag": 'W/"v1"', "Cache-Control": cache_control}
+        if request.method != "GET":
+            return httpx.Response(200, json={"idcategorie": 1})
+        if request.headers.get("If-None-Match") == 'W/"v1"':
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, json=[{"idcategorie": 1}], headers=headers)
+    return httpx.MockTransport(handler)
+
+
+def _cache():
+    return HTTPCache(str(Path(tempfile.mkdtemp()) / "http_cache.sqlite3"))
+
+
+def test_http_cache_revalidates_with_etag():
+    """Une réponse no-cache est revalidée (If-None-Match) et le corps en cache est réutilisé sur 304"""
+    requetes = []
+    cache = _cache()
+    client = AsyncBudgetAPIClient("http://test/api", transport=_serveur_reference(requetes, "private, no-cache"),
+                                  cache=cache)
+    assert asyncio.run(client._request("GET", "/categories")) == [{"idcategorie": 1}]
+
+    # Nouveau client (relance de l'application) : le cache persiste
+    client = AsyncBudgetAPIClient("http://test/api", transport=_serveur_reference(requetes, "private, no-cache"),
+                                  cache=cache)
+    assert asyncio.run(client._request("GET", "/categories")) == [{"idcategorie": 1}]
+    assert len(requetes) == 2
+    assert requetes[1].headers["If-None-Match"] == 'W/"v1"'
+
+
+def test_http_cache_fresh_hits_and_invalidation():
+    """Une entrée fraîche est servie sans requête ; une écriture sur la ressource l'invalide"""
+    requetes = []
+    client = AsyncBudgetAPIClient("http://test/api", transport=_serveur_reference(requetes, "private, max-age=60"),
+                                  cache=_cache())
+
+    async def scenario():
+        await client._request("GET", "/categories")
+        await client._request("GET", "/categories")
+        assert len(requetes) == 1
+        await client._request("POST", "/categories", json={"nom": "x"})
+        await client._request("GET", "/categories")
+        assert len(requetes) == 3
+        assert "If-None-Match" not in requetes[2].headers
+
+        # Une écriture d'opérations (directe ou par la file d'attente) invalide aussi les comptes
+        await client._request("GET", "/comptes")
+        await client._request("POST", "/sync/operations", json={"ecritures": []})
+        await client._request("GET", "/comptes")
+        assert len(requetes) == 6
+
+    asyncio.run(scenario())
+
+
+def test_identical_inflight_requests_are_merged():
+    """Des GET identiques simultanés ne produisent qu'une requête réseau"""
+    requetes = []
+    client = AsyncBudgetAPIClient("http://test/api", transport=_serveur_reference(requetes, "private, no-cache"))
+
+    async def scenario():
+        return await asyncio.gather(*(client._request("GET", "/categories") for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [[{"idcategorie": 1}]] * 5
+    assert len(requetes) == 1
@@ -0,0 +1,57 @@
+"""
+Tests des modèles compacts (CompactTransaction, CompactCategoryBudget)
+Ces tests ne nécessitent ni API ni base de données
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.models.category import CategoryBudget, CompactCategoryBudget
+from src.models.transaction import CompactTransaction, Transaction
+
+
+def _transactions():
+    return [
+        {"montant": -42.5, "description": "Courses", "categorie": "Alimentation", "date_transaction": "2024-03-02",
+         "type_transaction": "depense", "id_transaction": 1, "tags": ["marché"], "note": "",
+         "recurrente": False, "frequence_recurrence": "", "date_creation": "2024-03-02T10:00:00"},
+        {"montant": 2000.0, "description": "Salaire", "categorie": "Revenus", "date_transaction": "2024-03-01",
+         "type_transaction": "revenu", "id_transaction": 2, "tags": [], "note": "mars",
+         "recurrente": True, "frequence_recurrence": "mensuelle", "date_creation": "2024-03-01T08:00:00"},
+    ]
+
+
+def test_compact_transaction_matches_original_format():
+    """Même sérialisation que Transaction, depuis des dictionnaires ou des colonnes, sans __dict__"""
+    attendu = [Transaction.from_dict(d).to_dict() for d in _transactions()]
+    compactes = CompactTransaction.from_dicts(_transactions())
+    assert [t.to_dict() for t in compactes] == attendu
+    assert not hasattr(compactes[0], "__dict__")
+    assert compactes[1].est_revenu and compactes[1].montant_affichage == "+2000.00€"
+
+    colonnes = CompactTransaction.to_columns(compactes)
+    assert [t.to_dict() for t in CompactTransaction.from_columns(colonnes)] == attendu
+    # Colonnes absentes : valeurs par défaut
+    assert CompactTransaction.from_columns({"montant": ["1.5"]})[0].type_transaction == "depense"
+    with pytest.raises(ValueError):
+        CompactTransaction.from_columns({"montant": [1.0], "description": []})
+    with pytest.raises(ValueError):
+        CompactTransaction.from_columns({"type_transaction": ["virement"]})
+    with pytest.raises(ValueError):
+        CompactTransaction.from_dicts([{"montant": 1.0, "type_transaction": "virement"}])
+
+
+def test_compact_category_matches_original_format():
+    """Même sérialisation et mêmes règles (seuil borné, couleur validée) que CategoryBudget"""
+    dicts = [CategoryBudget(name="Loisirs", budget=100.0, spent=95.0).to_dict(),
+             {"name": "Santé", "color": "rouge", "alerte_seuil": 3}]
+    attendu = [CategoryBudget.from_dict(d).to_dict() for d in dicts]
+    compactes = CompactCategoryBudget.from_dicts(dicts)
+    assert [c.to_dict() for c in compactes] == attendu
+    assert compactes[0].status == CategoryBudget.from_dict(dicts[0]).status == 'warning'
+    assert [c.to_dict() for c in CompactCategoryBudget.from_columns(CompactCategoryBudget.to_columns(compactes))] \
+        == attendu
@@ -0,0 +1,57 @@
+"""
+Tests du journal local de l'état client (src/services/local_journal.py)
+Ces tests ne nécessitent ni API ni base de données
+"""
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.models import budget_manager
+from src.models.budget_manager import BudgetManager
+from src.services.local_journal import LocalJournal
+
+
+def test_journal_replays_after_snapshot_and_drops_torn_line():
+    """Le rejeu part de l'instantané, ignore les entrées déjà compactées et une ligne incomplète"""
+    repertoire = tempfile.mkdtemp()
+    journal = LocalJournal(repertoire)
+    assert journal.load() == (None, [])
+    journal.append({'n': 1})
+    journal.append({'n': 2})
+    journal.compact({'total': 3})
+    journal.append({'n': 3})
+    journal.close()
+    # Arrêt pendant l'écriture d'une ligne
+    with open(Path(repertoire) / "journal.jsonl", "ab") as fichier:
+        fichier.write(b'{"seq":5,"entree":{"n"')
+
+    journal = LocalJournal(repertoire)
+    assert journal.load() == ({'total': 3}, [{'n': 3}])
+    journal.append({'n': 4})
+    assert LocalJournal(repertoire).load() == ({'total': 3}, [{'n': 3}, {'n': 4}])
+
+
+def test_manager_local_state_survives_restart_with_compaction():
+    """Catégories et champs locaux des opérations sont retrouvés au lancement suivant"""
+    data_directory = tempfile.mkdtemp()
+    with mock.patch.object(budget_manager, 'JOURNAL_COMPACT_EVERY', 3):
+        manager = BudgetManager(data_directory=data_directory, autoload=False)
+        manager.add_category("Jardin", 50.0, "#00FF00", "🌱")
+        operation = manager.add_operation("Graines", -4.5, "Jardin", datetime(2024, 4, 1), icone="🌱")
+        manager.update_operation(operation['idoperation'], categorie="Loisirs")
+        manager._renumeroter_operation(operation['idoperation'], 42)
+    assert manager.journal.nombre_entrees < 3
+
+    manager = BudgetManager(data_directory=data_directory, autoload=False)
+    assert [c.nom for c in manager.categories_budgets][-1] == "Jardin"
+    assert manager.add_category("Cadeaux", 80.0, "#FF00FF").id == 7
+    assert manager.load_local() is False
+    manager.local_store.replace_operations(
+        [{'idoperation': 42, 'description': "Graines", 'montant': "-4.50", 'idcompte': 1, 'date': "2024-04-01"}], 1)
+    assert manager.load_local()
+    assert (manager.get_operation(42).categorie, manager.get_operation(42).icone) == ("Loisirs", "🌱")
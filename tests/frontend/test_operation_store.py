@@ -0,0 +1,457 @@
+"""
+Tests du stockage en colonnes des opérations (src/models/operation_store.py)
+Ces tests ne nécessitent ni API ni base de données
+"""
+import sys
+import tempfile
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.models.budget_manager import BudgetManager, Operation
+from src.models.operation_store import ColumnarHistory, OperationColumns, OperationTotals
+
+
+def _operations():
+    return [
+        Operation(1, "Salaire", 2000.0, "Salaire", datetime(2024, 1, 1)),
+        Operation(2, "Courses", -80.0, "Alimentation", datetime(2024, 1, 5), idcompte=2),
+        Operation(3, "Essence", -50.0, "Transport", datetime(2024, 1, 20, 18, 30)),
+        Operation(4, "Restaurant", -30.0, "Alimentation", datetime(2024, 2, 2)),
+    ]
+
+
+def test_totaux_and_month_mask():
+    """Les totaux globaux et mensuels correspondent aux sommes naïves"""
+    colonnes = OperationColumns.from_operations(_operations())
+    assert colonnes.totaux() == {'revenus': 2000.0, 'depenses': 160.0, 'solde': 1840.0, 'nb_transactions': 4}
+
+    janvier = colonnes.masque_mois(2024, 1)
+    assert list(colonnes.indices(janvier)) == [0, 1, 2]
+    assert colonnes.totaux(janvier)['depenses'] == 130.0
+
+
+def test_group_by_category():
+    """Dépenses, nombres d'opérations et top N par catégorie"""
+    colonnes = OperationColumns.from_operations(_operations())
+    assert colonnes.depenses_par_categorie() == {'Alimentation': 110.0, 'Transport': 50.0}
+    assert colonnes.compte_par_categorie()['Alimentation'] == 2
+    assert colonnes.top_categories(1) == [('Alimentation', 110.0)]
+    assert colonnes.top_categories(5, parmi=['Transport']) == [('Transport', 50.0)]
+
+
+def test_resume_mensuel():
+    """Un résumé par mois, dans l'ordre chronologique"""
+    resume = OperationColumns.from_operations(_operations()).resume_mensuel()
+    assert [m['mois'] for m in resume] == ['2024-01', '2024-02']
+    assert resume[0]['solde'] == 1870.0
+    assert resume[1]['nb_transactions'] == 1
+
+
+def test_empty_store():
+    """Une liste vide donne des totaux nuls"""
+    colonnes = OperationColumns.from_operations([])
+    assert colonnes.totaux()['solde'] == 0.0
+    assert colonnes.resume_mensuel() == []
+    assert colonnes.top_categories() == []
+
+
+def _manager():
+    """BudgetManager sans appel API, alimenté par les opérations de test"""
+    with mock.patch.object(BudgetManager, 'load_operations_from_api'):
+        manager = BudgetManager(data_directory=tempfile.mkdtemp())
+    manager.operations = _operations()
+    return manager
+
+
+def test_manager_indexes_follow_updates():
+    """Les index par ID et par mois restent cohérents après modification et suppression"""
+    manager = _manager()
+    assert [op.id for op in manager.get_operations_of_month(2024, 1)] == [1, 2, 3]
+
+    manager.update_operation(3, date=datetime(2024, 2, 10))
+    assert [op.id for op in manager.get_operations_of_month(2024, 1)] == [1, 2]
+    assert manager.get_category_spending('Transport', 2024, 2) == 50.0
+
+    assert manager.remove_operation(4)
+    assert not manager.remove_operation(4)
+    assert manager.get_operation(4) is None
+    assert manager.get_monthly_summary(2024, 2)['nb_transactions'] == 1
+    assert [op.id for op in manager.operations] == [1, 2, 3]
+
+
+def test_running_totals_match_full_recompute():
+    """Les totaux incrémentaux restent égaux à un recalcul complet après chaque modification"""
+    manager = _manager()
+    manager.debug = True
+    assert manager.get_solde() == 1840.0
+
+    manager.update_operation(2, montant=-100.0, categorie='Loisirs')
+    assert manager.get_category_spending('Loisirs', 2024, 1) == 100.0
+    assert manager.get_category_spending('Alimentation', 2024, 1) == 0.0
+
+    manager.apply_sync_delta([Operation(5, "Prime", 0.1, "Salaire", datetime(2024, 2, 1))], deleted_ids=[1])
+    assert manager.get_revenus_total() == 0.1
+    assert manager.get_monthly_summary(2024, 2)['nb_transactions'] == 2
+    assert manager._totaux == OperationTotals.from_operations(manager.operations)
+
+
+def test_totals_in_integer_cents():
+    """Ajouter puis retirer des montants décimaux ramène exactement à zéro"""
+    totaux = OperationTotals()
+    operations = [Operation(i, "x", 0.1, "A", datetime(2024, 1, 1)) for i in range(10)]
+    for operation in operations:
+        totaux.ajouter(operation)
+    assert totaux.revenus_total == 1.0
+    for operation in operations:
+        totaux.retirer(operation)
+    assert totaux == OperationTotals()
+
+
+class _FakeAPI:
+    """Client API minimal : opérations et agrégats mensuels en mémoire"""
+
+    def __init__(self, operations):
+        self.operations = operations
+        self.appels = []
+        # Changements depuis le dernier curseur : (opérations modifiées, IDs supprimés)
+        self.curseur = 1
+        self.changements = ([], [])
+
+    def get_current_user(self):
+        return {'idutilisateur': 1}
+
+    def get_operation_changes(self, depuis=None):
+        self.appels.append(('sync', depuis))
+        operations, supprimees = self.changements if depuis is not None else ([], [])
+        return {'curseur': self.curseur, 'operations': operations, 'supprimees': supprimees}
+
+    def get_comptes(self):
+        return [{'idcompte': 1, 'nom': "Courant"}]
+
+    def get_categories(self):
+        return []
+
+    def get_sous_categories(self):
+        return []
+
+    def get_all_operations(self, date_debut=None, date_fin=None):
+        self.appels.append((date_debut, date_fin))
+        return [op for op in self.operations
+                if (date_debut is None or op['date'] >= date_debut)
+                and (date_fin is None or op['date'] <= date_fin)]
+
+    def get_monthly_stats(self, date_fin=None):
+        stats = {}
+        for op in self.operations:
+            if op['date'] <= date_fin:
+                mois = stats.setdefault(op['date'][:7] + "-01", [0.0, 0.0, 0])
+                mois[0 if op['montant'] > 0 else 1] += abs(op['montant'])
+                mois[2] += 1
+        return [{'mois': m, 'total_revenus': r, 'total_depenses': d, 'nb_operations': n}
+                for m, (r, d, n) in stats.items()]
+
+
+def test_windowed_history_pages_old_months():
+    """Mode fenêtré : mois récents résidents, mois anciens chargés à la demande et évincés (LRU)"""
+    now = datetime.now()
+    operations = [
+        {'idoperation': i, 'description': "x", 'montant': -10.0, 'idcompte': 1,
+         'date': date(now.year - 3 + i // 12, i % 12 + 1, 15).isoformat()}
+        for i in range(24)
+    ]
+    with mock.patch.object(BudgetManager, 'load_operations_from_api'):
+        manager = BudgetManager(data_directory=tempfile.mkdtemp(), fenetre_mois=1, max_operations_archives=1)
+    manager.api_client = _FakeAPI(operations)
+    manager.load_operations_from_api()
+
+    assert manager.nombre_transactions == 0
+    assert manager.get_depenses_total() == 240.0
+    assert [op.id for op in manager.get_operations_of_month(now.year - 3, 1)] == [0]
+    assert [op.id for op in manager.get_operations_of_month(now.year - 3, 2)] == [1]
+    assert list(manager._pages_archives) == [(now.year - 3, 2)]
+    assert manager.get_monthly_summary(now.year - 3, 2)['depenses'] == 10.0
+
+
+def test_snapshot_is_immutable_and_consistent_under_writes():
+    """Un instantané n'est pas affecté par les écritures ; lectures et écritures concurrentes restent cohérentes"""
+    manager = _manager()
+    avant = manager.snapshot()
+    manager.update_operation(1, montant=1000.0)
+    assert avant.totaux.solde == 1840.0
+    assert avant.operations[0].montant == 2000.0
+    assert manager.snapshot().totaux.solde == 840.0
+
+    def ecrire():
+        for i in range(100, 600):
+            manager.apply_sync_delta([Operation(i, "x", -1.0, "A", datetime(2024, 3, 1))], deleted_ids=[])
+            manager.remove_operation(i)
+
+    ecrivain = threading.Thread(target=ecrire)
+    ecrivain.start()
+    while ecrivain.is_alive():
+        snapshot = manager.snapshot()
+        assert snapshot.totaux.solde == sum(op.montant for op in snapshot.operations)
+    ecrivain.join()
+    assert manager.nombre_transactions == 4
+
+
+class _OfflineAPI:
+    """Client API dont toutes les requêtes échouent (serveur arrêté)"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: {'error': "Connexion refusée"}
+
+
+def test_local_mirror_offline_start_and_incremental_sync():
+    """Le miroir local permet un démarrage hors ligne ; ensuite seuls les changements sont appliqués"""
+    data_directory = tempfile.mkdtemp()
+    operations = [
+        {'idoperation': 1, 'description': "Salaire", 'montant': "2000.00", 'idcompte': 1, 'date': "2024-01-01"},
+        {'idoperation': 2, 'description': "Courses", 'montant': "-80.00", 'idcompte': 1, 'date': "2024-01-05"},
+    ]
+    manager = BudgetManager(data_directory=data_directory, autoload=False)
+    manager.api_client = _FakeAPI(operations)
+    manager.load_operations_from_api()
+    assert manager.get_solde() == 1920.0
+
+    # Relance sans serveur : données du miroir
+    manager = BudgetManager(data_directory=data_directory, autoload=False)
+    manager.api_client = _OfflineAPI()
+    assert manager.load_local()
+    manager.load_operations_from_api()
+    assert manager.get_solde() == 1920.0
+    assert manager.get_comptes() == [{'idcompte': 1, 'nom': "Courant"}]
+
+    # Serveur revenu : une modification et une suppression depuis le curseur
+    api = _FakeAPI(operations)
+    api.curseur = 2
+    api.changements = ([{'idoperation': 1, 'description': "Salaire", 'montant': "2100.00", 'idcompte': 1,
+                         'date': "2024-01-01"}], [2])
+    manager.api_client = api
+    manager.load_operations_from_api()
+    assert manager.get_solde() == 2100.0
+    assert api.appels == [('sync', 1)]
+
+    manager = BudgetManager(data_directory=data_directory, autoload=False)
+    assert manager.load_local() and manager.get_solde() == 2100.0
+    assert manager.local_store.curseur == 2
+
+
+class _WriteAPI(_FakeAPI):
+    """Client API qui applique les écritures différées (clés d'idempotence, conflits par champ)"""
+
+    def __init__(self, operations):
+        super().__init__(operations)
+        self.lots = []
+        self.cles = {}
+
+    def push_operation_writes(self, ecritures):
+        self.lots.append(ecritures)
+        resultats = []
+        for e in ecritures:
+            if e['cle'] in self.cles:
+                resultats.append({'cle': e['cle'], 'statut': 'ok', 'operation': self.cles[e['cle']], 'detail': None})
+                continue
+            par_id = {op['idoperation']: op for op in self.operations}
+            statut = 'ok'
+            if e['action'] == 'create':
+                operation = {'idoperation': 100 + len(self.operations), **e['donnees']}
+                self.operations.append(operation)
+            else:
+                operation = par_id[e['idoperation']]
+                modifies = [c for c, v in (e['avant'] or {}).items() if operation[c] != v]
+                statut = 'conflit' if modifies else 'ok'
+                operation.update({c: v for c, v in (e['donnees'] or {}).items() if c not in modifies})
+                if e['action'] == 'delete' and not modifies:
+                    self.operations.remove(operation)
+                    operation = None
+            self.cles[e['cle']] = operation
+            resultats.append({'cle': e['cle'], 'statut': statut, 'operation': operation and dict(operation),
+                              'detail': None})
+        return resultats
+
+
+def test_outbox_optimistic_writes_survive_offline_then_flush():
+    """Écritures appliquées sans réseau, conservées hors ligne, puis envoyées en un lot ; conflit : le serveur l'emporte"""
+    operations = [{'idoperation': 1, 'description': "Loyer", 'montant': "-700.00", 'idcompte': 1, 'date': "2024-01-01"}]
+    manager = BudgetManager(data_directory=tempfile.mkdtemp(), autoload=False)
+    manager.api_client = _WriteAPI(operations)
+    manager.load_operations_from_api()
+
+    manager.api_client = _OfflineAPI()
+    creee = manager.add_operation("Café", -2.5, date_operation=datetime(2024, 1, 3))
+    manager.update_operation(creee['idoperation'], description="Café crème")
+    manager.update_operation(1, montant=-750.0)
+    assert creee['idoperation'] < 0
+    assert manager.get_solde() == -752.5
+    assert manager.flush_outbox() == 0
+    assert manager.nombre_ecritures_en_attente == 3
+
+    # Entre-temps, le loyer a été modifié sur le serveur
+    api = _WriteAPI(operations)
+    operations[0]['montant'] = "-720.00"
+    manager.api_client = api
+    assert manager.flush_outbox(ignorer_delai=True) == 3
+    assert manager.nombre_ecritures_en_attente == 0
+    assert [op['description'] for op in api.operations] == ["Loyer", "Café crème"]
+    assert manager.get_operation(creee['idoperation']) is None
+    assert manager.get_operation(101).description == "Café crème"
+    assert manager.get_solde() == -722.5
+    assert [c['statut'] for c in manager.conflits] == ['conflit']
+
+    # Même lot renvoyé (réponse perdue) : rien n'est appliqué deux fois
+    api.push_operation_writes(api.lots[0])
+    assert len(api.operations) == 2
+
+
+def test_bulk_writes_go_through_the_outbox():
+    """Modifications et suppressions groupées passent par la file d'attente, opérations créées hors ligne comprises"""
+    operations = [
+        {'idoperation': 1, 'description': "Loyer", 'montant': "-700.00", 'idcompte': 1, 'date': "2024-01-01"},
+        {'idoperation': 2, 'description': "Courses", 'montant': "-80.00", 'idcompte': 1, 'date': "2024-01-05"},
+    ]
+    manager = BudgetManager(data_directory=tempfile.mkdtemp(), autoload=False)
+    manager.api_client = _WriteAPI(operations)
+    manager.load_operations_from_api()
+
+    manager.api_client = _OfflineAPI()
+    creee = manager.add_operation("Café", -2.5, date_operation=datetime(2024, 1, 3))
+    assert manager.update_operations([1, creee['idoperation'], 99], montant="-10.00", idsouscategorie=7) == 2
+    assert manager.remove_operations([creee['idoperation'], 2, 2]) == 2
+    assert manager.get_solde() == -10.0
+    assert manager.nombre_ecritures_en_attente == 5
+
+    api = _WriteAPI(operations)
+    manager.api_client = api
+    assert manager.flush_outbox(ignorer_delai=True) == 5
+    assert manager.nombre_ecritures_en_attente == 0
+    assert api.operations == [{'idoperation': 1, 'description': "Loyer", 'montant': "-10.00", 'idcompte': 1,
+                               'date': "2024-01-01", 'idsouscategorie': 7}]
+    assert [op.id for op in manager.operations] == [1]
+
+
+def test_local_edits_keep_mirror_columns():
+    """Une modification locale ou une renumérotation conserve idtype et idsouscategorie du miroir"""
+    manager = BudgetManager(data_directory=tempfile.mkdtemp(), autoload=False)
+    manager.api_client = _WriteAPI([{'idoperation': 1, 'description': "Loyer", 'montant': "-700.00", 'idcompte': 1,
+                                     'date': "2024-01-01", 'idtype': 3, 'idsouscategorie': 7}])
+    manager.load_operations_from_api()
+    manager.api_client = _OfflineAPI()
+    manager.update_operation(1, description="Loyer janvier")
+    creee = manager.add_operation("Café", -2.5, date_operation=datetime(2024, 1, 3))
+    manager.update_operations([creee['idoperation']], idsouscategorie=4)
+    manager._renumeroter_operation(creee['idoperation'], 42)
+
+    lignes = {ligne['idoperation']: ligne for ligne in manager.local_store.load_operations()}
+    assert set(lignes) == {1, 42}
+    assert (lignes[1]['description'], lignes[1]['idtype'], lignes[1]['idsouscategorie']) == ("Loyer janvier", 3, 7)
+    assert (lignes[42]['idtype'], lignes[42]['idsouscategorie']) == (1, 4)
+
+
+def test_local_data_is_scoped_per_user():
+    """Un autre utilisateur ne reprend ni le miroir, ni le curseur, ni les écritures en attente du précédent"""
+    data_directory = tempfile.mkdtemp()
+    manager = BudgetManager(data_directory=data_directory, autoload=False)
+    manager.api_client = _WriteAPI([{'idoperation': 1, 'description': "Salaire", 'montant': "2000.00",
+                                     'idcompte': 1, 'date': "2024-01-01"}])
+    manager.load_operations_from_api()
+    manager.api_client = _OfflineAPI()
+    manager.add_operation("Café", -2.5, date_operation=datetime(2024, 1, 3))
+    assert manager.nombre_ecritures_en_attente == 1
+
+    autre = _WriteAPI([{'idoperation': 7, 'description': "Loyer", 'montant': "-700.00",
+                        'idcompte': 1, 'date': "2024-01-01"}])
+    autre.token = "jeton-2"
+    autre.get_current_user = lambda: {'idutilisateur': 2}
+    manager.api_client = autre
+    manager.load_operations_from_api()
+    assert [op.id for op in manager.operations] == [7]
+    assert autre.lots == [] and manager.nombre_ecritures_en_attente == 0
+    assert autre.appels[0] == ('sync', None)
+    assert manager.get_analytics()['totaux']['solde'] == -700.0
+
+    # Relance : les données du dernier utilisateur identifié sont reprises
+    manager = BudgetManager(data_directory=data_directory, autoload=False)
+    assert manager.load_local() and [op.id for op in manager.operations] == [7]
+
+
+def test_operations_page_follows_local_rules():
+    """Pages du miroir : écritures en attente comprises, catégorie locale, recherche sans casse ni accents"""
+    operations = [
+        {'idoperation': 1, 'description': "Salaire", 'montant': "2000.00", 'idcompte': 1, 'date': "2024-01-01"},
+        {'idoperation': 2, 'description': "Courses", 'montant': "-80.00", 'idcompte': 1, 'date': "2024-01-05"},
+    ]
+    manager = BudgetManager(data_directory=tempfile.mkdtemp(), autoload=False)
+    manager.api_client = _FakeAPI(operations)
+    manager.load_operations_from_api()
+    manager.api_client = _OfflineAPI()
+    creee = manager.add_operation("Café crème", -2.5, categorie="Loisirs", date_operation=datetime(2024, 1, 3))
+
+    assert [op.id for op in manager.get_operations_page(0, 10)] == [2, creee['idoperation'], 1]
+    assert [op.id for op in manager.get_operations_page(1, 1)] == [creee['idoperation']]
+    assert [op.id for op in manager.get_operations_page(0, 10, search="CAFE")] == [creee['idoperation']]
+    page = manager.get_operations_page(0, 10, categorie="Loisirs")
+    assert [(op.id, op.categorie) for op in page] == [(creee['idoperation'], "Loisirs")]
+    assert [op.id for op in manager.get_operations_page(0, 10, categorie="Inconnu")] == [2, 1]
+
+
+def test_columnar_history_memory_mapped_and_incremental():
+    """L'historique en colonnes est relu par memory mapping et mis à jour ligne à ligne"""
+    repertoire = tempfile.mkdtemp()
+    historique = ColumnarHistory(repertoire)
+    historique.rebuild(_operations())
+    historique.apply([Operation(2, "Courses", -90.0, "Alimentation", datetime(2024, 1, 5)),
+                      Operation(5, "Cinéma", -12.0, "Loisirs", datetime(2024, 2, 9))], deleted_ids=[1, 99])
+
+    attendu = OperationColumns.from_operations([
+        Operation(2, "Courses", -90.0, "Alimentation", datetime(2024, 1, 5)),
+        Operation(3, "Essence", -50.0, "Transport", datetime(2024, 1, 20)),
+        Operation(4, "Restaurant", -30.0, "Alimentation", datetime(2024, 2, 2)),
+        Operation(5, "Cinéma", -12.0, "Loisirs", datetime(2024, 2, 9)),
+    ])
+    colonnes = ColumnarHistory(repertoire).colonnes
+    assert isinstance(colonnes.montants, np.memmap) and not colonnes.montants.flags.writeable
+    assert sorted(colonnes.ids.tolist()) == [2, 3, 4, 5]
+    assert colonnes.totaux() == attendu.totaux()
+    assert colonnes.resume_mensuel() == attendu.resume_mensuel()
+    assert colonnes.depenses_par_categorie() == attendu.depenses_par_categorie()
+
+
+def test_manager_history_follows_sync_and_survives_restart():
+    """Les colonnes de l'historique suivent les écritures et sont reprises telles quelles au lancement suivant"""
+    data_directory = tempfile.mkdtemp()
+    operations = [
+        {'idoperation': 1, 'description': "Salaire", 'montant': "2000.00", 'idcompte': 1, 'date': "2024-01-01"},
+        {'idoperation': 2, 'description': "Courses", 'montant': "-80.00", 'idcompte': 1, 'date': "2024-01-05"},
+    ]
+    manager = BudgetManager(data_directory=data_directory, autoload=False)
+    manager.api_client = _FakeAPI(operations)
+    manager.load_operations_from_api()
+    api = _FakeAPI(operations)
+    api.curseur = 2
+    api.changements = ([{'idoperation': 3, 'description': "Loyer", 'montant': "-700.00", 'idcompte': 1,
+                         'date': "2024-02-01"}], [2])
+    manager.api_client = api
+    manager.load_operations_from_api()
+    assert manager.historique.propre
+    assert manager.get_analytics()['totaux']['solde'] == 1300.0
+    manager.update_operation(1, montant=2100.0)
+    assert manager.get_analytics()['totaux']['solde'] == 1400.0
+
+    manager = BudgetManager(data_directory=data_directory, autoload=False)
+    with mock.patch.object(ColumnarHistory, 'rebuild') as rebuild:
+        assert manager.load_local()
+    rebuild.assert_not_called()
+    assert [m['mois'] for m in manager.get_analytics()['mensuel']] == ['2024-01', '2024-02']
+
+    # Autant d'opérations mais d'autres valeurs : fichiers reconstruits
+    manager.operations = [Operation(1, "Salaire", 2100.0, "Inconnu", datetime(2024, 1, 1)),
+                          Operation(3, "Loyer", -650.0, "Inconnu", datetime(2024, 2, 1))]
+    assert manager.get_analytics()['totaux']['solde'] == 1450.0
@@ -0,0 +1,120 @@
+"""
+Tests de la liste virtualisée des transactions (src/frontend/components/transaction_list.py)
+Ces tests ne nécessitent ni API ni page Flet affichée
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.frontend.components import transaction_list
+from src.frontend.components.transaction_list import (
+    PAS_LIGNE, TAILLE_PAGE, TransactionPages, TransactionsList
+)
+from src.models.budget_manager import Operation
+
+
+def _operations(n):
+    debut = datetime(2024, 1, 1)
+    return [Operation(i, f"Opération {i}", -1.0 - i % 7, "Alimentation", debut - timedelta(minutes=i))
+            for i in range(n)]
+
+
+def _visibles(liste):
+    return [ligne.transaction.id for ligne in liste._lignes if ligne.container.visible]
+
+
+def test_only_visible_rows_are_built_and_recycled():
+    """100 000 opérations : quelques dizaines de lignes construites, réaffectées au défilement"""
+    liste = TransactionsList(transactions=_operations(100_000))
+    lignes = list(liste._lignes)
+    assert len(lignes) < 50
+    assert _visibles(liste)[:3] == [0, 1, 2]
+
+    liste._on_scroll(SimpleNamespace(pixels=50_000 * PAS_LIGNE))
+    assert liste._lignes == lignes
+    assert 50_000 in _visibles(liste)
+    assert liste._espace_haut.height == liste._debut * PAS_LIGNE
+    hauteur = liste._espace_haut.height + len(_visibles(liste)) * PAS_LIGNE + liste._espace_bas.height
+    assert hauteur == 100_000 * PAS_LIGNE
+
+    liste._on_scroll(SimpleNamespace(pixels=10**9))
+    assert _visibles(liste)[-1] == 99_999
+
+
+def test_infinite_scroll_reads_pages_on_demand_with_bounded_cache():
+    """Avec charger_page, les pages sont lues au fil du défilement et le cache reste borné"""
+    operations = _operations(1_000)
+    appels = []
+
+    def charger_page(skip, limit, search=None, categorie=None):
+        appels.append(skip)
+        return operations[skip:skip + limit]
+
+    liste = TransactionsList(charger_page=charger_page)
+    for position in range(0, 1_000, 50):
+        liste._on_scroll(SimpleNamespace(pixels=position * PAS_LIGNE))
+        limite = time.monotonic() + 2
+        while liste._source.get(position) is None and time.monotonic() < limite:
+            time.sleep(0.01)
+    # En bas de liste, la page suivante (vide) est lue : fin de liste
+    liste._on_scroll(SimpleNamespace(pixels=10**9))
+    limite = time.monotonic() + 2
+    while not liste._source.complete and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert liste._source.complete and len(liste._source) == 1_000
+    assert sorted(set(appels)) == list(range(0, 1_000 + TAILLE_PAGE, TAILLE_PAGE))
+
+    source = TransactionPages(charger_page, max_pages=2, asynchrone=False)
+    for numero in range(5):
+        source.charger(numero)
+    assert len(source._pages) == 2 and source.get(0) is None and source.get(450).id == 450
+
+
+def _saisir(liste, texte):
+    liste._on_search_change(SimpleNamespace(control=SimpleNamespace(value=texte)))
+
+
+def test_search_ignores_accents_narrows_incrementally_and_rebinds_only_changed_rows(monkeypatch):
+    """Recherche sans casse ni accents ; une requête prolongée ne relit que le résultat précédent"""
+    operations = _operations(1_000) + [Operation(5_000, "Café Crème", -3.0, "Loisirs", datetime(2025, 1, 1))]
+    liste = TransactionsList(transactions=operations)
+    liste.delai_recherche = 0
+    lignes = list(liste._lignes)
+
+    _saisir(liste, "CAFE")
+    assert _visibles(liste) == [5_000]
+    assert liste._lignes == lignes and liste.container.content.controls[2].content is liste._vue
+
+    # Seules les lignes dont la transaction ou la visibilité change sont renvoyées
+    _saisir(liste, "")
+    assert len(_visibles(liste)) == len(lignes)
+    assert liste._afficher_fenetre() == []
+
+    _saisir(liste, "opération 99")
+    normalisees, normaliser = [], transaction_list._normaliser
+    monkeypatch.setattr(transaction_list, "_normaliser", lambda texte: normalisees.append(texte) or normaliser(texte))
+    _saisir(liste, "opération 999")
+    assert normalisees == ["opération 999"] and _visibles(liste) == [999]
+
+    # Aucun résultat, puis de nouveau des résultats : container reconstruit
+    _saisir(liste, "introuvable")
+    assert liste._lignes == []
+    _saisir(liste, "")
+    assert len(_visibles(liste)) == len(lignes)
+
+
+def test_search_is_debounced():
+    """Frappes rapprochées : un seul filtrage, avec la dernière valeur"""
+    liste = TransactionsList(transactions=_operations(100))
+    liste.delai_recherche = 0.05
+    appels = []
+    liste._appliquer_filtres = lambda: appels.append(liste.search_query)
+    for texte in ("o", "op", "opé"):
+        _saisir(liste, texte)
+    time.sleep(0.2)
+    assert appels == ["opé"]